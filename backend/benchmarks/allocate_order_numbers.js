@@ -0,0 +1,72 @@
+/**
+ * Order number allocator driver for tests/stress_order_numbers.py.
+ *
+ * Connects to MONGODB_URI and allocates ALLOC_COUNT order numbers through
+ * the same generator checkout uses, ALLOC_CONCURRENCY callers at a time, and
+ * writes them to stdout one per line in the order they were handed out
+ * (after the connection log line). A summary goes to stderr.
+ * The stress test runs several of these at once against one counter and
+ * checks the numbers are unique.
+ *
+ * Run from backend/:
+ *   node benchmarks/allocate_order_numbers.js > numbers.txt
+ * Settings: ALLOC_COUNT (100000), ALLOC_CONCURRENCY (64),
+ * ALLOC_COUNTER ('orderNumberStress'), ORDER_NUMBER_BLOCK_SIZE (100).
+ */
+const connectDB = require('../src/config/mongoDataBaseConnection');
+const { createOrderNumberGenerator } = require('../src/utils/orderNumberUtil');
+
+const COUNT = Number(process.env.ALLOC_COUNT) || 100000;
+const CONCURRENCY = Number(process.env.ALLOC_CONCURRENCY) || 64;
+// A counter of its own, so a stress run does not use up real order numbers
+const COUNTER = process.env.ALLOC_COUNTER || 'orderNumberStress';
+const BLOCK_SIZE = parseInt(process.env.ORDER_NUMBER_BLOCK_SIZE, 10) || 100;
+const FLUSH_LINES = 10000;
+
+const write = (text) =>
+  new Promise((resolve, reject) => {
+    process.stdout.write(text, (error) => (error ? reject(error) : resolve()));
+  });
+
+const main = async () => {
+  await connectDB();
+  const generate = createOrderNumberGenerator({ counter: COUNTER, blockSize: BLOCK_SIZE });
+
+  let remaining = COUNT;
+  let pending = [];
+  let flushing = Promise.resolve();
+  const started = process.hrtime.bigint();
+
+  await Promise.all(
+    Array.from({ length: Math.min(CONCURRENCY, COUNT) }, async () => {
+      while (remaining > 0) {
+        remaining -= 1;
+        pending.push(await generate());
+        if (pending.length >= FLUSH_LINES) {
+          const lines = `${pending.join('\n')}\n`;
+          pending = [];
+          flushing = flushing.then(() => write(lines));
+          await flushing;
+        }
+      }
+    })
+  );
+  if (pending.length > 0) {
+    await flushing.then(() => write(`${pending.join('\n')}\n`));
+  } else {
+    await flushing;
+  }
+
+  const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+  const { blocks } = generate.stats();
+  console.error(
+    `pid ${process.pid}: ${COUNT} numbers in ${seconds.toFixed(2)}s ` +
+      `(${Math.round(COUNT / seconds)}/s), ${blocks} block reservations`
+  );
+  await connectDB.disconnectDB();
+};
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,153 @@
+/**
+ * Read path microbenchmark for GET /products and GET /categories.
+ *
+ * Serves the same page of data two ways from a child process and drives it
+ * over keep-alive HTTP for a fixed time, reporting req/s for each:
+ *   - documents: what the endpoints did before, i.e. full Mongoose documents
+ *     (hydrated per request, category populated) sent with res.json
+ *   - lean: plain card-view objects written by the precompiled serializers
+ * Categories were already lean and cached, so their baseline is lean
+ * objects through JSON.stringify. No database is needed: Model.hydrate()
+ * does the same work as a query returning documents.
+ *
+ * Run from backend/:
+ *   npm run bench:read-path
+ * Settings: BENCH_DURATION_S (5), BENCH_CONNECTIONS (32), BENCH_PAGE_SIZE (20),
+ * BENCH_CATEGORIES (30).
+ */
+const http = require('http');
+const { fork } = require('child_process');
+const mongoose = require('mongoose');
+const Product = require('../src/models/productModel');
+const Category = require('../src/models/categoryModel');
+const { PRODUCT_CARD_FIELDS, serializeProductList } = require('../src/serializers/productSerializer');
+const { serializeCategoryList } = require('../src/serializers/categorySerializer');
+
+const DURATION_S = Number(process.env.BENCH_DURATION_S) || 5;
+const CONNECTIONS = Number(process.env.BENCH_CONNECTIONS) || 32;
+const PAGE_SIZE = Number(process.env.BENCH_PAGE_SIZE) || 20;
+const CATEGORY_COUNT = Number(process.env.BENCH_CATEGORIES) || 30;
+
+const { ObjectId } = mongoose.Types;
+
+// Raw documents as the driver returns them
+const rawCategories = Array.from({ length: CATEGORY_COUNT }, (_, i) => ({
+  _id: new ObjectId(),
+  name: `Category ${i}`,
+  slug: `category-${i}`,
+  description: `Everything in category ${i}, described at some length for the category page.`,
+  createdAt: new Date(),
+  updatedAt: new Date(),
+  __v: 0,
+}));
+
+const rawProducts = Array.from({ length: PAGE_SIZE }, (_, i) => ({
+  _id: new ObjectId(),
+  name: `Benchmark product ${i}`,
+  slug: `benchmark-product-${i}`,
+  description: 'A product description of a few sentences. '.repeat(8),
+  price: 10 + i,
+  sku: `BENCH-READ-${i}`,
+  stock: i * 3,
+  categoryId: rawCategories[i % CATEGORY_COUNT]._id,
+  images: [`https://cdn.example.com/products/${i}/1.jpg`, `https://cdn.example.com/products/${i}/2.jpg`],
+  featured: false,
+  rating: 4.2,
+  reviewCount: 17,
+  views: 1000 + i,
+  purchases: 40 + i,
+  createdAt: new Date(),
+  updatedAt: new Date(),
+  __v: 0,
+}));
+
+const pagination = { page: 1, limit: PAGE_SIZE, total: 5000, pages: 250, nextCursor: null, hasNextPage: false };
+const cardFields = ['_id', ...PRODUCT_CARD_FIELDS.split(' ')];
+const categoryRef = new Map(rawCategories.map((c) => [c._id.toString(), { _id: c._id, name: c.name, slug: c.slug }]));
+
+const handlers = {
+  '/documents/products': () => {
+    const products = rawProducts.map((raw) => {
+      const product = Product.hydrate(raw);
+      product.categoryId = Category.hydrate(rawCategories.find((c) => c._id.equals(raw.categoryId)));
+      return product;
+    });
+    return JSON.stringify({ success: true, count: products.length, data: products, pagination });
+  },
+  '/lean/products': () => {
+    // What .select(PRODUCT_CARD_FIELDS).populate(...).lean() returns
+    const products = rawProducts.map((raw) => {
+      const card = {};
+      for (const field of cardFields) card[field] = raw[field];
+      card.categoryId = categoryRef.get(raw.categoryId.toString());
+      return card;
+    });
+    return serializeProductList({ success: true, count: products.length, data: products, pagination });
+  },
+  '/documents/categories': () =>
+    JSON.stringify({ success: true, count: rawCategories.length, data: rawCategories }),
+  '/lean/categories': () =>
+    serializeCategoryList({ success: true, count: rawCategories.length, data: rawCategories }),
+};
+
+const serve = () => {
+  const server = http.createServer((req, res) => {
+    const body = handlers[req.url]();
+    res.writeHead(200, { 'Content-Type': 'application/json; charset=utf-8' });
+    res.end(body);
+  });
+  server.listen(0, '127.0.0.1', () => process.send(server.address().port));
+};
+
+const drive = (port, path) =>
+  new Promise((resolve) => {
+    const agent = new http.Agent({ keepAlive: true, maxSockets: CONNECTIONS });
+    const deadline = Date.now() + DURATION_S * 1000;
+    let completed = 0;
+    let bytes = 0;
+    let running = CONNECTIONS;
+
+    const next = () => {
+      if (Date.now() >= deadline) {
+        running -= 1;
+        if (running === 0) {
+          agent.destroy();
+          resolve({ rps: completed / DURATION_S, bytes: bytes / Math.max(completed, 1) });
+        }
+        return;
+      }
+      http.get({ host: '127.0.0.1', port, path, agent }, (res) => {
+        res.on('data', (chunk) => (bytes += chunk.length));
+        res.on('end', () => {
+          completed += 1;
+          next();
+        });
+      });
+    };
+    for (let i = 0; i < CONNECTIONS; i += 1) next();
+  });
+
+const main = async () => {
+  const child = fork(__filename, ['serve']);
+  const port = await new Promise((resolve) => child.once('message', resolve));
+  console.log(`${DURATION_S}s per run, ${CONNECTIONS} connections, ${PAGE_SIZE} products, ${CATEGORY_COUNT} categories\n`);
+
+  for (const endpoint of ['products', 'categories']) {
+    await drive(port, `/lean/${endpoint}`); // warm up both paths
+    await drive(port, `/documents/${endpoint}`);
+    const before = await drive(port, `/documents/${endpoint}`);
+    const after = await drive(port, `/lean/${endpoint}`);
+    console.log(
+      `GET /${endpoint.padEnd(11)} before ${before.rps.toFixed(0).padStart(6)} req/s (${before.bytes.toFixed(0)} B)` +
+        `   after ${after.rps.toFixed(0).padStart(6)} req/s (${after.bytes.toFixed(0)} B)` +
+        `   ${(after.rps / before.rps).toFixed(2)}x`
+    );
+  }
+  child.kill();
+};
+
+if (process.argv[2] === 'serve') {
+  serve();
+} else {
+  main();
+}
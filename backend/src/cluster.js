@@ -0,0 +1,80 @@
+/**
+ * Clustered launch: one primary that forks WEB_CONCURRENCY workers (default:
+ * one per core), each running server.js with its own MongoDB pool. The
+ * workers share the port; the primary only supervises.
+ *
+ *   npm run start:cluster
+ *
+ * A worker that dies is replaced. On SIGTERM/SIGINT the primary forwards
+ * SIGTERM to every worker, waits for them to drain (see server.js) and exits.
+ *
+ * Caches stay per worker; the primary relays their invalidations to the
+ * other workers and gathers every worker's metrics for /metrics (see
+ * utils/clusterBus.js). /health describes the worker that answered.
+ */
+const cluster = require('cluster');
+const os = require('os');
+const path = require('path');
+const dotenv = require('dotenv');
+const clusterBus = require('./utils/clusterBus');
+
+dotenv.config({ path: '.env' });
+
+const WORKERS = parseInt(process.env.WEB_CONCURRENCY, 10) || os.availableParallelism();
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.SHUTDOWN_TIMEOUT_MS, 10) || 25000;
+// A worker that dies sooner than this after starting is crash looping
+// (e.g. MongoDB unreachable at boot), so it is replaced after a delay
+const MIN_UPTIME_MS = 5000;
+const RESTART_DELAY_MS = 2000;
+
+let shuttingDown = false;
+
+const fork = () => {
+  const worker = cluster.fork();
+  worker.startedAt = Date.now();
+};
+
+cluster.setupPrimary({ exec: path.join(__dirname, 'server.js') });
+clusterBus.startRelay();
+
+cluster.on('exit', (worker, code, signal) => {
+  if (shuttingDown) {
+    if (Object.values(cluster.workers).every((other) => other.isDead())) {
+      console.log('All workers stopped');
+      process.exit(0);
+    }
+    return;
+  }
+  const uptime = Date.now() - worker.startedAt;
+  console.error(`Worker ${worker.process.pid} died (${signal || code}) after ${Math.round(uptime / 1000)}s, replacing it`);
+  if (uptime < MIN_UPTIME_MS) {
+    setTimeout(fork, RESTART_DELAY_MS);
+  } else {
+    fork();
+  }
+});
+
+const shutdown = (signal) => {
+  if (shuttingDown) {
+    return;
+  }
+  shuttingDown = true;
+  const workers = Object.values(cluster.workers);
+  console.log(`${signal} received, stopping ${workers.length} workers`);
+  if (workers.length === 0) {
+    process.exit(0);
+  }
+  workers.forEach((worker) => worker.process.kill('SIGTERM'));
+  // Workers enforce their own deadline; this only covers a stuck one
+  setTimeout(() => {
+    console.error('Workers did not stop in time, exiting');
+    process.exit(1);
+  }, SHUTDOWN_TIMEOUT_MS + 10000).unref();
+};
+process.once('SIGTERM', () => shutdown('SIGTERM'));
+process.once('SIGINT', () => shutdown('SIGINT'));
+
+console.log(`Primary ${process.pid} starting ${WORKERS} workers`);
+for (let i = 0; i < WORKERS; i += 1) {
+  fork();
+}
@@ -1,14 +1,44 @@
 const mongoose = require('mongoose');
+const queryTimingPlugin = require('../utils/queryTimingPlugin');
 require('dotenv').config({ path: '../.env' });
 
+// Global plugins only apply to models compiled after this line, so this
+// module is required before any model
+mongoose.plugin(queryTimingPlugin);
+
+// Pool settings are per process: in cluster mode every worker opens its
+// own pool, so the server sees up to workers x MONGO_MAX_POOL_SIZE connections
+const connectionOptions = () => ({
+  maxPoolSize: parseInt(process.env.MONGO_MAX_POOL_SIZE, 10) || 20,
+  minPoolSize: parseInt(process.env.MONGO_MIN_POOL_SIZE, 10) || 2,
+  maxIdleTimeMS: parseInt(process.env.MONGO_MAX_IDLE_TIME_MS, 10) || 60000,
+  // Fail a query fast when no server is reachable instead of holding the
+  // request for the driver's 30s default; readiness reports the outage
+  serverSelectionTimeoutMS: parseInt(process.env.MONGO_SERVER_SELECTION_TIMEOUT_MS, 10) || 5000,
+});
+
 const connectDB = async () => {
   try {
-    const conn = await mongoose.connect(process.env.MONGODB_URI);
-    console.log(`MongoDB Connected: ${conn.connection.host}`);
+    const conn = await mongoose.connect(process.env.MONGODB_URI, connectionOptions());
+    console.log(`MongoDB Connected: ${conn.connection.host} (pid ${process.pid})`);
   } catch (error) {
     console.error(`Error: ${error.message}`);
     process.exit(1);
   }
 };
 
-module.exports = connectDB;
\ No newline at end of file
+// After the first connect the driver reconnects on its own; these only log
+mongoose.connection.on('disconnected', () => console.warn('MongoDB disconnected'));
+mongoose.connection.on('reconnected', () => console.log('MongoDB reconnected'));
+
+const isConnected = () => mongoose.connection.readyState === mongoose.ConnectionStates.connected;
+
+// Name of the connection state ('connected', 'disconnected', ...) for health checks
+const connectionState = () => mongoose.ConnectionStates[mongoose.connection.readyState];
+
+const disconnectDB = () => mongoose.disconnect();
+
+module.exports = connectDB;
+module.exports.isConnected = isConnected;
+module.exports.connectionState = connectionState;
+module.exports.disconnectDB = disconnectDB;
@@ -0,0 +1,46 @@
+const AnalyticsService = require('../services/analyticsService');
+const asyncHandler = require('../utils/asyncHandler');
+
+const getDashboard = asyncHandler(async (req, res) => {
+  const dashboard = await AnalyticsService.getDashboard();
+
+  res.status(200).json({
+    success: true,
+    data: dashboard,
+  });
+});
+
+const getRevenue = asyncHandler(async (req, res) => {
+  const revenue = await AnalyticsService.getRevenue(req.query);
+
+  res.status(200).json({
+    success: true,
+    data: revenue,
+  });
+});
+
+const getProductPerformance = asyncHandler(async (req, res) => {
+  const performance = await AnalyticsService.getProductPerformance(req.query);
+
+  res.status(200).json({
+    success: true,
+    count: performance.products.length,
+    data: performance,
+  });
+});
+
+const getOrderStats = asyncHandler(async (req, res) => {
+  const stats = await AnalyticsService.getOrderStats(req.query);
+
+  res.status(200).json({
+    success: true,
+    data: stats,
+  });
+});
+
+module.exports = {
+  getDashboard,
+  getRevenue,
+  getProductPerformance,
+  getOrderStats,
+};
@@ -1,9 +1,13 @@
 const CartService = require('../services/cartService');
 const asyncHandler = require('../utils/asyncHandler');
 
+// Carts come back with product details unless the client opts out
+// with ?populate=false (saves a query per request)
+const cartOptions = (req) => ({ populate: req.query.populate !== 'false' });
+
 const getCart = asyncHandler(async (req, res) => {
   // req.user.id is provided by the 'protect' middleware
-  const cart = await CartService.getCart(req.user.id);
+  const cart = await CartService.getCart(req.user.id, cartOptions(req));
   
   res.status(200).json({
     success: true,
@@ -15,7 +19,7 @@ const addItemToCart = asyncHandler(async (req, res) => {
   const { productId, quantity } = req.body;
   const userId = req.user.id;
 
-  const cart = await CartService.addItemToCart(userId, productId, quantity);
+  const cart = await CartService.addItemToCart(userId, productId, quantity, cartOptions(req));
 
   res.status(200).json({
     success: true,
@@ -29,7 +33,7 @@ const updateItemQuantity = asyncHandler(async (req, res) => {
   const { quantity } = req.body;
   const userId = req.user.id;
 
-  const cart = await CartService.updateItemQuantity(userId, itemId, quantity);
+  const cart = await CartService.updateItemQuantity(userId, itemId, quantity, cartOptions(req));
 
   res.status(200).json({
     success: true,
@@ -42,7 +46,7 @@ const removeItemFromCart = asyncHandler(async (req, res) => {
   const { itemId } = req.params;
   const userId = req.user.id;
 
-  const cart = await CartService.removeItemFromCart(userId, itemId);
+  const cart = await CartService.removeItemFromCart(userId, itemId, cartOptions(req));
 
   res.status(200).json({
     success: true,
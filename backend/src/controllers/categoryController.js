@@ -1,5 +1,11 @@
 const CategoryService = require('../services/categoryService');
 const asyncHandler = require('../utils/asyncHandler');
+const { entityTag, sendCacheable } = require('../utils/httpCache');
+const { serializeCategoryList, serializeCategory } = require('../serializers/categorySerializer');
+
+// Categories change rarely; clients may reuse them for a minute, then
+// revalidate with the ETag
+const CATEGORY_CACHE_CONTROL = 'public, max-age=60';
 
 const createCategory = asyncHandler(async (req, res) => {
   const { name, description } = req.body;
@@ -16,10 +22,11 @@ const createCategory = asyncHandler(async (req, res) => {
 const getAllCategories = asyncHandler(async (req, res) => {
   const categories = await CategoryService.getAllCategories();
 
-  res.status(200).json({
-    success: true,
-    count: categories.length,
-    data: categories,
+  await sendCacheable(req, res, {
+    serialize: serializeCategoryList,
+    body: { success: true, count: categories.length, data: categories },
+    etag: entityTag(categories.map((category) => [category._id, category.updatedAt])),
+    cacheControl: CATEGORY_CACHE_CONTROL,
   });
 });
 
@@ -27,9 +34,12 @@ const getCategoryBySlug = asyncHandler(async (req, res) => {
   const { slug } = req.params;
   const category = await CategoryService.getCategoryBySlug(slug);
 
-  res.status(200).json({
-    success: true,
-    data: category,
+  await sendCacheable(req, res, {
+    serialize: serializeCategory,
+    body: { success: true, data: category },
+    etag: entityTag(category._id, category.updatedAt),
+    lastModified: category.updatedAt,
+    cacheControl: CATEGORY_CACHE_CONTROL,
   });
 });
 
@@ -1,5 +1,27 @@
 const OrderService = require('../services/orderService');
 const asyncHandler = require('../utils/asyncHandler');
+const { CSV_HEADER, toCsvRows, toNdjson } = require('../serializers/orderExportSerializer');
+
+const EXPORT_FORMATS = {
+  csv: { contentType: 'text/csv; charset=utf-8', header: CSV_HEADER, write: toCsvRows },
+  ndjson: { contentType: 'application/x-ndjson; charset=utf-8', header: '', write: toNdjson },
+};
+
+// Resolves when 'res' can take more data, or when the client has gone away
+const writeChunk = (res, chunk) => {
+  if (res.write(chunk)) {
+    return Promise.resolve();
+  }
+  return new Promise((resolve) => {
+    const done = () => {
+      res.off('drain', done);
+      res.off('close', done);
+      resolve();
+    };
+    res.on('drain', done);
+    res.on('close', done);
+  });
+};
 
 const createOrder = asyncHandler(async (req, res) => {
   const { shippingAddress } = req.body;
@@ -20,12 +42,13 @@ const createOrder = asyncHandler(async (req, res) => {
 });
 
 const getMyOrders = asyncHandler(async (req, res) => {
-  const orders = await OrderService.getMyOrders(req.user.id);
+  const result = await OrderService.getMyOrders(req.user.id, req.query);
 
   res.status(200).json({
     success: true,
-    count: orders.length,
-    data: orders,
+    count: result.orders.length,
+    data: result.orders,
+    pagination: result.pagination,
   });
 });
 
@@ -42,13 +65,58 @@ const getOrderById = asyncHandler(async (req, res) => {
 });
 
 const getAllOrders = asyncHandler(async (req, res) => {
-  const orders = await OrderService.getAllOrders();
+  const result = await OrderService.getAllOrders(req.query);
 
   res.status(200).json({
     success: true,
-    count: orders.length,
-    data: orders,
+    count: result.orders.length,
+    data: result.orders,
+    pagination: result.pagination,
+  });
+});
+
+/**
+ * @desc    Streams orders as CSV (one row per item) or NDJSON (one order per
+ *          line), oldest _id first. Each batch is written only after the
+ *          client has taken the previous one. If the stream breaks, resume
+ *          with after=<last orderId received>; a failure after the first
+ *          byte aborts the response instead of ending it cleanly, so a
+ *          truncated export is never mistaken for a complete one.
+ */
+const exportOrders = asyncHandler(async (req, res) => {
+  const format = EXPORT_FORMATS[req.query.format || 'csv'];
+  const batches = OrderService.exportOrders(req.query);
+
+  let clientGone = false;
+  res.once('close', () => {
+    clientGone = true;
+  });
+
+  res.status(200);
+  res.set({
+    'Content-Type': format.contentType,
+    'Content-Disposition': `attachment; filename="orders-${new Date().toISOString().slice(0, 10)}.${req.query.format || 'csv'}"`,
+    'Cache-Control': 'no-store',
   });
+  // Headers (and the CSV header row) go out before the first query returns
+  res.flushHeaders();
+
+  try {
+    if (format.header) {
+      await writeChunk(res, format.header);
+    }
+    for await (const orders of batches) {
+      if (clientGone) {
+        break; // Leaving the loop closes the cursor
+      }
+      await writeChunk(res, format.write(orders));
+    }
+  } catch (error) {
+    console.error(`Order export failed: ${error.message}`);
+    res.destroy(error);
+    return;
+  }
+  res.end();
 });
 
 const updateOrderStatus = asyncHandler(async (req, res) => {
@@ -74,5 +142,6 @@ module.exports = {
   getMyOrders,
   getOrderById,
   getAllOrders,
+  exportOrders,
   updateOrderStatus,
 };
\ No newline at end of file
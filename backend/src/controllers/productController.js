@@ -1,5 +1,26 @@
+const { pipeline } = require('stream');
+const zlib = require('zlib');
 const ProductService = require('../services/productService');
+const ProductImportService = require('../services/productImportService');
+const ViewTrackingService = require('../services/viewTrackingService');
 const asyncHandler = require('../utils/asyncHandler');
+const { sendSerialized } = require('../utils/serializer');
+const { entityTag, sendCacheable } = require('../utils/httpCache');
+const {
+  serializeProductList,
+  serializeSearchResults,
+  serializeSuggestions,
+  serializeProductDetail,
+} = require('../serializers/productSerializer');
+
+// Lists may be reused briefly; the product page shows stock, so clients
+// revalidate it every time (a 304 when nothing changed)
+const PRODUCT_LIST_CACHE_CONTROL = 'public, max-age=15';
+const PRODUCT_DETAIL_CACHE_CONTROL = 'public, no-cache';
+
+// The populated category is part of the body, and may be null once deleted
+const categoryVersion = (product) =>
+  product.categoryId ? [product.categoryId._id, product.categoryId.updatedAt] : null;
 
 const createProduct = asyncHandler(async (req, res) => {
 
@@ -17,24 +38,57 @@ const createProduct = asyncHandler(async (req, res) => {
 const getAllProducts = asyncHandler(async (req, res) => {
 
   const result = await ProductService.getAllProducts(req.query);
+  const { page, limit, total, pages, nextCursor } = result.pagination;
+
+  await sendCacheable(req, res, {
+    serialize: serializeProductList,
+    body: {
+      success: true,
+      count: result.products.length,
+      data: result.products,
+      pagination: result.pagination,
+    },
+    etag: entityTag(
+      result.products.map((product) => [product._id, product.updatedAt, categoryVersion(product)]),
+      [page, limit, total, pages, nextCursor]
+    ),
+    cacheControl: PRODUCT_LIST_CACHE_CONTROL,
+  });
+});
 
-  res.status(200).json({
+const searchProducts = asyncHandler(async (req, res) => {
+  const result = await ProductService.searchProducts(req.query);
+
+  sendSerialized(res, serializeSearchResults, {
     success: true,
     count: result.products.length,
-    total: result.total,
-    page: result.page,
-    pages: result.pages,
     data: result.products,
+    pagination: result.pagination,
+  });
+});
+
+const suggestProducts = asyncHandler(async (req, res) => {
+  const suggestions = await ProductService.suggestProducts(req.query.q);
+
+  sendSerialized(res, serializeSuggestions, {
+    success: true,
+    count: suggestions.length,
+    data: suggestions,
   });
 });
 
 const getProductBySlug = asyncHandler(async (req, res) => {
   const { slug } = req.params;
   const product = await ProductService.getProductBySlug(slug);
-
-  res.status(200).json({
-    success: true,
-    data: product,
+  ViewTrackingService.track(product._id, product.slug); // Buffered, written in batches
+
+  // 'views' is flushed without touching updatedAt, so it is part of the
+  // tag and there is no Last-Modified
+  await sendCacheable(req, res, {
+    serialize: serializeProductDetail,
+    body: { success: true, data: product },
+    etag: entityTag(product._id, product.updatedAt, product.views, categoryVersion(product)),
+    cacheControl: PRODUCT_DETAIL_CACHE_CONTROL,
   });
 });
 
@@ -63,9 +117,49 @@ const deleteProduct = asyncHandler(async (req, res) => {
   });
 });
 
+// Bulk uploads are read from the request stream, never buffered; express.json
+// leaves these content types alone
+const uploadFormat = (req) => {
+  if (req.is('text/csv')) return 'csv';
+  if (req.is(['application/x-ndjson', 'application/ndjson', 'application/jsonl'])) return 'ndjson';
+  return null;
+};
+
+const uploadStream = (req) => {
+  if (req.headers['content-encoding'] === 'gzip') {
+    // Errors on either side surface in the importer's read loop
+    return pipeline(req, zlib.createGunzip(), () => {});
+  }
+  return req;
+};
+
+const bulkUpload = (apply) => asyncHandler(async (req, res) => {
+  const format = uploadFormat(req);
+  if (!format) {
+    res.status(415);
+    throw new Error('Upload must be CSV (text/csv) or NDJSON (application/x-ndjson)');
+  }
+
+  const report = await apply(uploadStream(req), format);
+
+  res.status(200).json({
+    success: true,
+    data: report,
+    message: `Processed ${report.rows} rows, ${report.failed} failed`,
+  });
+});
+
+const importProducts = bulkUpload((stream, format) => ProductImportService.importProducts(stream, format));
+
+const updateProductsBulk = bulkUpload((stream, format) => ProductImportService.updateProducts(stream, format));
+
 module.exports = {
   createProduct,
+  importProducts,
+  updateProductsBulk,
   getAllProducts,
+  searchProducts,
+  suggestProducts,
   getProductBySlug,
   updateProduct,
   deleteProduct,
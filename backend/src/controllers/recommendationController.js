@@ -0,0 +1,31 @@
+const RecommendationService = require('../services/recommendationService');
+const asyncHandler = require('../utils/asyncHandler');
+
+const getMyRecommendations = asyncHandler(async (req, res) => {
+  // req.query is read-only under Express 5, so the validator cannot convert
+  // 'limit'; it is parsed here (undefined keeps the service default)
+  const limit = req.query.limit === undefined ? undefined : parseInt(req.query.limit, 10);
+  const { source, products } = await RecommendationService.getRecommendations(req.user.id, limit);
+
+  res.status(200).json({
+    success: true,
+    source,
+    count: products.length,
+    data: products,
+  });
+});
+
+const getRecommendationsBatch = asyncHandler(async (req, res) => {
+  const recommendations = await RecommendationService.getRecommendationsBatch(req.body.userIds, req.body.limit);
+
+  res.status(200).json({
+    success: true,
+    count: recommendations.length,
+    data: recommendations,
+  });
+});
+
+module.exports = {
+  getMyRecommendations,
+  getRecommendationsBatch,
+};
@@ -0,0 +1,54 @@
+/**
+ * Rebuilds analytics_daily from the orders collection.
+ *
+ *   npm run backfill:analytics                      # every day before today
+ *   npm run backfill:analytics -- 2025-01-01 2025-02-01
+ *
+ * The range is [from, to) in UTC days. 'to' defaults to the start of today,
+ * so the live rollup of the current day (still receiving increments from
+ * checkouts) is not overwritten.
+ */
+const dotenv = require('dotenv');
+
+dotenv.config({ path: '.env' });
+
+const mongoose = require('mongoose');
+const connectDB = require('../config/mongoDataBaseConnection');
+const AnalyticsService = require('../services/analyticsService');
+const { startOfDay } = require('../services/analyticsService');
+const Order = require('../models/orderModel');
+
+const parseDate = (value, name) => {
+  const date = new Date(value);
+  if (Number.isNaN(date.getTime())) {
+    throw new Error(`Invalid ${name} date: ${value}`);
+  }
+  return date;
+};
+
+const run = async () => {
+  const [fromArg, toArg] = process.argv.slice(2);
+  await connectDB();
+
+  let from = fromArg ? parseDate(fromArg, 'from') : null;
+  const to = toArg ? parseDate(toArg, 'to') : startOfDay(new Date());
+  if (!from) {
+    const first = await Order.findOne().sort({ createdAt: 1 }).select('createdAt').lean();
+    from = first ? first.createdAt : to;
+  }
+
+  const started = Date.now();
+  const { days, orders } = await AnalyticsService.rebuild(from, to);
+  console.log(
+    `Rebuilt ${days} daily rollups from ${orders} orders ` +
+      `(${startOfDay(from).toISOString().slice(0, 10)} to ${startOfDay(to).toISOString().slice(0, 10)}) ` +
+      `in ${((Date.now() - started) / 1000).toFixed(1)}s`
+  );
+};
+
+run()
+  .catch((error) => {
+    console.error(`Analytics backfill failed: ${error.message}`);
+    process.exitCode = 1;
+  })
+  .finally(() => mongoose.disconnect());
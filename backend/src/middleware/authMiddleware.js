@@ -1,5 +1,5 @@
 const jwt = require("jsonwebtoken");
-const User = require("../models/userModel");
+const AuthService = require("../services/authService");
 
 const asyncHandler = require('../utils/asyncHandler');
 
@@ -15,7 +15,7 @@ const protect = asyncHandler(async (req, res, next) => {
 
       const decoded = jwt.verify(token, process.env.JWT_SECRET);
 
-      req.user = await User.findById(decoded.id).select("-password");
+      req.user = await AuthService.getPrincipal(decoded.id);
 
       if (!req.user) {
         throw new Error();
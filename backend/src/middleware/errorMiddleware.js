@@ -72,6 +72,22 @@ const errorHandler = (err, req, res, next) => {
     errorCode = 'DUPLICATE_FIELD';
   }
 
+  if (err.message === 'Upload must be CSV (text/csv) or NDJSON (application/x-ndjson)') {
+    statusCode = 415;
+    errorCode = 'UNSUPPORTED_MEDIA_TYPE';
+  }
+  // A gzip upload that does not decompress
+  if (err.code === 'Z_DATA_ERROR' || err.code === 'Z_BUF_ERROR') {
+    message = 'Upload is not valid gzip';
+    statusCode = 400;
+    errorCode = 'VALIDATION_ERROR';
+  }
+
+  if (err.message === 'Invalid pagination cursor') {
+    statusCode = 400;
+    errorCode = 'VALIDATION_ERROR';
+  }
+
   if (err.message === 'Item not found in cart') {
     statusCode = 404;
     errorCode = 'NOT_FOUND';
@@ -88,6 +104,17 @@ const errorHandler = (err, req, res, next) => {
     statusCode = 404;
     errorCode = 'NOT_FOUND';
   }
+  if (err.message === 'Order status was changed by another request, please try again') {
+    statusCode = 409;
+    errorCode = 'CONFLICT';
+  }
+
+  // Password thread pool queue is full (login/register bursts)
+  if (err.message === 'Server is busy, please try again later') {
+    statusCode = 503;
+    errorCode = 'SERVER_BUSY';
+    res.set('Retry-After', '1');
+  }
 
 
   res.status(statusCode).json({
@@ -0,0 +1,59 @@
+const { registry, renderCollected, Histogram } = require('../utils/metrics');
+const clusterBus = require('../utils/clusterBus');
+const { requestContext, routeLabel } = require('../utils/requestContext');
+
+const httpRequestDuration = registry.register(new Histogram({
+  name: 'http_request_duration_seconds',
+  help: 'HTTP request latency by route pattern and status code.',
+  labelNames: ['method', 'route', 'status'],
+  buckets: [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+}));
+
+/**
+ * @desc    Times every request into http_request_duration_seconds and
+ *          runs the rest of the chain inside the request context
+ */
+const recordRequestMetrics = (req, res, next) => {
+  const started = process.hrtime.bigint();
+  const context = { req, route: null };
+
+  res.once('finish', () => {
+    const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    httpRequestDuration.observe(
+      { method: req.method, route: context.route || routeLabel(req), status: res.statusCode },
+      seconds
+    );
+  });
+
+  requestContext.run(context, next);
+};
+
+// Under cluster.js every worker's series carries a 'worker' label, and any
+// worker answering a scrape reports them all
+clusterBus.answer('metrics', () => {
+  const worker = clusterBus.workerId();
+  return registry.collect(worker === null ? {} : { worker });
+});
+
+/**
+ * @desc    Prometheus scrape endpoint. When METRICS_TOKEN is set the
+ *          scraper must send it as a Bearer token.
+ */
+const metricsEndpoint = async (req, res) => {
+  const token = process.env.METRICS_TOKEN;
+  if (token && req.headers.authorization !== `Bearer ${token}`) {
+    res.status(401).json({
+      success: false,
+      error: { code: 'TOKEN_INVALID', message: 'Not authorized, token failed' },
+    });
+    return;
+  }
+
+  res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+  res.status(200).send(renderCollected(await clusterBus.gather('metrics')));
+};
+
+module.exports = {
+  recordRequestMetrics,
+  metricsEndpoint,
+};
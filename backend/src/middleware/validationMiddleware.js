@@ -1,6 +1,7 @@
-const { body, validationResult } = require('express-validator');
+const { body, query, validationResult } = require('express-validator');
 const asyncHandler = require('../utils/asyncHandler');
 const mongoose = require('mongoose');
+const { ORDER_STATUSES } = require('../models/orderModel');
 
 const validate = asyncHandler((req, res, next) => {
   const errors = validationResult(req);
@@ -112,6 +113,62 @@ const productUpdateValidationRules = [
     }),
 ];
 
+const productQueryValidationRules = [
+  query('page')
+    .optional()
+    .isInt({ min: 1 })
+    .withMessage('Page must be a positive integer'),
+  query('limit')
+    .optional()
+    .isInt({ min: 1 })
+    .withMessage('Limit must be a positive integer'),
+  query('category')
+    .optional()
+    .isString()
+    .withMessage('Category must be a string'),
+  query('minPrice')
+    .optional()
+    .isFloat({ min: 0 })
+    .withMessage('minPrice must be a positive number'),
+  query('maxPrice')
+    .optional()
+    .isFloat({ min: 0 })
+    .withMessage('maxPrice must be a positive number'),
+  query('inStock')
+    .optional()
+    .isIn(['true', 'false'])
+    .withMessage('inStock must be true or false'),
+  query('sort')
+    .optional()
+    .isIn(['newest', 'oldest', 'price_asc', 'price_desc', 'rating', 'popular'])
+    .withMessage('Invalid sort option'),
+  query('cursor')
+    .optional()
+    .isString()
+    .withMessage('Cursor must be a string'),
+];
+
+const productSearchValidationRules = [
+  query('q')
+    .notEmpty()
+    .withMessage('Search query is required')
+    .isString()
+    .isLength({ max: 100 })
+    .withMessage('Search query cannot be more than 100 characters'),
+  query('page')
+    .optional()
+    .isInt({ min: 1 })
+    .withMessage('Page must be a positive integer'),
+  query('limit')
+    .optional()
+    .isInt({ min: 1 })
+    .withMessage('Limit must be a positive integer'),
+  query('category')
+    .optional()
+    .isString()
+    .withMessage('Category must be a string'),
+];
+
 const cartItemValidationRules = [
   body('productId')
     .notEmpty()
@@ -127,7 +184,8 @@ const cartItemValidationRules = [
     .notEmpty()
     .withMessage('Quantity is required')
     .isInt({ min: 1 })
-    .withMessage('Quantity must be a positive integer'),
+    .withMessage('Quantity must be a positive integer')
+    .toInt(),
 ];
 
 const cartQtyValidationRules = [
@@ -135,7 +193,8 @@ const cartQtyValidationRules = [
     .notEmpty()
     .withMessage('Quantity is required')
     .isInt({ min: 1 })
-    .withMessage('Quantity must be a positive integer'),
+    .withMessage('Quantity must be a positive integer')
+    .toInt(),
 ];
 
 const orderCreateValidationRules = [
@@ -151,17 +210,127 @@ const orderStatusValidationRules = [
     .withMessage('Status is required')
     .isString()
     .withMessage('Status must be a string')
-    .isIn(['Pending', 'Paid', 'Shipped', 'Delivered', 'Cancelled'])
+    .isIn(ORDER_STATUSES)
     .withMessage('Invalid order status'),
 ];
 
+const orderPageValidationRules = [
+  query('limit')
+    .optional()
+    .isInt({ min: 1 })
+    .withMessage('Limit must be a positive integer'),
+  query('cursor')
+    .optional()
+    .isString()
+    .withMessage('Cursor must be a string'),
+];
+
+const orderQueryValidationRules = [
+  ...orderPageValidationRules,
+  query('status')
+    .optional()
+    .isIn(ORDER_STATUSES)
+    .withMessage('Invalid order status'),
+  query('userId')
+    .optional()
+    .isMongoId()
+    .withMessage('Invalid User ID format'),
+  query('from')
+    .optional()
+    .isISO8601()
+    .withMessage('from must be an ISO 8601 date'),
+  query('to')
+    .optional()
+    .isISO8601()
+    .withMessage('to must be an ISO 8601 date'),
+];
+
+const orderExportValidationRules = [
+  query('format')
+    .optional()
+    .isIn(['csv', 'ndjson'])
+    .withMessage('format must be csv or ndjson'),
+  query('status')
+    .optional()
+    .isIn(ORDER_STATUSES)
+    .withMessage('Invalid order status'),
+  query('userId')
+    .optional()
+    .isMongoId()
+    .withMessage('Invalid User ID format'),
+  query('from')
+    .optional()
+    .isISO8601()
+    .withMessage('from must be an ISO 8601 date'),
+  query('to')
+    .optional()
+    .isISO8601()
+    .withMessage('to must be an ISO 8601 date'),
+  query('after')
+    .optional()
+    .isMongoId()
+    .withMessage('after must be an order ID'),
+];
+
+const analyticsQueryValidationRules = [
+  query('from')
+    .optional()
+    .isISO8601()
+    .withMessage('from must be an ISO 8601 date'),
+  query('to')
+    .optional()
+    .isISO8601()
+    .withMessage('to must be an ISO 8601 date'),
+  query('interval')
+    .optional()
+    .isIn(['day', 'week', 'month'])
+    .withMessage('Interval must be day, week or month'),
+  query('limit')
+    .optional()
+    .isInt({ min: 1 })
+    .withMessage('Limit must be a positive integer'),
+  query('productId')
+    .optional()
+    .isMongoId()
+    .withMessage('Invalid Product ID format'),
+];
+
+const recommendationQueryValidationRules = [
+  query('limit')
+    .optional()
+    .isInt({ min: 1, max: 50 })
+    .withMessage('Limit must be between 1 and 50'),
+];
+
+const recommendationBatchValidationRules = [
+  body('userIds')
+    .isArray({ min: 1, max: 500 })
+    .withMessage('userIds must be an array of 1 to 500 user IDs'),
+  body('userIds.*')
+    .isMongoId()
+    .withMessage('Invalid User ID format'),
+  body('limit')
+    .optional()
+    .isInt({ min: 1, max: 50 })
+    .withMessage('Limit must be between 1 and 50')
+    .toInt(),
+];
+
 module.exports = {
   validate,
   categoryValidationRules,
   productValidationRules,
   productUpdateValidationRules,
+  productQueryValidationRules,
+  productSearchValidationRules,
   cartItemValidationRules,
   cartQtyValidationRules,
   orderCreateValidationRules,
-  orderStatusValidationRules
+  orderStatusValidationRules,
+  orderPageValidationRules,
+  orderQueryValidationRules,
+  orderExportValidationRules,
+  analyticsQueryValidationRules,
+  recommendationQueryValidationRules,
+  recommendationBatchValidationRules,
 };
\ No newline at end of file
@@ -0,0 +1,43 @@
+const mongoose = require('mongoose');
+const { ORDER_STATUSES } = require('./orderModel');
+
+const productDaySchema = new mongoose.Schema(
+  {
+    name: { type: String },
+    units: { type: Number, default: 0 },
+    revenue: { type: Number, default: 0 },
+  },
+  { _id: false }
+);
+
+// One rollup per UTC day of orders, maintained by analyticsService as
+// orders are created and change status. Revenue, units and products leave
+// out cancelled orders; ordersByStatus counts the day's orders by their
+// current status.
+const analyticsDailySchema = new mongoose.Schema(
+  {
+    date: {
+      type: Date,
+      required: true,
+      unique: true,
+    },
+    revenue: { type: Number, default: 0 },
+    orders: { type: Number, default: 0 },
+    units: { type: Number, default: 0 },
+    ordersByStatus: Object.fromEntries(
+      ORDER_STATUSES.map((status) => [status, { type: Number, default: 0 }])
+    ),
+    // Keyed by productId, so an order can $inc its lines in a single update
+    products: {
+      type: Map,
+      of: productDaySchema,
+      default: {},
+    },
+  },
+  {
+    timestamps: true,
+    collection: 'analytics_daily',
+  }
+);
+
+module.exports = mongoose.model('AnalyticsDaily', analyticsDailySchema);
@@ -0,0 +1,22 @@
+const mongoose = require('mongoose');
+
+// Named sequences (e.g. 'orderNumber'). Processes reserve blocks of values
+// with one atomic $inc each; see utils/blockAllocator.js.
+const counterSchema = new mongoose.Schema(
+  {
+    _id: {
+      type: String,
+    },
+    // Last value handed out in any block
+    seq: {
+      type: Number,
+      default: 0,
+    },
+  },
+  {
+    versionKey: false,
+    collection: 'counters',
+  }
+);
+
+module.exports = mongoose.model('Counter', counterSchema);
@@ -1,5 +1,7 @@
 const mongoose = require('mongoose');
 
+const ORDER_STATUSES = ['Pending', 'Paid', 'Shipped', 'Delivered', 'Cancelled'];
+
 const orderItemSchema = new mongoose.Schema({
   productId: {
     type: mongoose.Schema.Types.ObjectId,
@@ -38,7 +40,6 @@ const orderSchema = new mongoose.Schema(
       type: mongoose.Schema.Types.ObjectId,
       ref: 'User',
       required: true,
-      index: true,
     },
     orderNumber: {
       type: String,
@@ -74,7 +75,7 @@ const orderSchema = new mongoose.Schema(
     status: {
       type: String,
       required: true,
-      enum: ['Pending', 'Paid', 'Shipped', 'Delivered', 'Cancelled'],
+      enum: ORDER_STATUSES,
       default: 'Pending',
     },
     paymentId: {
@@ -97,5 +98,12 @@ const orderSchema = new mongoose.Schema(
   }
 );
 
+// List indexes (orderService.getMyOrders/getAllOrders): newest first with _id
+// as the tie-breaker, so keyset pages are range scans on the index. The
+// userId-prefixed one also serves plain userId lookups.
+orderSchema.index({ userId: 1, createdAt: -1, _id: -1 });
+orderSchema.index({ createdAt: -1, _id: -1 });
+orderSchema.index({ status: 1, createdAt: -1, _id: -1 });
 
-module.exports = mongoose.model('Order', orderSchema);
\ No newline at end of file
+module.exports = mongoose.model('Order', orderSchema);
+module.exports.ORDER_STATUSES = ORDER_STATUSES;
\ No newline at end of file
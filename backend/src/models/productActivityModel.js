@@ -0,0 +1,38 @@
+const mongoose = require('mongoose');
+
+// Hourly activity counters per product, written by activityService and read
+// by the ML service's trending scorer. One document per (product, hour).
+const productActivitySchema = new mongoose.Schema(
+  {
+    productId: {
+      type: mongoose.Schema.Types.ObjectId,
+      ref: 'Product',
+      required: true,
+    },
+    // Start of the hour (UTC) the counts belong to
+    hour: {
+      type: Date,
+      required: true,
+    },
+    views: {
+      type: Number,
+      default: 0,
+    },
+    purchases: {
+      type: Number,
+      default: 0,
+    },
+  },
+  {
+    timestamps: true,
+    collection: 'product_activity',
+  }
+);
+
+productActivitySchema.index({ productId: 1, hour: 1 }, { unique: true });
+// The trending scorer polls for buckets changed since its last read
+productActivitySchema.index({ updatedAt: 1 });
+// Buckets roll off a day after they leave the 7-day trending window
+productActivitySchema.index({ hour: 1 }, { expireAfterSeconds: 8 * 24 * 60 * 60 });
+
+module.exports = mongoose.model('ProductActivity', productActivitySchema);
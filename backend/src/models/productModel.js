@@ -44,7 +44,6 @@ const productSchema = new mongoose.Schema(
       type: mongoose.Schema.Types.ObjectId,
       ref: 'Category',
       required: [true, 'Category is required'],
-      index: true,
     },
     images: [
       {
@@ -79,9 +78,22 @@ const productSchema = new mongoose.Schema(
 
 productSchema.index({ name: 'text', description: 'text' });
 
+// Listing indexes: one per sort option in productService, each ending in _id
+// so keyset pagination stays on the index. The categoryId-prefixed ones also
+// cover plain category lookups, so categoryId needs no index of its own.
+productSchema.index({ createdAt: -1, _id: -1 });
+productSchema.index({ categoryId: 1, createdAt: -1, _id: -1 });
+productSchema.index({ price: 1, _id: 1 });
+productSchema.index({ categoryId: 1, price: 1, _id: 1 });
+productSchema.index({ rating: -1, _id: -1 });
+productSchema.index({ purchases: -1, _id: -1 });
+
+// Also used by the bulk import, whose bulkWrite skips the save hook
+productSchema.statics.slugFor = (name) => slugify(name, { lower: true, strict: true });
+
 productSchema.pre('save', function (next) {
   if (this.isModified('name')) {
-    this.slug = slugify(this.name, { lower: true, strict: true });
+    this.slug = this.constructor.slugFor(this.name);
   }
   next();
 });
@@ -1,5 +1,5 @@
 const mongoose = require('mongoose');
-const bcrypt = require('bcryptjs');
+const PasswordService = require('../services/passwordService');
 
 
 const addressSchema = new mongoose.Schema({
@@ -70,13 +70,42 @@ userSchema.pre('save', async function (next) {
     return next();
   }
 
-  const salt = await bcrypt.genSalt(10); // A salt is a random string of data. bcrypt generates this random string and adds it to your plain-text password before it gets hashed.
-  this.password = await bcrypt.hash(this.password, salt);
+  // Hashed with a fresh salt at BCRYPT_COST, in the password thread pool
+  this.password = await PasswordService.hash(this.password);
   next();
 });
 
+// Drop the cached principal used by the 'protect' middleware whenever a
+// user's role/profile changes or the user is deleted. Required lazily
+// because authService itself depends on this model.
+const invalidatePrincipal = async (user) => {
+  if (user) {
+    await require('../services/authService').invalidatePrincipal(user._id);
+  }
+};
+
+userSchema.post('save', invalidatePrincipal);
+userSchema.post('findOneAndUpdate', invalidatePrincipal);
+userSchema.post('findOneAndDelete', invalidatePrincipal);
+userSchema.post('deleteOne', { document: true, query: false }, invalidatePrincipal);
+
+// Query-level writes do not hand the hook a document: one user when the
+// filter names its _id, otherwise every cached principal is dropped
+const invalidateFilteredPrincipals = async function () {
+  const { _id: id } = this.getFilter();
+  const authService = require('../services/authService');
+  if (typeof id === 'string' || id instanceof mongoose.Types.ObjectId) {
+    await authService.invalidatePrincipal(id);
+  } else {
+    await authService.invalidateAllPrincipals();
+  }
+};
+
+userSchema.post(['updateOne', 'deleteOne'], { document: false, query: true }, invalidateFilteredPrincipals);
+userSchema.post(['updateMany', 'deleteMany', 'replaceOne'], invalidateFilteredPrincipals);
+
 userSchema.methods.matchPassword = async function (enteredPassword) {
-  return await bcrypt.compare(enteredPassword, this.password);
+  return await PasswordService.compare(enteredPassword, this.password);
 };
 
 module.exports = mongoose.model('User', userSchema);
\ No newline at end of file
@@ -0,0 +1,24 @@
+const express = require('express');
+const { protect, authorize } = require('../middleware/authMiddleware');
+const {
+  validate,
+  analyticsQueryValidationRules,
+} = require('../middleware/validationMiddleware');
+const {
+  getDashboard,
+  getRevenue,
+  getProductPerformance,
+  getOrderStats,
+} = require('../controllers/analyticsController');
+
+const router = express.Router();
+
+// --- Admin/Owner Only Routes ---
+router.use(protect, authorize('admin', 'owner'));
+
+router.route('/dashboard').get(getDashboard);
+router.route('/revenue').get(analyticsQueryValidationRules, validate, getRevenue);
+router.route('/products').get(analyticsQueryValidationRules, validate, getProductPerformance);
+router.route('/orders').get(analyticsQueryValidationRules, validate, getOrderStats);
+
+module.exports = router;
@@ -4,12 +4,16 @@ const {
   validate,
   orderCreateValidationRules,
   orderStatusValidationRules,
+  orderPageValidationRules,
+  orderQueryValidationRules,
+  orderExportValidationRules,
 } = require('../middleware/validationMiddleware');
 const {
   createOrder,
   getMyOrders,
   getOrderById,
   getAllOrders,
+  exportOrders,
   updateOrderStatus,
 } = require('../controllers/orderController');
 
@@ -18,14 +22,17 @@ const router = express.Router();
 router.use(protect);
 
 
-router.route('/my').get(getMyOrders);
+router.route('/my').get(orderPageValidationRules, validate, getMyOrders);
 
 router.route('/').post(orderCreateValidationRules, validate, createOrder);
 
+// Before '/:id' so 'export' is not read as an order id
+router.route('/export').get(authorize('admin', 'owner'), orderExportValidationRules, validate, exportOrders);
+
 router.route('/:id').get(getOrderById);
 
 
-router.route('/').get(authorize('admin', 'owner'), getAllOrders);
+router.route('/').get(authorize('admin', 'owner'), orderQueryValidationRules, validate, getAllOrders);
 
 router.route('/:id/status').patch(authorize('admin', 'owner'), orderStatusValidationRules, validate, updateOrderStatus);
 
@@ -4,10 +4,16 @@ const {
   validate,
   productValidationRules,
   productUpdateValidationRules,
+  productQueryValidationRules,
+  productSearchValidationRules,
 } = require('../middleware/validationMiddleware');
 const {
   createProduct,
+  importProducts,
+  updateProductsBulk,
   getAllProducts,
+  searchProducts,
+  suggestProducts,
   getProductBySlug,
   updateProduct,
   deleteProduct,
@@ -17,7 +23,10 @@ const router = express.Router();
 
 // --- Public Routes ---
 
-router.route('/').get(getAllProducts);
+router.route('/').get(productQueryValidationRules, validate, getAllProducts);
+// Must be registered before '/:slug' so 'search' is not read as a slug
+router.route('/search').get(productSearchValidationRules, validate, searchProducts);
+router.route('/search/suggest').get(productSearchValidationRules, validate, suggestProducts);
 router.route('/:slug').get(getProductBySlug);
 
 
@@ -25,6 +34,13 @@ router.route('/:slug').get(getProductBySlug);
 
 router.route('/').post(protect, authorize('admin', 'owner'), productValidationRules, validate, createProduct);
 
+// Streamed CSV/NDJSON uploads: POST creates or replaces products by SKU,
+// PATCH sets price/stock of existing ones
+router
+  .route('/bulk')
+  .post(protect, authorize('admin', 'owner'), importProducts)
+  .patch(protect, authorize('admin', 'owner'), updateProductsBulk);
+
 router.route('/:id').put(protect, authorize('admin', 'owner'), productUpdateValidationRules, validate, updateProduct);
 
 router.route('/:id').delete(protect, authorize('admin', 'owner'), deleteProduct);
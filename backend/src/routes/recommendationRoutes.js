@@ -0,0 +1,23 @@
+const express = require('express');
+const { protect, authorize } = require('../middleware/authMiddleware');
+const {
+  validate,
+  recommendationQueryValidationRules,
+  recommendationBatchValidationRules,
+} = require('../middleware/validationMiddleware');
+const {
+  getMyRecommendations,
+  getRecommendationsBatch,
+} = require('../controllers/recommendationController');
+
+const router = express.Router();
+
+// --- Customer Routes ---
+router.route('/').get(protect, recommendationQueryValidationRules, validate, getMyRecommendations);
+
+// --- Admin/Owner Only Routes ---
+router
+  .route('/batch')
+  .post(protect, authorize('admin', 'owner'), recommendationBatchValidationRules, validate, getRecommendationsBatch);
+
+module.exports = router;
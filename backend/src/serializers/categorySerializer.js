@@ -0,0 +1,18 @@
+const Category = require('../models/categoryModel');
+const { compileSerializer, schemaFromModel, allFields } = require('../utils/serializer');
+
+const CATEGORY_FIELDS = allFields(Category.schema);
+const category = schemaFromModel(Category.schema, CATEGORY_FIELDS);
+
+module.exports = {
+  CATEGORY_FIELDS,
+  serializeCategoryList: compileSerializer({
+    success: 'boolean',
+    count: 'number',
+    data: [category],
+  }),
+  serializeCategory: compileSerializer({
+    success: 'boolean',
+    data: category,
+  }),
+};
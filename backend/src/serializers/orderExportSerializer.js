@@ -0,0 +1,68 @@
+/**
+ * Formats for GET /orders/export. Both write a batch of lean orders (with
+ * userId replaced by { _id, email, firstName, lastName }) as one string.
+ */
+
+// One row per order item, with the order's columns repeated on each row
+const CSV_COLUMNS = [
+  ['orderId', (order) => order._id],
+  ['orderNumber', (order) => order.orderNumber],
+  ['createdAt', (order) => order.createdAt],
+  ['status', (order) => order.status],
+  ['userId', (order) => (order.userId._id || order.userId)],
+  ['userEmail', (order) => order.userId.email],
+  ['subtotal', (order) => order.subtotal],
+  ['tax', (order) => order.tax],
+  ['shipping', (order) => order.shipping],
+  ['total', (order) => order.total],
+  ['paidAt', (order) => order.paidAt],
+  ['shippedAt', (order) => order.shippedAt],
+  ['deliveredAt', (order) => order.deliveredAt],
+  ['shippingCity', (order) => order.shippingAddress && order.shippingAddress.city],
+  ['shippingCountry', (order) => order.shippingAddress && order.shippingAddress.country],
+  ['productId', (order, item) => item && item.productId],
+  ['productName', (order, item) => item && item.name],
+  ['quantity', (order, item) => item && item.quantity],
+  ['price', (order, item) => item && item.price],
+];
+
+const CSV_HEADER = `${CSV_COLUMNS.map(([name]) => name).join(',')}\n`;
+
+const csvField = (value) => {
+  if (value === undefined || value === null) {
+    return '';
+  }
+  let text = value instanceof Date ? value.toISOString() : String(value);
+  // A leading =, +, - or @ would run as a formula when the export is
+  // opened in a spreadsheet; numbers are written as they are
+  if (typeof value === 'string' && /^[=+\-@\t\r]/.test(text)) {
+    text = `'${text}`;
+  }
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+const toCsvRows = (orders) => {
+  let out = '';
+  for (const order of orders) {
+    // An order without items still gets a row
+    const items = order.items && order.items.length > 0 ? order.items : [null];
+    for (const item of items) {
+      out += `${CSV_COLUMNS.map(([, read]) => csvField(read(order, item))).join(',')}\n`;
+    }
+  }
+  return out;
+};
+
+const toNdjson = (orders) => {
+  let out = '';
+  for (const order of orders) {
+    out += `${JSON.stringify(order)}\n`;
+  }
+  return out;
+};
+
+module.exports = {
+  CSV_HEADER,
+  toCsvRows,
+  toNdjson,
+};
@@ -0,0 +1,49 @@
+const Product = require('../models/productModel');
+const { compileSerializer, schemaFromModel, allFields } = require('../utils/serializer');
+
+// Card view: what a product list or search result shows. createdAt is
+// the default sort key, which keyset cursors are built from.
+const PRODUCT_CARD_FIELDS = 'name slug price images rating reviewCount stock categoryId createdAt';
+// Detail view: the whole product page
+const PRODUCT_DETAIL_FIELDS = allFields(Product.schema);
+
+const CATEGORY_REF = { _id: 'objectId', name: 'string', slug: 'string' };
+const PAGINATION = {
+  page: 'number',
+  limit: 'number',
+  total: 'number',
+  pages: 'number',
+  nextCursor: 'string',
+  hasNextPage: 'boolean',
+};
+
+const productCard = schemaFromModel(Product.schema, PRODUCT_CARD_FIELDS, { categoryId: CATEGORY_REF });
+const searchResult = schemaFromModel(Product.schema, PRODUCT_CARD_FIELDS, { score: 'number' });
+const suggestion = schemaFromModel(Product.schema, 'name slug price images');
+const productDetail = schemaFromModel(Product.schema, PRODUCT_DETAIL_FIELDS, { categoryId: CATEGORY_REF });
+
+module.exports = {
+  PRODUCT_CARD_FIELDS,
+  PRODUCT_DETAIL_FIELDS,
+  serializeProductList: compileSerializer({
+    success: 'boolean',
+    count: 'number',
+    data: [productCard],
+    pagination: PAGINATION,
+  }),
+  serializeSearchResults: compileSerializer({
+    success: 'boolean',
+    count: 'number',
+    data: [searchResult],
+    pagination: PAGINATION,
+  }),
+  serializeSuggestions: compileSerializer({
+    success: 'boolean',
+    count: 'number',
+    data: [suggestion],
+  }),
+  serializeProductDetail: compileSerializer({
+    success: 'boolean',
+    data: productDetail,
+  }),
+};
@@ -1,20 +1,37 @@
 const express = require('express');
 const dotenv = require('dotenv');
+
+// Load env before the other modules so config read at require time sees it
+dotenv.config({ path: '.env' });
+
 const connectDB = require('./config/mongoDataBaseConnection');
+const { isConnected, connectionState, disconnectDB } = connectDB;
 const helmet = require('helmet');
 const { errorHandler } = require('./middleware/errorMiddleware');
+const { recordRequestMetrics, metricsEndpoint } = require('./middleware/metricsMiddleware');
 const authRoutes = require('./routes/authRoutes');
 const categoryRoutes = require('./routes/categoryRoutes');
 const productRoutes = require('./routes/productRoutes');
 const cartRoutes = require('./routes/cartRoutes');
 const orderRoutes = require('./routes/orderRoutes');
+const analyticsRoutes = require('./routes/analyticsRoutes');
+const recommendationRoutes = require('./routes/recommendationRoutes');
+const CacheService = require('./services/cacheService');
+const AuthService = require('./services/authService');
+const ViewTrackingService = require('./services/viewTrackingService');
+const RecommendationService = require('./services/recommendationService');
+const PasswordService = require('./services/passwordService');
+const Lifecycle = require('./utils/lifecycle');
+const clusterBus = require('./utils/clusterBus');
 
-dotenv.config({ path: '.env' });
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.SHUTDOWN_TIMEOUT_MS, 10) || 25000;
 
 connectDB();
 
 const app = express();
 
+app.use(recordRequestMetrics);
+app.use(Lifecycle.trackRequests);
 app.use(helmet());
 app.use(express.json({ limit: '10kb' })); // Body parser with payload limit
 
@@ -34,14 +51,84 @@ app.use('/api/v1/categories', categoryRoutes);
 app.use('/api/v1/products', productRoutes);
 app.use('/api/v1/cart', cartRoutes);
 app.use('/api/v1/orders', orderRoutes);
+app.use('/api/v1/analytics', analyticsRoutes);
+app.use('/api/v1/recommendations', recommendationRoutes);
+app.get('/api/v1/metrics', metricsEndpoint);
+// Liveness: the process is up and its event loop answers. No dependency
+// checks, so a database outage never gets healthy workers restarted.
+app.get('/api/v1/health/live', (req, res) => {
+  res.status(200).json({ success: true, status: 'alive', pid: process.pid, uptime: process.uptime() });
+});
+// Readiness: send traffic here only while MongoDB is connected and the
+// worker is not draining for shutdown
+app.get('/api/v1/health/ready', (req, res) => {
+  const database = connectionState();
+  if (Lifecycle.isDraining() || !isConnected()) {
+    res.status(503).json({
+      success: false,
+      status: Lifecycle.isDraining() ? 'draining' : 'unavailable',
+      database,
+      error: { code: 'SERVICE_UNAVAILABLE', message: 'Server is not ready to accept traffic' },
+    });
+    return;
+  }
+  res.status(200).json({ success: true, status: 'ready', database });
+});
 // Simple health check route
-app.get('/api/v1/health', (req, res) => {
-  res.status(200).json({ success: true, message: 'API is healthy' });
+app.get('/api/v1/health', async (req, res) => {
+  res.status(200).json({
+    success: true,
+    message: 'API is healthy',
+    // Counters below are this process's; under cluster.js each worker keeps its own
+    worker: clusterBus.workerId(),
+    pid: process.pid,
+    database: connectionState(),
+    lifecycle: Lifecycle.stats(),
+    cache: await CacheService.stats(),
+    authCache: await AuthService.principalCacheStats(),
+    passwords: PasswordService.stats(),
+    views: ViewTrackingService.stats(),
+    recommendations: await RecommendationService.stats(),
+  });
 });
 
 app.use(errorHandler);
 const PORT = process.env.PORT || 5000;
 
-app.listen(PORT, () => {
-  console.log(`Server running in ${process.env.NODE_ENV} mode at: http://localhost:${PORT}`);
+const server = app.listen(PORT, () => {
+  console.log(`Server running in ${process.env.NODE_ENV} mode at: http://localhost:${PORT} (pid ${process.pid})`);
 });
+
+ViewTrackingService.start();
+RecommendationService.start();
+
+/**
+ * Graceful shutdown: readiness turns 503 and the listener closes, in-flight
+ * requests and checkout transactions get up to SHUTDOWN_TIMEOUT_MS to
+ * finish, then buffered views are written and the pool is closed. Under
+ * cluster.js the primary sends SIGTERM to every worker.
+ */
+let shuttingDown = false;
+const shutdown = async (signal) => {
+  if (shuttingDown) {
+    return; // Ctrl+C reaches the workers and the primary forwards it too
+  }
+  shuttingDown = true;
+  const { requests, transactions } = Lifecycle.stats();
+  console.log(`${signal} received, draining ${requests} requests and ${transactions} transactions`);
+
+  // Last resort if closing the pool or flushing views hangs
+  setTimeout(() => process.exit(1), SHUTDOWN_TIMEOUT_MS + 5000).unref();
+
+  const drained = await Lifecycle.drain(server, SHUTDOWN_TIMEOUT_MS);
+  if (!drained) {
+    const left = Lifecycle.stats();
+    console.warn(`Shutdown timed out with ${left.requests} requests and ${left.transactions} transactions open`);
+  }
+  await ViewTrackingService.stop();
+  RecommendationService.stop();
+  await disconnectDB();
+  process.exit(drained ? 0 : 1);
+};
+process.once('SIGTERM', () => shutdown('SIGTERM'));
+process.once('SIGINT', () => shutdown('SIGINT'));
@@ -0,0 +1,45 @@
+const ProductActivity = require('../models/productActivityModel');
+
+const HOUR_MS = 60 * 60 * 1000;
+
+const hourBucket = (date = new Date()) =>
+  new Date(Math.floor(date.getTime() / HOUR_MS) * HOUR_MS);
+
+class ActivityService {
+  /**
+   * @desc    Adds counts to the current hour's bucket of each product, as
+   *          one unordered bulkWrite of upserts.
+   * @param   {Map<string, number>|Array<[string, number]>} counts - productId -> count
+   * @param   {'views'|'purchases'} field
+   */
+  async record(counts, field, date = new Date()) {
+    const hour = hourBucket(date);
+    const ops = [];
+    for (const [productId, count] of counts) {
+      if (count > 0) {
+        ops.push({
+          updateOne: {
+            filter: { productId, hour },
+            update: { $inc: { [field]: count } },
+            upsert: true,
+          },
+        });
+      }
+    }
+    if (ops.length > 0) {
+      await ProductActivity.bulkWrite(ops, { ordered: false });
+    }
+  }
+
+  async recordPurchases(items) {
+    const counts = new Map();
+    for (const item of items) {
+      const productId = item.productId.toString();
+      counts.set(productId, (counts.get(productId) || 0) + item.quantity);
+    }
+    await this.record(counts, 'purchases');
+  }
+}
+
+module.exports = new ActivityService();
+module.exports.hourBucket = hourBucket;
@@ -0,0 +1,268 @@
+const AnalyticsDaily = require('../models/analyticsDailyModel');
+const Order = require('../models/orderModel');
+const { ORDER_STATUSES } = require('../models/orderModel');
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const DEFAULT_RANGE_DAYS = 30;
+const BACKFILL_BATCH_SIZE = 1000;
+const UPSERT_OPTIONS = { upsert: true, setDefaultsOnInsert: false };
+
+const startOfDay = (date) => {
+  const d = new Date(date);
+  return new Date(Date.UTC(d.getUTCFullYear(), d.getUTCMonth(), d.getUTCDate()));
+};
+
+const round2 = (value) => Math.round(value * 100) / 100;
+
+// $inc for an order's revenue, units and product lines, scaled by 'sign'
+const orderAmounts = (order, sign) => {
+  const inc = { revenue: sign * order.total, units: 0 };
+  for (const item of order.items) {
+    const key = `products.${item.productId}`;
+    inc.units += sign * item.quantity;
+    inc[`${key}.units`] = (inc[`${key}.units`] || 0) + sign * item.quantity;
+    inc[`${key}.revenue`] = (inc[`${key}.revenue`] || 0) + sign * item.price * item.quantity;
+  }
+  return inc;
+};
+
+// A rollup built in memory from a day's orders (backfill)
+const emptyRollup = (date) => ({
+  date,
+  revenue: 0,
+  orders: 0,
+  units: 0,
+  ordersByStatus: Object.fromEntries(ORDER_STATUSES.map((status) => [status, 0])),
+  products: {},
+});
+
+class AnalyticsService {
+  // --- Writes ---
+
+  async recordOrderCreated(order) {
+    const $set = {};
+    for (const item of order.items) {
+      $set[`products.${item.productId}.name`] = item.name;
+    }
+
+    await AnalyticsDaily.updateOne(
+      { date: startOfDay(order.createdAt) },
+      {
+        $inc: { orders: 1, [`ordersByStatus.${order.status}`]: 1, ...orderAmounts(order, 1) },
+        $set,
+      },
+      UPSERT_OPTIONS
+    );
+  }
+
+  async recordStatusChange(order, previousStatus) {
+    if (previousStatus === order.status) {
+      return;
+    }
+
+    const $inc = {
+      [`ordersByStatus.${previousStatus}`]: -1,
+      [`ordersByStatus.${order.status}`]: 1,
+    };
+    // Cancelling takes the order out of revenue; un-cancelling puts it back
+    if (order.status === 'Cancelled') {
+      Object.assign($inc, orderAmounts(order, -1));
+    } else if (previousStatus === 'Cancelled') {
+      Object.assign($inc, orderAmounts(order, 1));
+    }
+
+    await AnalyticsDaily.updateOne({ date: startOfDay(order.createdAt) }, { $inc }, UPSERT_OPTIONS);
+  }
+
+  /**
+   * @desc    Recomputes the rollups of [from, to) from the orders collection.
+   *          Orders are streamed by createdAt with a cursor, so only one
+   *          day is held in memory; each finished day replaces its rollup.
+   *          Days in the range without orders lose their rollup.
+   * @returns {{ days: number, orders: number }}
+   */
+  async rebuild(from, to) {
+    const rangeStart = startOfDay(from);
+    const rangeEnd = startOfDay(to);
+    const written = [];
+    let orders = 0;
+    let rollup = null;
+
+    const writeRollup = async () => {
+      rollup.revenue = round2(rollup.revenue);
+      await AnalyticsDaily.replaceOne({ date: rollup.date }, rollup, { upsert: true });
+      written.push(rollup.date);
+    };
+
+    const cursor = Order.find({ createdAt: { $gte: rangeStart, $lt: rangeEnd } })
+      .select('createdAt status total items.productId items.name items.quantity items.price')
+      .sort({ createdAt: 1 })
+      .lean()
+      .cursor({ batchSize: BACKFILL_BATCH_SIZE });
+
+    for await (const order of cursor) {
+      const day = startOfDay(order.createdAt);
+      if (!rollup || rollup.date.getTime() !== day.getTime()) {
+        if (rollup) await writeRollup();
+        rollup = emptyRollup(day);
+      }
+
+      orders += 1;
+      rollup.orders += 1;
+      rollup.ordersByStatus[order.status] += 1;
+      if (order.status === 'Cancelled') continue;
+
+      rollup.revenue += order.total;
+      for (const item of order.items) {
+        const key = item.productId.toString();
+        const line = rollup.products[key] || (rollup.products[key] = { name: item.name, units: 0, revenue: 0 });
+        line.units += item.quantity;
+        line.revenue = round2(line.revenue + item.price * item.quantity);
+        rollup.units += item.quantity;
+      }
+    }
+    if (rollup) await writeRollup();
+
+    await AnalyticsDaily.deleteMany({ date: { $gte: rangeStart, $lt: rangeEnd, $nin: written } });
+    return { days: written.length, orders };
+  }
+
+  // --- Reads (all from the rollups) ---
+
+  _range(query) {
+    const to = query.to ? startOfDay(query.to) : startOfDay(new Date());
+    const from = query.from ? startOfDay(query.from) : new Date(to.getTime() - (DEFAULT_RANGE_DAYS - 1) * DAY_MS);
+    return { from, to, filter: { date: { $gte: from, $lte: to } } };
+  }
+
+  async _totals(filter) {
+    const [totals] = await AnalyticsDaily.aggregate([
+      { $match: filter },
+      {
+        $group: {
+          _id: null,
+          revenue: { $sum: '$revenue' },
+          orders: { $sum: '$orders' },
+          units: { $sum: '$units' },
+          ...Object.fromEntries(
+            ORDER_STATUSES.map((status) => [status, { $sum: `$ordersByStatus.${status}` }])
+          ),
+        },
+      },
+    ]);
+
+    const ordersByStatus = Object.fromEntries(
+      ORDER_STATUSES.map((status) => [status, totals ? totals[status] : 0])
+    );
+    const revenue = totals ? round2(totals.revenue) : 0;
+    const paidOrders = (totals ? totals.orders : 0) - ordersByStatus.Cancelled;
+    return {
+      revenue,
+      orders: totals ? totals.orders : 0,
+      units: totals ? totals.units : 0,
+      averageOrderValue: paidOrders > 0 ? round2(revenue / paidOrders) : 0,
+      ordersByStatus,
+    };
+  }
+
+  /**
+   * @desc    Revenue and order counts per day, week (starting Monday) or month
+   * @param   {object} query - from, to, interval
+   */
+  async getRevenue(query = {}) {
+    const { from, to, filter } = this._range(query);
+    const interval = query.interval || 'day';
+    const period = interval === 'day'
+      ? '$date'
+      : { $dateTrunc: { date: '$date', unit: interval, ...(interval === 'week' ? { startOfWeek: 'monday' } : {}) } };
+
+    const series = await AnalyticsDaily.aggregate([
+      { $match: filter },
+      {
+        $group: {
+          _id: period,
+          revenue: { $sum: '$revenue' },
+          orders: { $sum: '$orders' },
+          cancelled: { $sum: { $ifNull: ['$ordersByStatus.Cancelled', 0] } },
+        },
+      },
+      { $sort: { _id: 1 } },
+    ]);
+
+    return {
+      from,
+      to,
+      interval,
+      series: series.map((row) => {
+        const paidOrders = row.orders - row.cancelled;
+        return {
+          date: row._id,
+          revenue: round2(row.revenue),
+          orders: row.orders,
+          averageOrderValue: paidOrders > 0 ? round2(row.revenue / paidOrders) : 0,
+        };
+      }),
+    };
+  }
+
+  async getProductPerformance(query = {}) {
+    const { from, to, filter } = this._range(query);
+    const limit = Math.min(parseInt(query.limit, 10) || 10, 100);
+    // ?productId= narrows the ranking to that one product
+    const productMatch = query.productId ? [{ $match: { 'products.k': query.productId } }] : [];
+
+    const products = await AnalyticsDaily.aggregate([
+      { $match: query.productId ? { ...filter, [`products.${query.productId}`]: { $exists: true } } : filter },
+      { $project: { products: { $objectToArray: { $ifNull: ['$products', {}] } } } },
+      { $unwind: '$products' },
+      ...productMatch,
+      {
+        $group: {
+          _id: '$products.k',
+          name: { $last: '$products.v.name' },
+          units: { $sum: '$products.v.units' },
+          revenue: { $sum: '$products.v.revenue' },
+        },
+      },
+      { $match: { units: { $gt: 0 } } },
+      { $sort: { revenue: -1, _id: 1 } },
+      { $limit: limit },
+    ]);
+
+    return {
+      from,
+      to,
+      products: products.map((product) => ({
+        productId: product._id,
+        name: product.name,
+        units: product.units,
+        revenue: round2(product.revenue),
+      })),
+    };
+  }
+
+  async getOrderStats(query = {}) {
+    const { from, to, filter } = this._range(query);
+    return { from, to, ...(await this._totals(filter)) };
+  }
+
+  async getDashboard() {
+    const today = startOfDay(new Date());
+    const [todayTotals, last30Days, revenue, topProducts] = await Promise.all([
+      this._totals({ date: today }),
+      this.getOrderStats({}),
+      this.getRevenue({}),
+      this.getProductPerformance({ limit: 5 }),
+    ]);
+
+    return {
+      today: todayTotals,
+      last30Days,
+      revenueChart: revenue.series,
+      topProducts: topProducts.products,
+    };
+  }
+}
+
+module.exports = new AnalyticsService();
+module.exports.startOfDay = startOfDay;
@@ -1,5 +1,15 @@
 const User = require("../models/userModel");
 const generateToken = require("../utils/generateToken");
+const PasswordService = require("./passwordService");
+const { createCache } = require("./cacheService");
+
+// Short-lived: a role change made outside the app (e.g. directly in the
+// database) is picked up within one TTL.
+const principalCache = createCache({
+  name: "principals",
+  maxEntries: parseInt(process.env.AUTH_CACHE_MAX_ENTRIES, 10) || 10000,
+  ttlSeconds: parseInt(process.env.AUTH_CACHE_TTL_SECONDS, 10) || 60,
+});
 
 class AuthService {
   async registerUser(userData) {
@@ -44,6 +54,13 @@ class AuthService {
       throw new Error("Invalid credentials");
     }
 
+    if (PasswordService.needsRehash(user.password)) {
+      // Best-effort and off the response path; the next login retries
+      this.upgradePasswordHash(user, password).catch((error) => {
+        console.error(`Could not upgrade password hash for user ${user._id}: ${error.message}`);
+      });
+    }
+
     const token = generateToken(user._id);
 
     return {
@@ -56,10 +73,55 @@ class AuthService {
     };
   }
 
+  /**
+   * @desc    Re-hashes a password stored with a lower cost than BCRYPT_COST,
+   *          using the plain password the user just logged in with. The
+   *          update only applies if the stored hash is still the one we
+   *          verified, so a concurrent password change is never overwritten.
+   * @param   {User} user - With the password field selected
+   * @param   {string} password
+   */
+  async upgradePasswordHash(user, password) {
+    const hash = await PasswordService.hash(password);
+    await User.updateOne({ _id: user._id, password: user.password }, { $set: { password: hash } });
+  }
+
   async getUserById(userId) {
     const user = await User.findById(userId);
     return user;
   }
+
+  /**
+   * @desc    The fields 'protect' puts on req.user, cached by user id so an
+   *          authenticated request does not cost a User lookup.
+   * @param   {string} userId
+   * @returns {object|null} { _id, id, email, role, firstName, lastName }
+   */
+  async getPrincipal(userId) {
+    return principalCache.wrap(`principal:${userId}`, async () => {
+      const user = await User.findById(userId)
+        .select("email role firstName lastName")
+        .lean();
+
+      if (!user) {
+        return null;
+      }
+      return { ...user, id: user._id.toString() };
+    });
+  }
+
+  async invalidatePrincipal(userId) {
+    await principalCache.invalidate(`principal:${userId}`);
+  }
+
+  // For writes that may touch any number of users
+  async invalidateAllPrincipals() {
+    await principalCache.invalidatePrefix("principal:");
+  }
+
+  async principalCacheStats() {
+    return principalCache.stats();
+  }
 }
 
 module.exports = new AuthService();
\ No newline at end of file
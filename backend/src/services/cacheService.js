@@ -0,0 +1,137 @@
+const MemoryCache = require('../utils/memoryCache');
+const clusterBus = require('../utils/clusterBus');
+
+/**
+ * Read-through cache over a swappable store. Each cache has a 'name'; its
+ * invalidations are relayed to the same-named cache of the other cluster
+ * workers, so a write on one worker is not served stale by the others.
+ */
+class CacheService {
+  constructor(store, name) {
+    this.store = store;
+    this.inflight = new Map();
+    this.hits = 0;
+    this.misses = 0;
+    this.channel = `cache:${name}`;
+    clusterBus.subscribe(this.channel, ({ keys, prefix }) =>
+      prefix === undefined ? this._invalidateKeys(keys) : this._invalidatePrefix(prefix)
+    );
+  }
+
+  // Swap the backend (e.g. for a shared store once we run several instances)
+  setStore(store) {
+    this.store = store;
+    this.inflight.clear();
+  }
+
+  /**
+   * @desc    Read-through: return the cached value for 'key', or run
+   *          'loader', cache its result and return it. Concurrent misses
+   *          on the same key share one loader call. A load that was running
+   *          when the key was invalidated still returns its value to its
+   *          callers but does not cache it: it may have read the data from
+   *          before the write.
+   * @param   {string} key
+   * @param   {Function} loader - async () => value; null/undefined is not cached
+   * @param   {number} [ttlSeconds] - Overrides the store default
+   */
+  async wrap(key, loader, ttlSeconds) {
+    const cached = await this.store.get(key);
+    if (cached !== undefined) {
+      this.hits += 1;
+      return cached;
+    }
+
+    this.misses += 1;
+    if (this.inflight.has(key)) {
+      return this.inflight.get(key).pending;
+    }
+
+    const load = { pending: null, stale: false };
+    load.pending = (async () => {
+      try {
+        const value = await loader();
+        if (!load.stale && value !== null && value !== undefined) {
+          await this.store.set(key, value, ttlSeconds);
+        }
+        return value;
+      } finally {
+        if (this.inflight.get(key) === load) {
+          this.inflight.delete(key);
+        }
+      }
+    })();
+
+    this.inflight.set(key, load);
+    return load.pending;
+  }
+
+  // Loads in flight for these keys must not cache what they read, and
+  // later misses start a fresh load instead of joining them
+  _abandonLoads(matches) {
+    for (const [key, load] of this.inflight) {
+      if (matches(key)) {
+        load.stale = true;
+        this.inflight.delete(key);
+      }
+    }
+  }
+
+  // Plain lookups, for callers that batch their misses into one load
+  async get(key) {
+    const cached = await this.store.get(key);
+    if (cached === undefined) {
+      this.misses += 1;
+    } else {
+      this.hits += 1;
+    }
+    return cached;
+  }
+
+  async set(key, value, ttlSeconds) {
+    await this.store.set(key, value, ttlSeconds);
+  }
+
+  async invalidate(...keys) {
+    clusterBus.publish(this.channel, { keys });
+    await this._invalidateKeys(keys);
+  }
+
+  async invalidatePrefix(prefix) {
+    clusterBus.publish(this.channel, { prefix });
+    await this._invalidatePrefix(prefix);
+  }
+
+  async _invalidateKeys(keys) {
+    const invalidated = new Set(keys);
+    this._abandonLoads((key) => invalidated.has(key));
+    await Promise.all(keys.map((key) => this.store.del(key)));
+  }
+
+  async _invalidatePrefix(prefix) {
+    this._abandonLoads((key) => key.startsWith(prefix));
+    await this.store.delByPrefix(prefix);
+  }
+
+  async stats() {
+    const lookups = this.hits + this.misses;
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups === 0 ? 0 : Number((this.hits / lookups).toFixed(4)),
+      evictions: this.store.evictions || 0,
+      size: await this.store.size(),
+    };
+  }
+}
+
+// For caches that need their own size bound, TTL and counters; 'name'
+// must be unique per cache
+const createCache = ({ name, ...options }) => new CacheService(new MemoryCache(options), name);
+
+module.exports = createCache({
+  name: 'default',
+  maxEntries: parseInt(process.env.CACHE_MAX_ENTRIES, 10) || 1000,
+  ttlSeconds: parseInt(process.env.CACHE_TTL_SECONDS, 10) || 300,
+});
+module.exports.createCache = createCache;
@@ -1,33 +1,69 @@
+const mongoose = require('mongoose');
 const Cart = require('../models/cartModel');
 const Product = require('../models/productModel');
 
+const CART_POPULATE_FIELDS = 'name slug images price stock';
+
+// Every mutation below is a single findOneAndUpdate with an aggregation
+// pipeline, so the item change and the subtotal are applied atomically on
+// the server and concurrent requests cannot overwrite each other.
+// Pipeline updates bypass Mongoose casting, defaults and timestamps, so ids
+// are passed as ObjectIds and the timestamps are set by this last stage.
+const RECALCULATE_STAGE = {
+  $set: {
+    subtotal: {
+      $sum: {
+        $map: {
+          input: '$items',
+          as: 'item',
+          in: { $multiply: ['$$item.price', '$$item.quantity'] },
+        },
+      },
+    },
+    createdAt: { $ifNull: ['$createdAt', '$$NOW'] },
+    updatedAt: '$$NOW',
+  },
+};
+
+const PIPELINE_OPTIONS = {
+  new: true,
+  timestamps: false,
+  setDefaultsOnInsert: false,
+};
+
 class CartService {
   async _getOrCreateCart(userId) {
-    let cart = await Cart.findOne({ userId });
-
-    if (!cart) {
-      cart = await Cart.create({ userId, items: [], subtotal: 0 });
-    }
-    // We populate the product details to work with them
-    return cart.populate('items.productId', 'name slug images price stock');
+    return Cart.findOneAndUpdate(
+      { userId },
+      { $setOnInsert: { items: [], subtotal: 0 } },
+      { new: true, upsert: true }
+    );
   }
 
-  _recalculateCart(cart) {
-    let subtotal = 0;
-    cart.items.forEach((item) => {
-      subtotal += item.price * item.quantity;
-    });
-    cart.subtotal = subtotal;
-    return subtotal;
+  // Population is an extra query, so it only runs when the caller asks
+  async _result(cart, options = {}) {
+    if (options.populate) {
+      return cart.populate('items.productId', CART_POPULATE_FIELDS);
+    }
+    return cart;
   }
 
-  async getCart(userId) {
-    return this._getOrCreateCart(userId);
+  // Reads are plain objects; only a customer's first visit writes
+  async getCart(userId, options = {}) {
+    const query = Cart.findOne({ userId });
+    if (options.populate) {
+      query.populate('items.productId', CART_POPULATE_FIELDS);
+    }
+    const cart = await query.lean();
+    if (cart) {
+      return cart;
+    }
+    return (await this._getOrCreateCart(userId)).toObject();
   }
 
-  async addItemToCart(userId, productId, quantity) {
-    // 1. Get the product to check stock and price
-    const product = await Product.findById(productId);
+  async addItemToCart(userId, productId, quantity, options) {
+    // 1. Get the product to check stock and lock in its price
+    const product = await Product.findById(productId).select('price stock').lean();
     if (!product) {
       throw new Error('Product not found');
     }
@@ -35,46 +71,95 @@ class CartService {
       throw new Error('Insufficient stock');
     }
 
-    // 2. Get the user's cart
-    const cart = await this._getOrCreateCart(userId);
-
-    // 3. Check if item already exists in cart
-    const existingItem = cart.items.find(
-      (item) => item.productId._id.toString() === productId
-    );
-
-    if (existingItem) {
-      const newQuantity = existingItem.quantity + quantity;
-      if (product.stock < newQuantity) {
-        throw new Error('Insufficient stock for updated quantity');
+    // 2. Increment the existing line or append a new one. The filter only
+    //    matches if the new quantity still fits the stock.
+    const productObjectId = new mongoose.Types.ObjectId(productId);
+    const filter = {
+      userId,
+      items: {
+        $not: {
+          $elemMatch: {
+            productId: productObjectId,
+            quantity: { $gt: product.stock - quantity },
+          },
+        },
+      },
+    };
+    const items = { $ifNull: ['$items', []] };
+    const pipeline = [
+      {
+        $set: {
+          items: {
+            $cond: [
+              { $in: [productObjectId, { $map: { input: items, as: 'item', in: '$$item.productId' } }] },
+              {
+                $map: {
+                  input: items,
+                  as: 'item',
+                  in: {
+                    $cond: [
+                      { $eq: ['$$item.productId', productObjectId] },
+                      { $mergeObjects: ['$$item', { quantity: { $add: ['$$item.quantity', quantity] } }] },
+                      '$$item',
+                    ],
+                  },
+                },
+              },
+              {
+                $concatArrays: [
+                  items,
+                  [{
+                    _id: new mongoose.Types.ObjectId(),
+                    productId: productObjectId,
+                    quantity,
+                    price: product.price,
+                  }],
+                ],
+              },
+            ],
+          },
+        },
+      },
+      RECALCULATE_STAGE,
+    ];
+
+    let cart;
+    try {
+      cart = await Cart.findOneAndUpdate(filter, pipeline, { ...PIPELINE_OPTIONS, upsert: true });
+    } catch (error) {
+      if (error.code !== 11000) {
+        throw error;
       }
-      existingItem.quantity = newQuantity;
-    } else {
-      cart.items.push({
-        productId: productId,
-        quantity: quantity,
-        price: product.price,
-      });
+      // The cart exists but the filter missed it: either a concurrent
+      // request created it first, or the stock guard rejected the update.
+      cart = await Cart.findOneAndUpdate(filter, pipeline, PIPELINE_OPTIONS);
     }
 
-    this._recalculateCart(cart);
-    await cart.save();
-    return cart.populate('items.productId', 'name slug images price stock');
+    if (!cart) {
+      throw new Error('Insufficient stock for updated quantity');
+    }
+    return this._result(cart, options);
   }
 
-  async updateItemQuantity(userId, itemId, quantity) {
+  async updateItemQuantity(userId, itemId, quantity, options) {
     if (quantity < 1) {
       throw new Error('Quantity must be at least 1');
     }
+    if (!mongoose.Types.ObjectId.isValid(itemId)) {
+      throw new Error('Item not found in cart');
+    }
 
-    const cart = await this._getOrCreateCart(userId);
-    const item = cart.items.id(itemId);
+    const itemObjectId = new mongoose.Types.ObjectId(itemId);
+    const current = await Cart.findOne(
+      { userId, 'items._id': itemObjectId },
+      { 'items.$': 1 }
+    ).lean();
 
-    if (!item) {
+    if (!current) {
       throw new Error('Item not found in cart');
     }
 
-    const product = await Product.findById(item.productId);
+    const product = await Product.findById(current.items[0].productId).select('stock').lean();
     if (!product) {
       throw new Error('Product associated with this item no longer exists');
     }
@@ -82,36 +167,76 @@ class CartService {
       throw new Error('Insufficient stock');
     }
 
-    item.quantity = quantity;
-    this._recalculateCart(cart);
-    await cart.save();
-    return cart.populate('items.productId', 'name slug images price stock');
-  }
+    const cart = await Cart.findOneAndUpdate(
+      { userId, 'items._id': itemObjectId },
+      [
+        {
+          $set: {
+            items: {
+              $map: {
+                input: '$items',
+                as: 'item',
+                in: {
+                  $cond: [
+                    { $eq: ['$$item._id', itemObjectId] },
+                    { $mergeObjects: ['$$item', { quantity }] },
+                    '$$item',
+                  ],
+                },
+              },
+            },
+          },
+        },
+        RECALCULATE_STAGE,
+      ],
+      PIPELINE_OPTIONS
+    );
 
-  async removeItemFromCart(userId, itemId) {
-    const cart = await this._getOrCreateCart(userId);
-    const item = cart.items.id(itemId);
+    // The item was removed between the read and the update
+    if (!cart) {
+      throw new Error('Item not found in cart');
+    }
+    return this._result(cart, options);
+  }
 
-    if (!item) {
+  async removeItemFromCart(userId, itemId, options) {
+    if (!mongoose.Types.ObjectId.isValid(itemId)) {
       throw new Error('Item not found in cart');
     }
 
-    item.deleteOne();
+    const itemObjectId = new mongoose.Types.ObjectId(itemId);
+    const cart = await Cart.findOneAndUpdate(
+      { userId, 'items._id': itemObjectId },
+      [
+        {
+          $set: {
+            items: {
+              $filter: {
+                input: '$items',
+                as: 'item',
+                cond: { $ne: ['$$item._id', itemObjectId] },
+              },
+            },
+          },
+        },
+        RECALCULATE_STAGE,
+      ],
+      PIPELINE_OPTIONS
+    );
 
-    this._recalculateCart(cart);
-    await cart.save();
-    return cart.populate('items.productId', 'name slug images price stock');
+    if (!cart) {
+      throw new Error('Item not found in cart');
+    }
+    return this._result(cart, options);
   }
 
   async clearCart(userId) {
-    const cart = await this._getOrCreateCart(userId);
-    
-    cart.items = [];
-    cart.subtotal = 0;
-    
-    await cart.save();
-    return cart;
+    return Cart.findOneAndUpdate(
+      { userId },
+      { $set: { items: [], subtotal: 0 } },
+      { new: true, upsert: true }
+    );
   }
 }
 
-module.exports = new CartService();
\ No newline at end of file
+module.exports = new CartService();
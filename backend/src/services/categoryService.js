@@ -1,4 +1,12 @@
 const Category = require("../models/categoryModel");
+const CacheService = require("./cacheService");
+const ProductService = require("./productService");
+const { CATEGORY_FIELDS } = require("../serializers/categorySerializer");
+
+// Category reads are cached as plain objects; every write below drops the
+// category keys and the cached products, which embed the category name/slug.
+const CATEGORY_KEY_PREFIX = "category:";
+const ALL_CATEGORIES_KEY = `${CATEGORY_KEY_PREFIX}all`;
 
 class CategoryService {
   async createCategory(categoryData) {
@@ -14,15 +22,27 @@ class CategoryService {
       description,
     });
 
+    await this._invalidateCache();
     return category;
   }
 
+  async _invalidateCache() {
+    await Promise.all([
+      CacheService.invalidatePrefix(CATEGORY_KEY_PREFIX),
+      ProductService.invalidateAllProductCache(),
+    ]);
+  }
+
   async getAllCategories() {
-    return await Category.find().sort({ name: 1 });
+    return await CacheService.wrap(ALL_CATEGORIES_KEY, () =>
+      Category.find().select(CATEGORY_FIELDS).sort({ name: 1 }).lean()
+    );
   }
 
   async getCategoryBySlug(slug) {
-    const category = await Category.findOne({ slug });
+    const category = await CacheService.wrap(`${CATEGORY_KEY_PREFIX}slug:${slug}`, () =>
+      Category.findOne({ slug }).select(CATEGORY_FIELDS).lean()
+    );
 
     if (!category) {
       throw new Error('Category not found');
@@ -51,6 +71,7 @@ class CategoryService {
     category.description = description;
 
     const updatedCategory = await category.save();
+    await this._invalidateCache();
     return updatedCategory;
   }
 
@@ -66,6 +87,7 @@ class CategoryService {
     // For Week 2, a simple delete is fine.
 
     await category.deleteOne();
+    await this._invalidateCache();
   }
 }
 
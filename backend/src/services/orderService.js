@@ -1,91 +1,185 @@
 const Order = require('../models/orderModel');
 const Cart = require('../models/cartModel');
 const Product = require('../models/productModel');
+const User = require('../models/userModel');
+const ProductService = require('./productService');
+const ActivityService = require('./activityService');
+const AnalyticsService = require('./analyticsService');
 const { generateOrderNumber } = require('../utils/orderNumberUtil');
+const { trackTransaction } = require('../utils/lifecycle');
+const {
+  parseLimit,
+  encodeCursor,
+  decodeCursor,
+  buildKeysetFilter,
+  buildPagination,
+} = require('../utils/paginationUtil');
 const mongoose = require('mongoose');
 
+// Order lists only show the header of each order; items and the shipping
+// address are loaded on the detail view (getOrderById).
+const ORDER_LIST_EXCLUDED_FIELDS = '-items -shippingAddress';
+// "My Orders" rows: enough for a history card, with the item count and the
+// first item's name/image computed by the server instead of shipping items.
+const ORDER_SUMMARY_PROJECTION = {
+  orderNumber: 1,
+  status: 1,
+  total: 1,
+  createdAt: 1,
+  paidAt: 1,
+  shippedAt: 1,
+  deliveredAt: 1,
+  itemCount: { $size: '$items' },
+  firstItemName: { $arrayElemAt: ['$items.name', 0] },
+  firstItemImage: { $arrayElemAt: ['$items.image', 0] },
+};
+const ORDER_USER_FIELDS = 'email firstName lastName';
+// Exports: orders per cursor batch, and per user lookup
+const EXPORT_BATCH_SIZE = parseInt(process.env.ORDER_EXPORT_BATCH_SIZE, 10) || 500;
+// An order's _id is created a moment before its createdAt is set (and
+// again on a transaction retry), so date bounds on _id get some slack and
+// the exact bounds are applied on createdAt
+const EXPORT_ID_SLACK_SECONDS = 300;
+// Status updates that lose a race re-read the order; past this many
+// attempts the caller gets a conflict
+const STATUS_UPDATE_ATTEMPTS = 3;
+
 class OrderService {
-    async createOrder(userId, shippingAddress) {
-    const cart = await Cart.findOne({ userId }).populate('items.productId');
-    if (!cart || cart.items.length === 0) {
-      throw new Error('Your cart is empty');
-    }
+  /**
+   * @desc    Checkout. Stock reservation, the order insert and clearing the
+   *          cart commit or abort together in one transaction. Stock is
+   *          decremented by a single bulkWrite whose filters require enough
+   *          stock, so concurrent checkouts cannot oversell. Transient
+   *          transaction errors (e.g. write conflicts) retry the whole block.
+   * @param   {string} userId
+   * @param   {object} shippingAddress
+   * @returns {Order}
+   */
+  async createOrder(userId, shippingAddress) {
+    let order;
+    let productSlugs = [];
 
-    const stockErrors = [];
-    for (const item of cart.items) {
-      const product = item.productId;
-      if (product.stock < item.quantity) {
-        stockErrors.push(`Insufficient stock for ${product.name}`);
-      }
-    }
-    if (stockErrors.length > 0) {
-      throw new Error(stockErrors.join(', '));
-    }
+    try {
+      // Usually from memory; allocated outside the transaction so a retry
+      // of the transaction keeps the same number
+      const orderNumber = await generateOrderNumber();
 
-    const orderItems = cart.items.map((item) => ({
-      productId: item.productId._id,
-      name: item.productId.name,
-      quantity: item.quantity,
-      price: item.price,
-      image: item.productId.images[0] || null,
-    }));
-
-    const subtotal = cart.subtotal;
-    const tax = 0;
-    const shipping = 0;
-    const total = subtotal + tax + shipping;
-
-    const order = await Order.create({
-      userId,
-      orderNumber: generateOrderNumber(),
-      items: orderItems,
-      shippingAddress,
-      subtotal,
-      tax,
-      shipping,
-      total,
-      status: 'Pending', // Will be "Paid" after Stripe
-    });
+      // Counted so a shutdown waits for the commit even if the client has
+      // already disconnected
+      await trackTransaction(() => mongoose.connection.transaction(async (session) => {
+        const cart = await Cart.findOne({ userId }).session(session).lean();
+        if (!cart || cart.items.length === 0) {
+          throw new Error('Your cart is empty');
+        }
 
-    // Decrease stock (this must be transactional)
-    // We start a Mongoose session for an "all or nothing" operation
-    const session = await mongoose.startSession();
-    session.startTransaction();
-    try {
-      for (const item of cart.items) {
-        await Product.updateOne(
-          { _id: item.productId._id },
-          { $inc: { stock: -item.quantity, purchases: item.quantity } },
+        const products = await Product.find({
+          _id: { $in: cart.items.map((item) => item.productId) },
+        })
+          .select('name slug images stock')
+          .session(session)
+          .lean();
+        const productsById = new Map(
+          products.map((product) => [product._id.toString(), product])
+        );
+
+        const stockErrors = [];
+        for (const item of cart.items) {
+          const product = productsById.get(item.productId.toString());
+          if (!product) {
+            stockErrors.push('Insufficient stock for a product that is no longer available');
+          } else if (product.stock < item.quantity) {
+            stockErrors.push(`Insufficient stock for ${product.name}`);
+          }
+        }
+        if (stockErrors.length > 0) {
+          throw new Error(stockErrors.join(', '));
+        }
+
+        // Guarded decrement: a line only applies if the stock is still there
+        const result = await Product.bulkWrite(
+          cart.items.map((item) => ({
+            updateOne: {
+              filter: { _id: item.productId, stock: { $gte: item.quantity } },
+              update: { $inc: { stock: -item.quantity, purchases: item.quantity } },
+            },
+          })),
+          { session, ordered: true }
+        );
+        if (result.modifiedCount !== cart.items.length) {
+          throw new Error('Insufficient stock for one or more items in your cart');
+        }
+
+        const orderItems = cart.items.map((item) => {
+          const product = productsById.get(item.productId.toString());
+          return {
+            productId: item.productId,
+            name: product.name,
+            quantity: item.quantity,
+            price: item.price,
+            image: product.images[0] || null,
+          };
+        });
+
+        const subtotal = cart.subtotal;
+        const tax = 0;
+        const shipping = 0;
+        const total = subtotal + tax + shipping;
+
+        [order] = await Order.create(
+          [
+            {
+              userId,
+              orderNumber,
+              items: orderItems,
+              shippingAddress,
+              subtotal,
+              tax,
+              shipping,
+              total,
+              status: 'Pending', // Will be "Paid" after Stripe
+            },
+          ],
           { session }
         );
-      }
-      
-      cart.items = [];
-      cart.subtotal = 0;
-      await cart.save({ session });
-      
-      // If all operations succeed, commit the transaction
-      await session.commitTransaction();
+
+        await Cart.updateOne(
+          { _id: cart._id },
+          { $set: { items: [], subtotal: 0 } },
+          { session }
+        );
+
+        productSlugs = products.map((product) => product.slug);
+      }));
     } catch (error) {
-      // If any operation fails, roll back all changes
-      await session.abortTransaction();
+      if (
+        error.message === 'Your cart is empty' ||
+        error.message.startsWith('Insufficient stock')
+      ) {
+        throw error;
+      }
       throw new Error(`Order processing failed: ${error.message}`);
-    } finally {
-      session.endSession();
     }
 
-    return order;
-  }
+    // Cached product details still carry the old stock
+    await ProductService.invalidateProductCache(...productSlugs);
+
+    // Trending counters are best-effort; the order is already committed
+    ActivityService.recordPurchases(order.items).catch((error) => {
+      console.error(`Could not record purchase activity: ${error.message}`);
+    });
+
+    // Rollups are not part of the transaction (every checkout of the day
+    // would conflict on one document); a missed update is repaired by the
+    // analytics backfill job
+    await AnalyticsService.recordOrderCreated(order).catch((error) => {
+      console.error(`Could not update analytics for order ${order.orderNumber}: ${error.message}`);
+    });
 
-  async getMyOrders(userId) {
-    return await Order.find({ userId }).sort({ createdAt: -1 });
+    return order;
   }
 
   async getOrderById(userId, userRole, orderId) { // 1. Accept all 3 arguments
-    const order = await Order.findById(orderId).populate(
-      'items.productId',
-      'slug'
-    );
+    const order = await Order.findById(orderId).populate('items.productId', 'slug').lean();
     
     if (!order) {
       throw new Error('Order not found');
@@ -100,25 +194,185 @@ class OrderService {
     return order;
   }
 
-  async getAllOrders() {
-    return await Order.find().populate('userId', 'email firstName lastName').sort({ createdAt: -1 });
+  /**
+   * @desc    A customer's order history, newest first, keyset-paginated on
+   *          the { userId: 1, createdAt: -1, _id: -1 } index. Rows are
+   *          summaries; the full order comes from getOrderById.
+   * @param   {string} userId
+   * @param   {object} query - limit, cursor
+   * @returns {{ orders: Array, pagination: object }}
+   */
+  async getMyOrders(userId, query = {}) {
+    return this._paginateOrders({ userId }, ORDER_SUMMARY_PROJECTION, query);
   }
 
-  async updateOrderStatus(orderId, status) {
-    const order = await Order.findById(orderId);
-    if (!order) {
-      throw new Error('Order not found');
+  /**
+   * @desc    Admin order list, newest first, keyset-paginated on the
+   *          { createdAt: -1, _id: -1 } indexes in orderModel. Pass the
+   *          'nextCursor' of the previous response as 'cursor'.
+   * @param   {object} query - status, userId, from, to, limit, cursor
+   * @returns {{ orders: Array, pagination: object }}
+   */
+  async getAllOrders(query = {}) {
+    const filter = {};
+    if (query.status) filter.status = query.status;
+    if (query.userId) filter.userId = query.userId;
+    if (query.from || query.to) {
+      filter.createdAt = {};
+      if (query.from) filter.createdAt.$gte = new Date(query.from);
+      if (query.to) filter.createdAt.$lte = new Date(query.to);
     }
 
-    order.status = status;
-    
+    const result = await this._paginateOrders(filter, ORDER_LIST_EXCLUDED_FIELDS, query);
+    await this._attachUsers(result.orders);
+    return result;
+  }
+
+  /**
+   * @desc    Orders for export in _id order, in batches of EXPORT_BATCH_SIZE
+   *          read from a cursor, each with its users attached by one $in
+   *          query. The caller pulls the next batch only when it has written
+   *          the previous one, so memory stays flat for any number of orders.
+   *          Pass the last exported _id as 'after' to resume.
+   * @param   {object} query - status, userId, from, to, after
+   * @returns {AsyncGenerator<Array>} Batches of lean orders
+   */
+  async *exportOrders(query = {}) {
+    const filter = {};
+    const idRange = {};
+    if (query.status) filter.status = query.status;
+    if (query.userId) filter.userId = query.userId;
+    if (query.after) idRange.$gt = new mongoose.Types.ObjectId(query.after);
+    if (query.from || query.to) {
+      filter.createdAt = {};
+    }
+    // Date bounds also bound _id, so the scan on the _id index only
+    // covers the requested period
+    if (query.from) {
+      const from = new Date(query.from);
+      filter.createdAt.$gte = from;
+      idRange.$gte = mongoose.Types.ObjectId.createFromTime(Math.floor(from.getTime() / 1000) - EXPORT_ID_SLACK_SECONDS);
+    }
+    if (query.to) {
+      const to = new Date(query.to);
+      filter.createdAt.$lte = to;
+      idRange.$lte = mongoose.Types.ObjectId.createFromTime(Math.floor(to.getTime() / 1000) + EXPORT_ID_SLACK_SECONDS);
+    }
+    if (Object.keys(idRange).length > 0) {
+      filter._id = idRange;
+    }
+
+    let ordersQuery = Order.find(filter).select('-__v').sort({ _id: 1 }).lean();
+    // Walk the _id index so rows stream in resumable order without a sort
+    // stage; one user's orders are few enough to sort
+    if (!query.userId) {
+      ordersQuery = ordersQuery.hint({ _id: 1 });
+    }
+    const cursor = ordersQuery.cursor({ batchSize: EXPORT_BATCH_SIZE });
+
+    try {
+      let batch = [];
+      for await (const order of cursor) {
+        batch.push(order);
+        if (batch.length >= EXPORT_BATCH_SIZE) {
+          await this._attachUsers(batch);
+          yield batch;
+          batch = [];
+        }
+      }
+      if (batch.length > 0) {
+        await this._attachUsers(batch);
+        yield batch;
+      }
+    } finally {
+      await cursor.close(); // Also when the consumer stops early
+    }
+  }
+
+  async _paginateOrders(filter, projection, query) {
+    const limit = parseLimit(query.limit);
+
+    let rangeFilter = filter;
+    if (query.cursor) {
+      const cursor = decodeCursor(query.cursor, 'createdAt');
+      rangeFilter = { $and: [filter, buildKeysetFilter('createdAt', -1, cursor)] };
+    }
+
+    // Fetch one extra document to know if there is a next page
+    const [orders, total] = await Promise.all([
+      Order.find(rangeFilter)
+        .select(projection)
+        .sort({ createdAt: -1, _id: -1 })
+        .limit(limit + 1)
+        .lean(),
+      Object.keys(filter).length === 0
+        ? Order.estimatedDocumentCount()
+        : Order.countDocuments(filter),
+    ]);
+
+    let nextCursor = null;
+    if (orders.length > limit) {
+      orders.pop();
+      const last = orders[orders.length - 1];
+      nextCursor = encodeCursor('createdAt', last.createdAt, last._id);
+    }
+
+    return {
+      orders,
+      pagination: buildPagination({ page: null, limit, total, nextCursor }),
+    };
+  }
+
+  // One $in query per page instead of a populate per order. Keeps the
+  // populated shape ({ userId: { _id, email, ... } }) the admin UI expects.
+  async _attachUsers(orders) {
+    const userIds = [...new Set(orders.map((order) => order.userId.toString()))];
+    if (userIds.length === 0) {
+      return;
+    }
+
+    const users = await User.find({ _id: { $in: userIds } })
+      .select(ORDER_USER_FIELDS)
+      .lean();
+    const usersById = new Map(users.map((user) => [user._id.toString(), user]));
+
+    for (const order of orders) {
+      order.userId = usersById.get(order.userId.toString()) || order.userId;
+    }
+  }
+
+  async updateOrderStatus(orderId, status) {
+    const update = { status };
     // Set status dates
-    if (status === 'Paid') order.paidAt = Date.now();
-    if (status === 'Shipped') order.shippedAt = Date.now();
-    if (status === 'Delivered') order.deliveredAt = Date.now();
+    if (status === 'Paid') update.paidAt = Date.now();
+    if (status === 'Shipped') update.shippedAt = Date.now();
+    if (status === 'Delivered') update.deliveredAt = Date.now();
 
-    await order.save();
-    return order;
+    for (let attempt = 0; attempt < STATUS_UPDATE_ATTEMPTS; attempt += 1) {
+      const current = await Order.findById(orderId).select('status');
+      if (!current) {
+        throw new Error('Order not found');
+      }
+
+      // Conditional on the status we read, so two concurrent updates cannot
+      // both report the same transition to the analytics rollups
+      const order = await Order.findOneAndUpdate(
+        { _id: orderId, status: current.status },
+        { $set: update },
+        { new: true, runValidators: true }
+      );
+      if (!order) {
+        continue; // Changed under us; retry from the new status
+      }
+
+      await AnalyticsService.recordStatusChange(order, current.status).catch((error) => {
+        console.error(`Could not update analytics for order ${order.orderNumber}: ${error.message}`);
+      });
+
+      return order;
+    }
+
+    throw new Error('Order status was changed by another request, please try again');
   }
 }
 
@@ -0,0 +1,85 @@
+const path = require('path');
+const bcrypt = require('bcryptjs');
+const WorkerPool = require('../utils/workerPool');
+const { registry, Gauge } = require('../utils/metrics');
+
+/**
+ * Password hashing and verification off the event loop.
+ *
+ * bcrypt is pure CPU (a cost-10 hash is tens of milliseconds of pure JS),
+ * so running it on the main thread stalls every other request during a
+ * login burst. Here it runs in a small worker-thread pool; when the pool's
+ * queue is full, logins fail fast with a 503 instead of queueing forever.
+ * With no pool (BCRYPT_THREADS=0) it runs on the main thread, which is
+ * only meant for comparing the two in benchmarks.
+ */
+class PasswordService {
+  constructor({ pool, cost }) {
+    this.pool = pool;
+    this.cost = cost;
+  }
+
+  async hash(password) {
+    if (!this.pool) {
+      return bcrypt.hash(password, await bcrypt.genSalt(this.cost));
+    }
+    return this.pool.run('hash', password, this.cost);
+  }
+
+  async compare(password, hash) {
+    if (!this.pool) {
+      return bcrypt.compare(password, hash);
+    }
+    return this.pool.run('compare', password, hash);
+  }
+
+  // True when 'hash' was made with a lower cost than the current one
+  needsRehash(hash) {
+    try {
+      return bcrypt.getRounds(hash) < this.cost;
+    } catch (error) {
+      return false; // Not a bcrypt hash; nothing we can upgrade
+    }
+  }
+
+  stats() {
+    return {
+      cost: this.cost,
+      pool: this.pool ? this.pool.stats() : null,
+    };
+  }
+
+  async close() {
+    if (this.pool) {
+      await this.pool.close();
+    }
+  }
+}
+
+// 0 is a valid thread count here, so it cannot fall back with '||'
+const threads = process.env.BCRYPT_THREADS === undefined ? 2 : parseInt(process.env.BCRYPT_THREADS, 10);
+
+// Threads are per process: in cluster mode every worker has its own pool
+const pool = threads > 0
+  ? new WorkerPool({
+    filename: path.join(__dirname, '../utils/passwordWorker.js'),
+    size: threads,
+    maxQueue: parseInt(process.env.BCRYPT_MAX_QUEUE, 10) || 200,
+  })
+  : null;
+
+registry.register(new Gauge({
+  name: 'password_pool_busy_threads',
+  help: 'Password hashing threads running a hash or compare.',
+  collect: () => (pool ? pool.stats().busy : 0),
+}));
+registry.register(new Gauge({
+  name: 'password_pool_queued_tasks',
+  help: 'Password hashes and compares waiting for a free thread.',
+  collect: () => (pool ? pool.stats().queued : 0),
+}));
+
+module.exports = new PasswordService({
+  pool,
+  cost: parseInt(process.env.BCRYPT_COST, 10) || 10,
+});
@@ -0,0 +1,289 @@
+const Product = require('../models/productModel');
+const Category = require('../models/categoryModel');
+const ProductService = require('./productService');
+const { parseCsv, parseNdjson } = require('../utils/rowStream');
+
+const CHUNK_SIZE = parseInt(process.env.BULK_CHUNK_SIZE, 10) || 1000;
+// Error details kept for the response; past this only the count grows
+const MAX_REPORTED_ERRORS = parseInt(process.env.BULK_MAX_ERRORS, 10) || 1000;
+
+const OBJECT_ID_PATTERN = /^[0-9a-fA-F]{24}$/;
+const PARSERS = { csv: parseCsv, ndjson: parseNdjson };
+
+const newReport = () => ({ rows: 0, created: 0, updated: 0, failed: 0, errors: [] });
+
+const recordError = (report, line, sku, message) => {
+  report.failed += 1;
+  if (report.errors.length < MAX_REPORTED_ERRORS) {
+    report.errors.push({ line, sku: sku === undefined ? null : String(sku), message });
+  }
+};
+
+const validationMessage = (error) =>
+  Object.values(error.errors)
+    .map((val) => val.message)
+    .join(', ');
+
+const writeErrorMessage = (error) => {
+  if (error.code === 11000) {
+    return error.errmsg.includes('slug')
+      ? 'A product with this name already exists'
+      : 'A product with this SKU already exists';
+  }
+  return error.errmsg;
+};
+
+/**
+ * Bulk catalog loads (supplier feeds) from CSV or NDJSON uploads.
+ *
+ * The upload is parsed as a stream and applied in chunks of CHUNK_SIZE
+ * rows: per chunk, one query resolves categories not seen yet, one query
+ * finds the existing products (by SKU, and by slug for name clashes) and
+ * one unordered bulkWrite applies the rows. Reading pauses while a chunk is
+ * written, so memory stays flat whatever the file size. Rows that fail
+ * parsing, validation (the productModel rules) or the write are reported
+ * with their line number and do not stop the rest of the upload. Within an
+ * upload the last row for a SKU wins.
+ */
+class ProductImportService {
+  /**
+   * @desc    Creates products, or replaces the given fields of existing ones,
+   *          matched by SKU. Rows need the fields POST /products needs;
+   *          'category' (slug or id) may be given instead of 'categoryId'.
+   *          In CSV, 'images' is a '|'-separated list.
+   * @param   {Readable} stream
+   * @param   {string} format - 'csv' | 'ndjson'
+   * @returns {object} { rows, created, updated, failed, errors }
+   */
+  async importProducts(stream, format) {
+    const categories = new Map(); // ref (id or slug) -> _id or null, for the whole upload
+    return this._run(stream, format, (chunk, report) => this._importChunk(chunk, report, categories));
+  }
+
+  /**
+   * @desc    Sets price and/or stock of existing products, matched by SKU.
+   *          Rows are { sku, price?, stock? }.
+   * @param   {Readable} stream
+   * @param   {string} format - 'csv' | 'ndjson'
+   * @returns {object} { rows, created, updated, failed, errors }
+   */
+  async updateProducts(stream, format) {
+    return this._run(stream, format, (chunk, report) => this._updateChunk(chunk, report));
+  }
+
+  async _run(stream, format, applyChunk) {
+    const report = newReport();
+    let chunk = [];
+
+    for await (const parsed of PARSERS[format](stream)) {
+      report.rows += 1;
+      if (parsed.error) {
+        recordError(report, parsed.line, undefined, parsed.error);
+        continue;
+      }
+      chunk.push(parsed);
+      if (chunk.length >= CHUNK_SIZE) {
+        await applyChunk(chunk, report);
+        chunk = [];
+      }
+    }
+    if (chunk.length > 0) {
+      await applyChunk(chunk, report);
+    }
+    return report;
+  }
+
+  async _importChunk(chunk, report, categories) {
+    await this._resolveCategories(chunk, categories);
+
+    const bySku = new Map();
+    for (const { line, row } of chunk) {
+      const ref = row.categoryId !== undefined ? row.categoryId : row.category;
+      const categoryId = ref === undefined ? undefined : categories.get(String(ref));
+      if (ref !== undefined && !categoryId) {
+        recordError(report, line, row.sku, 'Category not found');
+        continue;
+      }
+
+      const images = typeof row.images === 'string'
+        ? row.images.split('|').map((url) => url.trim()).filter(Boolean)
+        : row.images;
+      // Same casting and validators as a product created through the API
+      const product = new Product({
+        name: row.name,
+        description: row.description,
+        price: row.price,
+        sku: row.sku,
+        stock: row.stock,
+        categoryId,
+        images,
+        featured: row.featured,
+      });
+      const error = product.validateSync();
+      if (error) {
+        recordError(report, line, row.sku, validationMessage(error));
+        continue;
+      }
+
+      const set = {
+        name: product.name,
+        slug: Product.slugFor(product.name),
+        description: product.description,
+        price: product.price,
+        sku: product.sku,
+        stock: product.stock,
+        categoryId: product.categoryId,
+      };
+      // Optional fields are only written when the row has them, so a feed
+      // without images does not wipe the ones added in the admin portal
+      if (images !== undefined) set.images = product.images;
+      if (row.featured !== undefined) set.featured = product.featured;
+      bySku.set(product.sku, { line, sku: product.sku, set });
+    }
+    if (bySku.size === 0) {
+      return;
+    }
+
+    const entries = [...bySku.values()];
+    const existing = await Product.find({
+      $or: [
+        { sku: { $in: entries.map((entry) => entry.sku) } },
+        { slug: { $in: entries.map((entry) => entry.set.slug) } },
+      ],
+    })
+      .select('sku slug')
+      .lean();
+    const slugOwners = new Map(existing.map((product) => [product.slug, product.sku]));
+    const touchedSlugs = existing.filter((product) => bySku.has(product.sku)).map((product) => product.slug);
+
+    const writes = [];
+    for (const entry of entries) {
+      const owner = slugOwners.get(entry.set.slug);
+      if (owner && owner !== entry.sku) {
+        recordError(report, entry.line, entry.sku, 'A product with this name already exists');
+        continue;
+      }
+      slugOwners.set(entry.set.slug, entry.sku);
+      touchedSlugs.push(entry.set.slug);
+      writes.push(entry);
+    }
+
+    const result = await this._bulkWrite(
+      writes,
+      (entry) => ({ updateOne: { filter: { sku: entry.sku }, update: { $set: entry.set }, upsert: true } }),
+      report
+    );
+    report.created += result.upsertedCount;
+    report.updated += result.matchedCount;
+    // Renamed products are cached under their old slug
+    await ProductService.invalidateProductCache(...touchedSlugs);
+  }
+
+  async _updateChunk(chunk, report) {
+    const bySku = new Map();
+    for (const { line, row } of chunk) {
+      if (row.sku === undefined || String(row.sku).trim() === '') {
+        recordError(report, line, row.sku, 'SKU is required');
+        continue;
+      }
+      if (row.price === undefined && row.stock === undefined) {
+        recordError(report, line, row.sku, 'Row must set price or stock');
+        continue;
+      }
+
+      const product = new Product({ sku: row.sku, price: row.price, stock: row.stock });
+      const error = product.validateSync(['price', 'stock'].filter((field) => row[field] !== undefined));
+      if (error) {
+        recordError(report, line, row.sku, validationMessage(error));
+        continue;
+      }
+
+      const set = {};
+      if (row.price !== undefined) set.price = product.price;
+      if (row.stock !== undefined) set.stock = product.stock;
+      bySku.set(product.sku, { line, sku: product.sku, set });
+    }
+    if (bySku.size === 0) {
+      return;
+    }
+
+    const existing = await Product.find({ sku: { $in: [...bySku.keys()] } })
+      .select('sku slug')
+      .lean();
+    const slugBySku = new Map(existing.map((product) => [product.sku, product.slug]));
+
+    const writes = [];
+    for (const entry of bySku.values()) {
+      if (!slugBySku.has(entry.sku)) {
+        recordError(report, entry.line, entry.sku, 'Product not found');
+      } else {
+        writes.push(entry);
+      }
+    }
+
+    const result = await this._bulkWrite(
+      writes,
+      (entry) => ({ updateOne: { filter: { sku: entry.sku }, update: { $set: entry.set } } }),
+      report
+    );
+    report.updated += result.matchedCount;
+    await ProductService.invalidateProductCache(...writes.map((entry) => slugBySku.get(entry.sku)));
+  }
+
+  /**
+   * @desc    Looks up the category refs of 'chunk' not resolved yet, ids and
+   *          slugs together in one query, and adds them to 'categories'
+   */
+  async _resolveCategories(chunk, categories) {
+    const refs = new Set();
+    for (const { row } of chunk) {
+      const ref = row.categoryId !== undefined ? row.categoryId : row.category;
+      if (ref !== undefined && !categories.has(String(ref))) {
+        refs.add(String(ref));
+      }
+    }
+    if (refs.size === 0) {
+      return;
+    }
+
+    const ids = [...refs].filter((ref) => OBJECT_ID_PATTERN.test(ref));
+    const slugs = [...refs].filter((ref) => !OBJECT_ID_PATTERN.test(ref)).map((ref) => ref.toLowerCase());
+    const found = await Category.find({ $or: [{ _id: { $in: ids } }, { slug: { $in: slugs } }] })
+      .select('_id slug')
+      .lean();
+
+    const byRef = new Map();
+    for (const category of found) {
+      byRef.set(category._id.toString(), category._id);
+      byRef.set(category.slug, category._id);
+    }
+    // Unknown refs are stored as null so they are not looked up again
+    refs.forEach((ref) => categories.set(ref, byRef.get(ref.toLowerCase()) || null));
+  }
+
+  /**
+   * @desc    One unordered bulkWrite for 'entries'. Rows the server rejects
+   *          (e.g. a duplicate slug written concurrently) are reported
+   *          without failing the others.
+   * @returns {{ upsertedCount, matchedCount }}
+   */
+  async _bulkWrite(entries, toOperation, report) {
+    if (entries.length === 0) {
+      return { upsertedCount: 0, matchedCount: 0 };
+    }
+    try {
+      return await Product.bulkWrite(entries.map(toOperation), { ordered: false });
+    } catch (error) {
+      if (!error.writeErrors) {
+        throw error;
+      }
+      for (const writeError of [].concat(error.writeErrors)) {
+        const entry = entries[writeError.index];
+        recordError(report, entry.line, entry.sku, writeErrorMessage(writeError));
+      }
+      return error.result;
+    }
+  }
+}
+
+module.exports = new ProductImportService();
@@ -1,5 +1,38 @@
+const slugify = require('slugify');
 const Product = require('../models/productModel');
 const Category = require('../models/categoryModel');
+const CacheService = require('./cacheService');
+const { PRODUCT_CARD_FIELDS, PRODUCT_DETAIL_FIELDS } = require('../serializers/productSerializer');
+const {
+  parseLimit,
+  parsePage,
+  encodeCursor,
+  decodeCursor,
+  buildKeysetFilter,
+  buildPagination,
+} = require('../utils/paginationUtil');
+
+// Every sort is paired with _id as a tie-breaker and backed by a compound
+// index in productModel, so a page is a bounded range scan on that index.
+const PRODUCT_SORTS = {
+  newest: { field: 'createdAt', direction: -1 },
+  oldest: { field: 'createdAt', direction: 1 },
+  price_asc: { field: 'price', direction: 1 },
+  price_desc: { field: 'price', direction: -1 },
+  rating: { field: 'rating', direction: -1 },
+  popular: { field: 'purchases', direction: -1 },
+};
+
+// Product detail is cached per slug; writes (and stock changes from
+// orders) must call invalidateProductCache with every slug they touch.
+const PRODUCT_KEY_PREFIX = 'product:';
+const productSlugKey = (slug) => `${PRODUCT_KEY_PREFIX}slug:${slug}`;
+
+const OBJECT_ID_PATTERN = /^[0-9a-fA-F]{24}$/;
+
+const SUGGEST_LIMIT = 10;
+
+const escapeRegex = (text) => text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
 
 class ProductService {
     async createProduct(productData) {
@@ -26,31 +59,190 @@ class ProductService {
       // The 'pre-save' hook in the model will auto-generate the slug
     });
 
+    await this.invalidateProductCache(product.slug);
     return product;
     }
 
-    async getAllProducts(query) {
-    // This is a complex query. We'll start simple and build on it.
-    // For now, it just gets all products.
-    // Later, we'll add filtering, search, sorting, and pagination here.
-    
-    const products = await Product.find()
-      .populate('categoryId', 'name slug') // Show category name/slug
-      .sort({ createdAt: -1 }); // Sort by newest first
+  async _buildProductFilter(query) {
+    const filter = {};
+
+    // 'category' accepts either a category _id or its slug
+    if (query.category) {
+      const category = String(query.category);
+      if (OBJECT_ID_PATTERN.test(category)) {
+        filter.categoryId = category;
+      } else {
+        const found = await Category.findOne({ slug: category }).select('_id');
+        if (!found) {
+          throw new Error('Category not found');
+        }
+        filter.categoryId = found._id;
+      }
+    }
+
+    if (query.minPrice !== undefined || query.maxPrice !== undefined) {
+      filter.price = {};
+      if (query.minPrice !== undefined) filter.price.$gte = Number(query.minPrice);
+      if (query.maxPrice !== undefined) filter.price.$lte = Number(query.maxPrice);
+    }
+
+    if (query.inStock === 'true') {
+      filter.stock = { $gt: 0 };
+    } else if (query.inStock === 'false') {
+      filter.stock = 0;
+    }
+
+    return filter;
+  }
+
+  /**
+   * @desc    List products with filtering, sorting and pagination.
+   *          Pass 'page' for numbered pages or the 'nextCursor' of the
+   *          previous response as 'cursor' for keyset pagination.
+   * @param   {object} query - category, minPrice, maxPrice, inStock, sort, page, limit, cursor
+   * @returns {{ products: Array, pagination: object }}
+   */
+  async getAllProducts(query = {}) {
+    const { field, direction } = PRODUCT_SORTS[query.sort] || PRODUCT_SORTS.newest;
+    const limit = parseLimit(query.limit);
+    const page = query.cursor ? null : parsePage(query.page);
+
+    const filter = await this._buildProductFilter(query);
+
+    let rangeFilter = filter;
+    if (query.cursor) {
+      const cursor = decodeCursor(query.cursor, field);
+      rangeFilter = { $and: [filter, buildKeysetFilter(field, direction, cursor)] };
+    }
+
+    // Fetch one extra document to know if there is a next page. Lists are
+    // plain card-view objects; the cursor needs the sort field as well, the
+    // ETag the updatedAt of products and categories (neither is serialized).
+    const productsQuery = Product.find(rangeFilter)
+      .select(`${PRODUCT_CARD_FIELDS} ${field} updatedAt`)
+      .sort({ [field]: direction, _id: direction })
+      .skip(page ? (page - 1) * limit : 0)
+      .limit(limit + 1)
+      .populate('categoryId', 'name slug updatedAt') // Show category name/slug
+      .lean();
+
+    const [products, total] = await Promise.all([
+      productsQuery,
+      Object.keys(filter).length === 0
+        ? Product.estimatedDocumentCount()
+        : Product.countDocuments(filter),
+    ]);
+
+    let nextCursor = null;
+    if (products.length > limit) {
+      products.pop();
+      const last = products[products.length - 1];
+      nextCursor = encodeCursor(field, last[field], last._id);
+    }
 
     return {
       products,
-      total: products.length,
-      page: 1,
-      pages: 1,
+      pagination: buildPagination({ page, limit, total, nextCursor }),
     };
   }
 
+  /**
+   * @desc    Full-text search over name/description using the text index,
+   *          ranked by relevance (textScore)
+   * @param   {object} query - q, category, page, limit
+   * @returns {{ products: Array, pagination: object }}
+   */
+  async searchProducts(query) {
+    const limit = parseLimit(query.limit);
+    const page = parsePage(query.page);
+
+    const filter = {
+      ...(await this._buildProductFilter({ category: query.category })),
+      $text: { $search: String(query.q) },
+    };
+    const score = { $meta: 'textScore' };
+
+    const [products, total] = await Promise.all([
+      Product.find(filter)
+        .select(PRODUCT_CARD_FIELDS)
+        .select({ score })
+        .sort({ score, _id: 1 })
+        .skip((page - 1) * limit)
+        .limit(limit + 1)
+        .lean(),
+      Product.countDocuments(filter),
+    ]);
+
+    const hasNextPage = products.length > limit;
+    if (hasNextPage) {
+      products.pop();
+    }
+
+    return {
+      products,
+      pagination: { ...buildPagination({ page, limit, total, nextCursor: null }), hasNextPage },
+    };
+  }
+
+  /**
+   * @desc    Typeahead suggestions. Slugs are the lowercased, dash-joined
+   *          name, so an anchored regex on slug is a range scan on its
+   *          unique index instead of a collection scan.
+   * @param   {string} prefix - What the user has typed so far
+   * @returns {Array} Up to 10 { name, slug, price, images }
+   */
+  async suggestProducts(prefix) {
+    const slugPrefix = slugify(String(prefix), { lower: true, strict: true });
+    if (!slugPrefix) {
+      return [];
+    }
+
+    return await Product.find({ slug: new RegExp(`^${escapeRegex(slugPrefix)}`) })
+      .select('name slug price images')
+      .sort({ slug: 1 })
+      .limit(SUGGEST_LIMIT)
+      .lean();
+  }
+
+  /**
+   * @desc    Best sellers as product cards, read from the
+   *          { purchases: -1, _id: -1 } index
+   */
+  async getPopularProducts(limit) {
+    return await Product.find()
+      .select(PRODUCT_CARD_FIELDS)
+      .sort({ purchases: -1, _id: -1 })
+      .limit(limit)
+      .lean();
+  }
+
+  /**
+   * @desc    Product cards for 'productIds' in the same order, in one query.
+   *          Ids of products that no longer exist are skipped.
+   */
+  async getProductCards(productIds) {
+    const ids = productIds.map(String).filter((id) => OBJECT_ID_PATTERN.test(id));
+    const products = await Product.find({ _id: { $in: ids } })
+      .select(PRODUCT_CARD_FIELDS)
+      .lean();
+
+    const byId = new Map(products.map((product) => [product._id.toString(), product]));
+    return productIds.map((id) => byId.get(String(id))).filter(Boolean);
+  }
+
+  async invalidateProductCache(...slugs) {
+    await CacheService.invalidate(...slugs.map(productSlugKey));
+  }
+
+  // Every cached detail, e.g. after a category change (details embed it)
+  async invalidateAllProductCache() {
+    await CacheService.invalidatePrefix(PRODUCT_KEY_PREFIX);
+  }
+
   async getProductBySlug(slug) {
     // Find by slug and also populate the category info
-    const product = await Product.findOne({ slug }).populate(
-      'categoryId',
-      'name slug'
+    const product = await CacheService.wrap(productSlugKey(slug), () =>
+      Product.findOne({ slug }).select(PRODUCT_DETAIL_FIELDS).populate('categoryId', 'name slug updatedAt').lean()
     );
 
     if (!product) {
@@ -93,7 +285,9 @@ class ProductService {
     product.stock = stock || product.stock;
     
     // The 'pre-save' hook will auto-update slug if name changes
+    const previousSlug = product.slug;
     const updatedProduct = await product.save();
+    await this.invalidateProductCache(previousSlug, updatedProduct.slug);
     return updatedProduct;
   }
 
@@ -112,6 +306,7 @@ class ProductService {
     // Later, we might add logic to check if this product
     // is in any customer orders before deleting.
     await product.deleteOne();
+    await this.invalidateProductCache(product.slug);
   }
 
   
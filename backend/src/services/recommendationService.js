@@ -0,0 +1,178 @@
+const ProductService = require('./productService');
+const { createCache } = require('./cacheService');
+const MlClient = require('../utils/mlClient');
+const CircuitBreaker = require('../utils/circuitBreaker');
+
+const POPULAR_SIZE = 50;
+const BATCH_MAX_USERS = 100; // Per call to the ML batch endpoint
+
+const recommendationKey = (userId, limit) => `recommendations:${userId}:${limit}`;
+
+const toPicks = (result) => ({
+  source: result.source,
+  productIds: result.data.map((pick) => pick.productId),
+});
+
+/**
+ * Product recommendations from the ML service (PRD 8.6).
+ *
+ * The ML answer (product ids) is cached per user, since it only changes
+ * when the model is retrained; the product cards are read fresh with one
+ * $in query so prices and stock are current. When the ML service is slow,
+ * down or its circuit is open, users get the best sellers instead, which
+ * are refreshed in the background so a fallback costs no query.
+ */
+class RecommendationService {
+  constructor({ client, cache, limit, popularRefreshMs }) {
+    this.client = client;
+    this.cache = cache;
+    this.limit = limit;
+    this.popularRefreshMs = popularRefreshMs;
+    this.popular = null;
+    this.timer = null;
+    this.fallbacks = 0;
+  }
+
+  start() {
+    if (!this.timer) {
+      this.refreshPopular();
+      this.timer = setInterval(() => this.refreshPopular(), this.popularRefreshMs);
+      this.timer.unref(); // never keeps the process alive on its own
+    }
+  }
+
+  stop() {
+    clearInterval(this.timer);
+    this.timer = null;
+    this.client.close();
+  }
+
+  async refreshPopular() {
+    try {
+      this.popular = await ProductService.getPopularProducts(POPULAR_SIZE);
+    } catch (error) {
+      console.error(`Could not refresh popular products: ${error.message}`);
+    }
+  }
+
+  async _popular(limit) {
+    if (!this.popular) {
+      await this.refreshPopular(); // Only before the first refresh has finished
+    }
+    return (this.popular || []).slice(0, limit);
+  }
+
+  _failed(error) {
+    // An open circuit is the expected state while the service is down
+    if (error.message !== 'Circuit open') {
+      console.error(`ML service error: ${error.message}`);
+    }
+    return null;
+  }
+
+  /**
+   * @desc    Up to 'limit' product cards for one user
+   * @returns {{ source: string, products: Array }} source is the ML
+   *          strategy ('collaborative' or 'popular') or 'fallback'
+   */
+  async getRecommendations(userId, limit = this.limit) {
+    // A failed call returns null, which is not cached
+    const picks = await this.cache.wrap(recommendationKey(userId, limit), () =>
+      this.client.recommend(userId, limit).then(toPicks, (error) => this._failed(error))
+    );
+
+    if (!picks) {
+      this.fallbacks += 1;
+      return { source: 'fallback', products: await this._popular(limit) };
+    }
+    return { source: picks.source, products: await ProductService.getProductCards(picks.productIds) };
+  }
+
+  /**
+   * @desc    Recommendations for many users: cached users are served from
+   *          the cache, the rest in batch calls to the ML service, and all
+   *          product cards are read in a single query.
+   * @returns {Array<{ userId: string, source: string, products: Array }>}
+   */
+  async getRecommendationsBatch(userIds, limit = this.limit) {
+    const ids = [...new Set(userIds.map(String))];
+    const picksByUser = new Map();
+    const misses = [];
+
+    for (const userId of ids) {
+      const cached = await this.cache.get(recommendationKey(userId, limit));
+      if (cached) {
+        picksByUser.set(userId, cached);
+      } else {
+        misses.push(userId);
+      }
+    }
+
+    const chunks = [];
+    for (let i = 0; i < misses.length; i += BATCH_MAX_USERS) {
+      chunks.push(misses.slice(i, i + BATCH_MAX_USERS));
+    }
+    await Promise.all(chunks.map(async (chunk) => {
+      try {
+        const result = await this.client.recommendBatch(chunk, limit);
+        for (const entry of result.data) {
+          const picks = toPicks(entry);
+          picksByUser.set(entry.userId, picks);
+          await this.cache.set(recommendationKey(entry.userId, limit), picks);
+        }
+      } catch (error) {
+        this._failed(error);
+      }
+    }));
+
+    const productIds = [...new Set([...picksByUser.values()].flatMap((picks) => picks.productIds))];
+    const cards = new Map(
+      (await ProductService.getProductCards(productIds)).map((product) => [product._id.toString(), product])
+    );
+
+    const fallbackCount = ids.length - picksByUser.size;
+    const popular = fallbackCount > 0 ? await this._popular(limit) : [];
+    this.fallbacks += fallbackCount;
+
+    return ids.map((userId) => {
+      const picks = picksByUser.get(userId);
+      if (!picks) {
+        return { userId, source: 'fallback', products: popular };
+      }
+      return {
+        userId,
+        source: picks.source,
+        products: picks.productIds.map((id) => cards.get(String(id))).filter(Boolean),
+      };
+    });
+  }
+
+  async stats() {
+    return {
+      ...this.client.stats(),
+      cache: await this.cache.stats(),
+      fallbacks: this.fallbacks,
+      popularProducts: this.popular ? this.popular.length : 0,
+    };
+  }
+}
+
+module.exports = new RecommendationService({
+  client: new MlClient({
+    baseUrl: process.env.ML_SERVICE_URL || 'http://localhost:8000',
+    timeoutMs: parseInt(process.env.ML_TIMEOUT_MS, 10) || 500,
+    batchTimeoutMs: parseInt(process.env.ML_BATCH_TIMEOUT_MS, 10) || 2000,
+    maxSockets: parseInt(process.env.ML_MAX_SOCKETS, 10) || 50,
+    breaker: new CircuitBreaker({
+      failureThreshold: parseInt(process.env.ML_BREAKER_THRESHOLD, 10) || 5,
+      resetTimeoutMs: parseInt(process.env.ML_BREAKER_RESET_MS, 10) || 30000,
+    }),
+  }),
+  cache: createCache({
+    name: 'recommendations',
+    maxEntries: parseInt(process.env.RECOMMENDATION_CACHE_MAX_USERS, 10) || 10000,
+    ttlSeconds: parseInt(process.env.RECOMMENDATION_CACHE_TTL_SECONDS, 10) || 300,
+  }),
+  limit: 10, // PRD 8.1: 10 recommended products per user
+  popularRefreshMs: parseInt(process.env.POPULAR_REFRESH_MS, 10) || 60000,
+});
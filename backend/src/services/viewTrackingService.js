@@ -0,0 +1,169 @@
+const Product = require('../models/productModel');
+const ActivityService = require('./activityService');
+const { hourBucket } = require('./activityService');
+const ProductService = require('./productService');
+
+/**
+ * Product view counter. A view only bumps an in-memory count; every
+ * flush writes all pending counts as one bulkWrite of $inc on products
+ * (the lifetime 'views' counter) and one on product_activity (the hourly
+ * buckets behind trending), so the product detail endpoint stays read-only.
+ * The cached details of the products written are invalidated after each
+ * flush, so the detail shows (and its ETag follows) the stored count.
+ *
+ * The buffer holds at most 'maxProducts' distinct products: reaching it
+ * triggers an early flush, and views for new products are dropped (and
+ * counted) while a flush that could not keep up is still running.
+ *
+ * Buckets are hourly, so when the hour turns the buffer is set aside as a
+ * batch of its own; a flush writes every batch waiting, each to its hour.
+ */
+class ViewTrackingService {
+  constructor({ flushIntervalMs, maxProducts }) {
+    this.flushIntervalMs = flushIntervalMs;
+    this.maxProducts = maxProducts;
+    this.buffer = new Map();
+    this.bufferHour = null;
+    this.sealed = []; // [{ hour, counts }] set aside at an hour change
+    this.slugs = new Set(); // detail cache entries the next flush makes stale
+    this.flushing = null;
+    this.timer = null;
+    this.tracked = 0;
+    this.flushed = 0;
+    this.flushes = 0;
+    this.dropped = 0;
+    this.failedFlushes = 0;
+  }
+
+  start() {
+    if (!this.timer) {
+      this.timer = setInterval(() => this.flush(), this.flushIntervalMs);
+      this.timer.unref(); // never keeps the process alive on its own
+    }
+  }
+
+  async stop() {
+    clearInterval(this.timer);
+    this.timer = null;
+    // A flush already running leaves newer views to the one after it
+    while (this.flushing || this.buffer.size > 0 || this.sealed.length > 0) {
+      await this.flush();
+    }
+  }
+
+  track(productId, slug) {
+    const key = productId.toString();
+    const hour = hourBucket();
+
+    // Views of the new hour must not join the old hour's counts, even
+    // while a flush is running
+    if (this.bufferHour !== null && hour.getTime() !== this.bufferHour.getTime()) {
+      this.seal();
+      this.flush();
+    }
+
+    if (!this.buffer.has(key) && this.buffer.size >= this.maxProducts) {
+      this.flush();
+      if (this.buffer.size >= this.maxProducts) {
+        this.dropped += 1; // The previous flush is still running
+        return;
+      }
+    }
+
+    if (this.bufferHour === null) {
+      this.bufferHour = hour;
+    }
+    this.buffer.set(key, (this.buffer.get(key) || 0) + 1);
+    this.slugs.add(slug);
+    this.tracked += 1;
+
+    if (this.buffer.size >= this.maxProducts) {
+      this.flush();
+    }
+  }
+
+  // Moves the buffer aside as a batch for its hour
+  seal() {
+    if (this.buffer.size > 0) {
+      this.sealed.push({ hour: this.bufferHour, counts: this.buffer });
+    }
+    this.buffer = new Map();
+    this.bufferHour = null;
+  }
+
+  /**
+   * @desc    Writes all pending views. Concurrent calls share the flush in
+   *          progress; views tracked meanwhile go to the next one, which
+   *          starts right away if an hour's batch was set aside meanwhile.
+   */
+  async flush() {
+    if (this.flushing) {
+      return this.flushing;
+    }
+    this.seal();
+    if (this.sealed.length === 0) {
+      return;
+    }
+
+    const batches = this.sealed;
+    const slugs = this.slugs;
+    this.sealed = [];
+    this.slugs = new Set();
+    const totals = new Map();
+    for (const { counts } of batches) {
+      for (const [productId, count] of counts) {
+        totals.set(productId, (totals.get(productId) || 0) + count);
+      }
+    }
+
+    this.flushing = (async () => {
+      try {
+        await Promise.all([
+          Product.bulkWrite(
+            [...totals].map(([productId, count]) => ({
+              updateOne: { filter: { _id: productId }, update: { $inc: { views: count } } },
+            })),
+            // A view is not an edit: updatedAt stays, so product list ETags
+            // do not change with every flush (the detail ETag covers views)
+            { ordered: false, timestamps: false }
+          ),
+          ...batches.map(({ hour, counts }) => ActivityService.record(counts, 'views', hour)),
+        ]);
+        await ProductService.invalidateProductCache(...slugs);
+        for (const count of totals.values()) {
+          this.flushed += count;
+        }
+        this.flushes += 1;
+      } catch (error) {
+        // View counts are analytics; losing one batch is better than retrying forever
+        this.failedFlushes += 1;
+        console.error(`Could not flush product views: ${error.message}`);
+      } finally {
+        this.flushing = null;
+        if (this.sealed.length > 0) {
+          this.flush();
+        }
+      }
+    })();
+
+    return this.flushing;
+  }
+
+  stats() {
+    return {
+      tracked: this.tracked,
+      flushed: this.flushed,
+      flushes: this.flushes,
+      flushing: this.flushing !== null,
+      flushIntervalMs: this.flushIntervalMs,
+      pendingProducts: this.sealed.reduce((sum, { counts }) => sum + counts.size, this.buffer.size),
+      dropped: this.dropped,
+      failedFlushes: this.failedFlushes,
+    };
+  }
+}
+
+module.exports = new ViewTrackingService({
+  flushIntervalMs: parseInt(process.env.VIEW_FLUSH_INTERVAL_MS, 10) || 10000,
+  maxProducts: parseInt(process.env.VIEW_BUFFER_MAX_PRODUCTS, 10) || 5000,
+});
@@ -1,4 +1,8 @@
-const asyncHandler = (fn) => (req, res, next) =>
-  Promise.resolve(fn(req, res, next)).catch(next);
+const { markRoute } = require('./requestContext');
+
+const asyncHandler = (fn) => (req, res, next) => {
+  markRoute(req);
+  return Promise.resolve(fn(req, res, next)).catch(next);
+};
 
 module.exports = asyncHandler;
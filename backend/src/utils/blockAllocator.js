@@ -0,0 +1,72 @@
+/**
+ * Hands out increasing integers from blocks reserved in a shared store.
+ *
+ * 'reserve(size)' must atomically claim 'size' consecutive values and
+ * return the first (e.g. a $inc on a counter document), so blocks held by
+ * different processes never overlap. Values come from memory; a store
+ * round trip happens once per block, and the next block is reserved in the
+ * background when the current one runs low, so callers rarely wait on it.
+ * Values are increasing within a process; across processes they interleave
+ * by at most a block. Values left in a block when the process exits are
+ * never used.
+ */
+class BlockAllocator {
+  constructor({ reserve, blockSize = 100, prefetchRatio = 0.2 }) {
+    this.reserve = reserve;
+    this.blockSize = blockSize;
+    this.lowWater = Math.floor(blockSize * prefetchRatio);
+    this.nextValue = 0;
+    this.end = -1; // Last value of the current block; empty until the first reserve
+    this.upcoming = null; // Promise of the next block's first value
+    this.blocks = 0;
+  }
+
+  async next() {
+    for (;;) {
+      if (this.nextValue <= this.end) {
+        const value = this.nextValue;
+        this.nextValue += 1;
+        if (!this.upcoming && this.end - value < this.lowWater) {
+          this._reserveNext();
+        }
+        return value;
+      }
+
+      if (!this.upcoming) {
+        this._reserveNext();
+      }
+      const upcoming = this.upcoming;
+      const start = await upcoming;
+      // Of all callers waiting on this block, the first to resume installs
+      // it; the others loop and take values from it
+      if (this.upcoming === upcoming) {
+        this.upcoming = null;
+        this.nextValue = start;
+        this.end = start + this.blockSize - 1;
+      }
+    }
+  }
+
+  _reserveNext() {
+    const upcoming = Promise.resolve().then(() => this.reserve(this.blockSize));
+    this.upcoming = upcoming;
+    this.blocks += 1;
+    // A failed reservation is retried by the next caller. Waiting callers
+    // get the error; a background prefetch failing is not unhandled.
+    upcoming.catch(() => {
+      if (this.upcoming === upcoming) {
+        this.upcoming = null;
+      }
+    });
+  }
+
+  stats() {
+    return {
+      blockSize: this.blockSize,
+      blocks: this.blocks,
+      remaining: Math.max(0, this.end - this.nextValue + 1),
+    };
+  }
+}
+
+module.exports = BlockAllocator;
@@ -0,0 +1,67 @@
+/**
+ * Circuit breaker for calls to another service.
+ *
+ * After 'failureThreshold' consecutive failures the circuit opens and calls
+ * fail fast with 'Circuit open' instead of waiting on a service that is
+ * down. Once 'resetTimeoutMs' has passed, one trial call is let through
+ * (half-open): success closes the circuit, failure opens it again.
+ */
+class CircuitBreaker {
+  constructor({ failureThreshold = 5, resetTimeoutMs = 30000 } = {}) {
+    this.failureThreshold = failureThreshold;
+    this.resetTimeoutMs = resetTimeoutMs;
+    this.state = 'closed';
+    this.failures = 0;
+    this.openedAt = 0;
+    this.opens = 0;
+    this.rejected = 0;
+  }
+
+  async exec(fn) {
+    if (!this._allow()) {
+      this.rejected += 1;
+      throw new Error('Circuit open');
+    }
+
+    try {
+      const result = await fn();
+      this.failures = 0;
+      this.state = 'closed';
+      return result;
+    } catch (error) {
+      this._recordFailure();
+      throw error;
+    }
+  }
+
+  _allow() {
+    if (this.state === 'closed') {
+      return true;
+    }
+    if (this.state === 'open' && Date.now() - this.openedAt >= this.resetTimeoutMs) {
+      this.state = 'half-open'; // This call is the trial
+      return true;
+    }
+    return false; // Open, or half-open with the trial still running
+  }
+
+  _recordFailure() {
+    this.failures += 1;
+    if (this.state === 'half-open' || this.failures >= this.failureThreshold) {
+      this.state = 'open';
+      this.openedAt = Date.now();
+      this.opens += 1;
+    }
+  }
+
+  stats() {
+    return {
+      state: this.state,
+      failures: this.failures,
+      opens: this.opens,
+      rejected: this.rejected,
+    };
+  }
+}
+
+module.exports = CircuitBreaker;
@@ -0,0 +1,157 @@
+const cluster = require('cluster');
+
+/**
+ * Messages between the workers of cluster.js, relayed by the primary over
+ * the cluster IPC channels.
+ *
+ *   publish(channel, payload)  delivered to the subscribers of every other
+ *                              worker (e.g. cache invalidations)
+ *   gather(channel)            asks every worker, this one included, for
+ *                              its answer(channel) result (e.g. metrics)
+ *
+ * Outside cluster mode (npm start) there are no other workers: publish()
+ * does nothing and gather() answers from this process alone. The primary
+ * runs startRelay().
+ */
+
+const MESSAGE_TYPE = 'smartcart:bus';
+const DEFAULT_GATHER_TIMEOUT_MS = 2000;
+
+const inCluster = cluster.isWorker && typeof process.send === 'function';
+const subscribers = new Map(); // channel -> [handler]
+const responders = new Map(); // channel -> async () => result
+const gathering = new Map(); // request id -> resolve
+let nextRequestId = 0;
+
+const send = (message) => {
+  if (process.connected) {
+    process.send({ type: MESSAGE_TYPE, ...message });
+  }
+};
+
+const publish = (channel, payload) => {
+  if (inCluster) {
+    send({ op: 'publish', channel, payload });
+  }
+};
+
+const subscribe = (channel, handler) => {
+  subscribers.set(channel, [...(subscribers.get(channel) || []), handler]);
+};
+
+const answer = (channel, responder) => {
+  responders.set(channel, responder);
+};
+
+// Workers that do not answer within 'timeoutMs' (e.g. one that just died)
+// are left out of the result
+const gather = async (channel, timeoutMs = DEFAULT_GATHER_TIMEOUT_MS) => {
+  if (!inCluster) {
+    const responder = responders.get(channel);
+    return responder ? [await responder()] : [];
+  }
+  nextRequestId += 1;
+  const id = nextRequestId;
+  return new Promise((resolve) => {
+    // In case the primary never replies, e.g. while it is shutting down
+    const fallback = setTimeout(() => {
+      gathering.delete(id);
+      resolve([]);
+    }, timeoutMs * 2);
+    gathering.set(id, (results) => {
+      clearTimeout(fallback);
+      resolve(results);
+    });
+    send({ op: 'gather', id, channel, timeoutMs });
+  });
+};
+
+if (inCluster) {
+  process.on('message', async (message) => {
+    if (!message || message.type !== MESSAGE_TYPE) {
+      return;
+    }
+    if (message.op === 'publish') {
+      for (const handler of subscribers.get(message.channel) || []) {
+        try {
+          await handler(message.payload);
+        } catch (error) {
+          console.error(`Cluster message on ${message.channel} failed: ${error.message}`);
+        }
+      }
+    } else if (message.op === 'collect') {
+      const responder = responders.get(message.channel);
+      let result = null;
+      try {
+        result = responder ? await responder() : null;
+      } catch (error) {
+        console.error(`Could not answer ${message.channel}: ${error.message}`);
+      }
+      send({ op: 'collected', key: message.key, result });
+    } else if (message.op === 'gathered') {
+      const resolve = gathering.get(message.id);
+      gathering.delete(message.id);
+      if (resolve) {
+        resolve(message.results.filter((result) => result !== null));
+      }
+    }
+  });
+}
+
+/**
+ * @desc    Primary side: forwards published messages to the other workers
+ *          and fans gather requests out to all of them
+ */
+const startRelay = () => {
+  const requests = new Map(); // `${workerId}:${id}` -> { requester, id, results, waiting, timer }
+
+  const finish = (key) => {
+    const request = requests.get(key);
+    requests.delete(key);
+    clearTimeout(request.timer);
+    if (request.requester.isConnected()) {
+      request.requester.send({ type: MESSAGE_TYPE, op: 'gathered', id: request.id, results: request.results });
+    }
+  };
+
+  cluster.on('message', (worker, message) => {
+    if (!message || message.type !== MESSAGE_TYPE) {
+      return;
+    }
+    const workers = Object.values(cluster.workers).filter((other) => other.isConnected());
+
+    if (message.op === 'publish') {
+      workers.filter((other) => other !== worker).forEach((other) => other.send(message));
+    } else if (message.op === 'gather') {
+      const key = `${worker.id}:${message.id}`;
+      requests.set(key, {
+        requester: worker,
+        id: message.id,
+        results: [],
+        waiting: new Set(workers.map((other) => other.id)),
+        timer: setTimeout(() => finish(key), message.timeoutMs),
+      });
+      workers.forEach((other) => other.send({ type: MESSAGE_TYPE, op: 'collect', channel: message.channel, key }));
+    } else if (message.op === 'collected') {
+      const request = requests.get(message.key);
+      if (request && request.waiting.delete(worker.id)) {
+        request.results.push(message.result);
+        if (request.waiting.size === 0) {
+          finish(message.key);
+        }
+      }
+    }
+  });
+};
+
+// This worker's id under cluster.js, or null for a single process
+const workerId = () => (inCluster ? cluster.worker.id : null);
+
+module.exports = {
+  publish,
+  subscribe,
+  answer,
+  gather,
+  startRelay,
+  workerId,
+};
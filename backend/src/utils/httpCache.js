@@ -0,0 +1,187 @@
+const crypto = require('crypto');
+const zlib = require('zlib');
+const { promisify } = require('util');
+const MemoryCache = require('./memoryCache');
+const { registry, Counter } = require('./metrics');
+
+/**
+ * Conditional GET and compression for serialized JSON responses.
+ *
+ * Handlers pass the data they are about to serialize together with its
+ * validators:
+ *   - a strong entity tag over everything the body is built from: the _id
+ *     and updatedAt of each document (Mongoose timestamps bump updatedAt on
+ *     save, updateOne and bulkWrite), plus counters or pagination the body
+ *     shows. See entityTag().
+ *   - Last-Modified, for single-document views only: a list can lose a
+ *     document without its newest updatedAt moving.
+ * A request whose If-None-Match (or, without one, If-Modified-Since) still
+ * matches gets 304 before the body is serialized. Other bodies of at least
+ * COMPRESSION_MIN_BYTES are compressed with brotli or gzip, as the client's
+ * Accept-Encoding prefers, on the libuv thread pool. Compressed bodies are
+ * kept by entity tag, so a popular list is compressed once per version.
+ */
+
+const MIN_BYTES = parseInt(process.env.COMPRESSION_MIN_BYTES, 10) || 1024;
+// Brotli's default (11) is meant for static files; 4 compresses about as
+// well as gzip at a similar speed
+const BROTLI_QUALITY = parseInt(process.env.BROTLI_QUALITY, 10) || 4;
+
+const brotliCompress = promisify(zlib.brotliCompress);
+const gzip = promisify(zlib.gzip);
+
+const COMPRESSORS = {
+  br: (buffer) =>
+    brotliCompress(buffer, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+        [zlib.constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: buffer.length,
+      },
+    }),
+  gzip: (buffer) => gzip(buffer),
+};
+// Server preference when the client weighs both the same
+const ENCODINGS = ['br', 'gzip'];
+
+const compressedBodies = new MemoryCache({
+  maxEntries: parseInt(process.env.COMPRESSED_CACHE_ENTRIES, 10) || 200,
+  ttlSeconds: 300,
+});
+
+const notModifiedResponses = registry.register(new Counter({
+  name: 'http_not_modified_responses_total',
+  help: 'Conditional GETs answered 304 Not Modified.',
+}));
+const compressionSavedBytes = registry.register(new Counter({
+  name: 'http_compression_saved_bytes_total',
+  help: 'Response bytes saved by compression, by content encoding.',
+  labelNames: ['encoding'],
+}));
+
+/**
+ * @desc    Strong entity tag ("<sha1 hex>") over 'parts': strings, numbers,
+ *          Dates, ObjectIds, null/undefined or (nested) arrays of them. The
+ *          parts must determine the body: equal parts, identical bytes.
+ */
+const entityTag = (...parts) => {
+  const hash = crypto.createHash('sha1');
+  const add = (part) => {
+    if (Array.isArray(part)) {
+      hash.update('[');
+      part.forEach(add);
+      hash.update(']');
+    } else {
+      hash.update(`${part instanceof Date ? part.getTime() : part}\u0000`);
+    }
+  };
+  parts.forEach(add);
+  return `"${hash.digest('hex')}"`;
+};
+
+// A compressed body is a different representation, so its tag gets the
+// encoding appended; hex tags never contain '-'
+const tagFor = (etag, encoding) => (encoding ? `${etag.slice(0, -1)}-${encoding}"` : etag);
+const baseTag = (tag) => tag.replace(/^W\//, '').replace(/-[a-z]+"$/, '"');
+
+/**
+ * @desc    The client's validator that still matches, if any: an entry of
+ *          If-None-Match (weak comparison, any encoding of 'etag'), or
+ *          If-Modified-Since not older than 'lastModified' when there is no
+ *          If-None-Match
+ * @returns {string|null} Tag to send with the 304
+ */
+const matchingValidator = (headers, etag, lastModified) => {
+  const ifNoneMatch = headers['if-none-match'];
+  if (ifNoneMatch) {
+    const tags = ifNoneMatch.split(',').map((tag) => tag.trim());
+    if (tags.includes('*')) {
+      return etag;
+    }
+    return tags.find((tag) => baseTag(tag) === etag) || null;
+  }
+
+  const ifModifiedSince = headers['if-modified-since'];
+  if (lastModified && ifModifiedSince) {
+    const since = Date.parse(ifModifiedSince);
+    // HTTP dates have whole seconds
+    if (!Number.isNaN(since) && Math.floor(lastModified.getTime() / 1000) * 1000 <= since) {
+      return etag;
+    }
+  }
+  return null;
+};
+
+/**
+ * @desc    Content encoding to use for an Accept-Encoding header, or null
+ *          for identity. Honours q-values, including q=0 and '*'.
+ */
+const negotiateEncoding = (acceptEncoding = '') => {
+  const weights = new Map();
+  for (const entry of acceptEncoding.split(',')) {
+    const [name, ...params] = entry.trim().toLowerCase().split(';');
+    const q = params.map((param) => param.trim()).find((param) => param.startsWith('q='));
+    weights.set(name.trim(), q ? Number(q.slice(2)) : 1);
+  }
+
+  let chosen = null;
+  let chosenWeight = 0;
+  for (const encoding of ENCODINGS) {
+    const weight = weights.has(encoding) ? weights.get(encoding) : weights.get('*') || 0;
+    if (weight > chosenWeight) {
+      chosen = encoding;
+      chosenWeight = weight;
+    }
+  }
+  return chosen;
+};
+
+/**
+ * @desc    Sends 'body' through 'serialize' with the validators and
+ *          Cache-Control given, or 304 when the client's copy is current
+ * @param   {object} options - serialize, body, etag, lastModified?, cacheControl
+ */
+const sendCacheable = async (req, res, { serialize, body, etag, lastModified, cacheControl }) => {
+  res.set('Cache-Control', cacheControl);
+  res.vary('Accept-Encoding');
+  if (lastModified) {
+    res.set('Last-Modified', lastModified.toUTCString());
+  }
+
+  const matched = matchingValidator(req.headers, etag, lastModified);
+  if (matched) {
+    notModifiedResponses.inc();
+    res.set('ETag', matched);
+    res.status(304).end();
+    return;
+  }
+
+  const encoding = negotiateEncoding(req.headers['accept-encoding']);
+  const cacheKey = `${etag}:${encoding}`;
+  let compressed = encoding ? await compressedBodies.get(cacheKey) : undefined;
+
+  if (compressed === undefined) {
+    const json = serialize(body);
+    if (!encoding || json.length < MIN_BYTES) {
+      res.set('ETag', etag);
+      res.status(200).type('json').send(json);
+      return;
+    }
+    const raw = Buffer.from(json);
+    const bytes = await COMPRESSORS[encoding](raw);
+    compressed = { bytes, saved: raw.length - bytes.length };
+    await compressedBodies.set(cacheKey, compressed);
+  }
+
+  compressionSavedBytes.inc({ encoding }, compressed.saved);
+  res.set('ETag', tagFor(etag, encoding));
+  res.set('Content-Encoding', encoding);
+  res.status(200).type('json').send(compressed.bytes);
+};
+
+module.exports = {
+  entityTag,
+  matchingValidator,
+  negotiateEncoding,
+  sendCacheable,
+};
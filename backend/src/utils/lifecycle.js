@@ -0,0 +1,99 @@
+const { registry, Gauge } = require('./metrics');
+
+/**
+ * Tracks what a worker is in the middle of (requests, checkout
+ * transactions) so a shutdown can wait for it instead of cutting it off.
+ */
+const state = {
+  draining: false,
+  requests: 0,
+  transactions: 0,
+};
+let idleWaiters = [];
+
+registry.register(new Gauge({
+  name: 'http_requests_in_flight',
+  help: 'Requests this process has received and not yet answered.',
+  collect: () => state.requests,
+}));
+
+const isIdle = () => state.requests === 0 && state.transactions === 0;
+
+const settle = () => {
+  if (isIdle()) {
+    idleWaiters.forEach((resolve) => resolve());
+    idleWaiters = [];
+  }
+};
+
+/**
+ * @desc    Counts in-flight requests. While draining, responses carry
+ *          'Connection: close' so keep-alive clients reconnect to a
+ *          worker that is still serving.
+ */
+const trackRequests = (req, res, next) => {
+  state.requests += 1;
+  if (state.draining) {
+    res.setHeader('Connection', 'close');
+  }
+  // 'close' also fires when the client goes away before the response ends
+  res.once('close', () => {
+    state.requests -= 1;
+    settle();
+  });
+  next();
+};
+
+/**
+ * @desc    Runs 'work' (a function that runs a transaction) counted as an
+ *          open transaction, so shutdown waits for its commit or abort.
+ */
+const trackTransaction = async (work) => {
+  state.transactions += 1;
+  try {
+    return await work();
+  } finally {
+    state.transactions -= 1;
+    settle();
+  }
+};
+
+/**
+ * @desc    Stops accepting connections and waits until in-flight requests
+ *          and transactions have finished, or 'timeoutMs' has passed.
+ * @param   {http.Server} server
+ * @param   {number} timeoutMs
+ * @returns {boolean} true when everything finished in time
+ */
+const drain = async (server, timeoutMs) => {
+  state.draining = true;
+  server.close();
+  // Keep-alive sockets with no request on them would hold close() open
+  server.closeIdleConnections();
+
+  if (isIdle()) {
+    return true;
+  }
+  let timer;
+  const timedOut = new Promise((resolve) => {
+    timer = setTimeout(() => resolve(false), timeoutMs);
+  });
+  const idle = new Promise((resolve) => idleWaiters.push(() => resolve(true)));
+  const drained = await Promise.race([idle, timedOut]);
+  clearTimeout(timer);
+  // Sockets whose last response started before the drain are idle now
+  server.closeIdleConnections();
+  return drained;
+};
+
+const isDraining = () => state.draining;
+
+const stats = () => ({ ...state });
+
+module.exports = {
+  trackRequests,
+  trackTransaction,
+  drain,
+  isDraining,
+  stats,
+};
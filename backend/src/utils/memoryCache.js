@@ -0,0 +1,66 @@
+/**
+ * In-process LRU cache with per-entry TTL.
+ *
+ * The methods are async on purpose: any store exposing the same
+ * get/set/del/delByPrefix/clear/size interface (e.g. a Redis-backed one)
+ * can be handed to CacheService.setStore() without touching the callers.
+ */
+class MemoryCache {
+  constructor({ maxEntries = 1000, ttlSeconds = 300 } = {}) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlSeconds * 1000;
+    this.entries = new Map(); // Map keeps insertion order, oldest first
+    this.evictions = 0;
+  }
+
+  async get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+
+    // Re-insert to mark the entry as most recently used
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  async set(key, value, ttlSeconds) {
+    const ttlMs = ttlSeconds ? ttlSeconds * 1000 : this.ttlMs;
+
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + ttlMs });
+
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value;
+      this.entries.delete(oldestKey);
+      this.evictions += 1;
+    }
+  }
+
+  async del(key) {
+    this.entries.delete(key);
+  }
+
+  async delByPrefix(prefix) {
+    for (const key of this.entries.keys()) {
+      if (key.startsWith(prefix)) {
+        this.entries.delete(key);
+      }
+    }
+  }
+
+  async clear() {
+    this.entries.clear();
+  }
+
+  async size() {
+    return this.entries.size;
+  }
+}
+
+module.exports = MemoryCache;
@@ -0,0 +1,189 @@
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+/**
+ * Minimal Prometheus metrics: counters, histograms and gauges rendered in
+ * the text exposition format (version 0.0.4). Each labelled series is a
+ * Map entry, so observing is a lookup plus a few additions.
+ */
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+const formatLabels = (labels) => {
+  const pairs = Object.entries(labels).map(([name, value]) => `${name}="${escapeLabel(value)}"`);
+  return pairs.length === 0 ? '' : `{${pairs.join(',')}}`;
+};
+
+class Metric {
+  constructor({ name, help, labelNames = [] }) {
+    this.name = name;
+    this.help = help;
+    this.labelNames = labelNames;
+    this.series = new Map();
+  }
+
+  _series(labels, create) {
+    const key = this.labelNames.map((name) => labels[name]).join('\u0000');
+    let series = this.series.get(key);
+    if (!series) {
+      const values = Object.fromEntries(this.labelNames.map((name) => [name, labels[name]]));
+      series = create(values);
+      this.series.set(key, series);
+    }
+    return series;
+  }
+
+  _header(type) {
+    return [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} ${type}`];
+  }
+}
+
+class Counter extends Metric {
+  inc(labels = {}, value = 1) {
+    this._series(labels, (values) => ({ labels: values, value: 0 })).value += value;
+  }
+
+  render(extraLabels = {}) {
+    const lines = this._header('counter');
+    for (const { labels, value } of this.series.values()) {
+      lines.push(`${this.name}${formatLabels({ ...labels, ...extraLabels })} ${value}`);
+    }
+    return lines;
+  }
+}
+
+class Histogram extends Metric {
+  constructor({ buckets, ...options }) {
+    super(options);
+    this.buckets = [...buckets].sort((a, b) => a - b);
+  }
+
+  observe(labels, value) {
+    const series = this._series(labels, (values) => ({
+      labels: values,
+      counts: new Array(this.buckets.length).fill(0),
+      sum: 0,
+      count: 0,
+    }));
+
+    // Per-bucket counts; made cumulative when rendered
+    const bucket = this.buckets.findIndex((bound) => value <= bound);
+    if (bucket !== -1) {
+      series.counts[bucket] += 1;
+    }
+    series.sum += value;
+    series.count += 1;
+  }
+
+  render(extraLabels = {}) {
+    const lines = this._header('histogram');
+    for (const series of this.series.values()) {
+      const { counts, sum, count } = series;
+      const labels = { ...series.labels, ...extraLabels };
+      let cumulative = 0;
+      this.buckets.forEach((bound, i) => {
+        cumulative += counts[i];
+        lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: bound })} ${cumulative}`);
+      });
+      lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${count}`);
+      lines.push(`${this.name}_sum${formatLabels(labels)} ${sum}`);
+      lines.push(`${this.name}_count${formatLabels(labels)} ${count}`);
+    }
+    return lines;
+  }
+}
+
+// Read when scraped, e.g. process memory
+class Gauge extends Metric {
+  constructor({ collect, ...options }) {
+    super(options);
+    this.collect = collect;
+  }
+
+  render(extraLabels = {}) {
+    return [...this._header('gauge'), `${this.name}${formatLabels(extraLabels)} ${this.collect()}`];
+  }
+}
+
+class Registry {
+  constructor() {
+    this.metrics = new Map();
+  }
+
+  register(metric) {
+    if (this.metrics.has(metric.name)) {
+      throw new Error(`Metric ${metric.name} is already registered`);
+    }
+    this.metrics.set(metric.name, metric);
+    return metric;
+  }
+
+  /**
+   * @desc    Every metric as { name, header, samples } (lines of the text
+   *          format), with 'extraLabels' (e.g. the cluster worker) on each
+   *          sample, so several processes' metrics can be merged by name
+   */
+  collect(extraLabels = {}) {
+    return [...this.metrics.values()].map((metric) => {
+      const lines = metric.render(extraLabels);
+      return { name: metric.name, header: lines.slice(0, 2), samples: lines.slice(2) };
+    });
+  }
+
+  render(extraLabels = {}) {
+    return renderCollected([this.collect(extraLabels)]);
+  }
+}
+
+// Merges the collect() output of several processes: one header per metric
+const renderCollected = (collections) => {
+  const byName = new Map();
+  for (const collection of collections) {
+    for (const { name, header, samples } of collection) {
+      if (!byName.has(name)) {
+        byName.set(name, [...header]);
+      }
+      byName.get(name).push(...samples);
+    }
+  }
+  return `${[...byName.values()].flat().join('\n')}\n`;
+};
+
+const registry = new Registry();
+
+// Event loop delay is where a blocked loop (sync bcrypt, big JSON) shows up
+const eventLoopDelay = monitorEventLoopDelay({ resolution: 20 });
+eventLoopDelay.enable();
+
+registry.register(new Gauge({
+  name: 'process_resident_memory_bytes',
+  help: 'Resident memory size in bytes.',
+  collect: () => process.memoryUsage().rss,
+}));
+registry.register(new Gauge({
+  name: 'nodejs_heap_used_bytes',
+  help: 'V8 heap in use in bytes.',
+  collect: () => process.memoryUsage().heapUsed,
+}));
+registry.register(new Gauge({
+  name: 'nodejs_eventloop_delay_p99_seconds',
+  help: '99th percentile event loop delay since the previous scrape.',
+  collect: () => {
+    const p99 = eventLoopDelay.percentile(99) / 1e9;
+    eventLoopDelay.reset();
+    return p99;
+  },
+}));
+registry.register(new Gauge({
+  name: 'process_uptime_seconds',
+  help: 'Seconds since the process started.',
+  collect: () => process.uptime(),
+}));
+
+module.exports = {
+  registry,
+  Registry,
+  renderCollected,
+  Counter,
+  Histogram,
+  Gauge,
+};
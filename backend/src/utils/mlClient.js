@@ -0,0 +1,91 @@
+const http = require('http');
+const https = require('https');
+const CircuitBreaker = require('./circuitBreaker');
+
+/**
+ * HTTP client for the Python ML service.
+ *
+ * Connections are kept alive in one pooled agent, so a call reuses an open
+ * socket instead of paying a TCP (and TLS) handshake. Every call has a
+ * total time budget, not just a socket idle timeout, and goes through a
+ * circuit breaker so an unreachable service costs nothing once it is open.
+ */
+class MlClient {
+  constructor({ baseUrl, timeoutMs = 500, batchTimeoutMs = 2000, maxSockets = 50, breaker } = {}) {
+    this.baseUrl = new URL(baseUrl);
+    this.transport = this.baseUrl.protocol === 'https:' ? https : http;
+    this.agent = new this.transport.Agent({ keepAlive: true, maxSockets });
+    this.timeoutMs = timeoutMs;
+    this.batchTimeoutMs = batchTimeoutMs;
+    this.breaker = breaker || new CircuitBreaker();
+  }
+
+  /**
+   * @returns {Promise<{ source: string, data: Array<{ productId: string, score: number }> }>}
+   */
+  recommend(userId, limit) {
+    const path = `/ml/recommend/${encodeURIComponent(userId)}?limit=${limit}`;
+    return this.request('GET', path, undefined, this.timeoutMs);
+  }
+
+  /**
+   * @returns {Promise<{ data: Array<{ userId: string, source: string, data: Array }> }>}
+   */
+  recommendBatch(userIds, limit) {
+    return this.request('POST', '/ml/recommend/batch', { userIds, limit }, this.batchTimeoutMs);
+  }
+
+  request(method, path, body, timeoutMs = this.timeoutMs) {
+    return this.breaker.exec(() => this._send(method, path, body, timeoutMs));
+  }
+
+  _send(method, path, body, timeoutMs) {
+    return new Promise((resolve, reject) => {
+      const payload = body === undefined ? null : JSON.stringify(body);
+      const headers = { Accept: 'application/json' };
+      if (payload) {
+        headers['Content-Type'] = 'application/json';
+        headers['Content-Length'] = Buffer.byteLength(payload);
+      }
+
+      const req = this.transport.request(
+        new URL(path, this.baseUrl),
+        { method, headers, agent: this.agent },
+        (res) => {
+          const chunks = [];
+          res.on('data', (chunk) => chunks.push(chunk));
+          res.on('error', reject);
+          res.on('end', () => {
+            if (res.statusCode >= 400) {
+              reject(new Error(`ML service responded with ${res.statusCode}`));
+              return;
+            }
+            try {
+              resolve(JSON.parse(Buffer.concat(chunks).toString()));
+            } catch {
+              reject(new Error('ML service sent invalid JSON'));
+            }
+          });
+        }
+      );
+
+      const timer = setTimeout(
+        () => req.destroy(new Error(`ML service timed out after ${timeoutMs}ms`)),
+        timeoutMs
+      );
+      req.on('close', () => clearTimeout(timer));
+      req.on('error', reject);
+      req.end(payload);
+    });
+  }
+
+  stats() {
+    return { baseUrl: this.baseUrl.origin, breaker: this.breaker.stats() };
+  }
+
+  close() {
+    this.agent.destroy();
+  }
+}
+
+module.exports = MlClient;
@@ -1,13 +1,47 @@
-const generateOrderNumber = () => {
-  const now = new Date();
-  const year = now.getFullYear();
-  const month = (now.getMonth() + 1).toString().padStart(2, '0');
-  const day = now.getDate().toString().padStart(2, '0');
-  
-  // Generate a 6-digit random hex string
-  const randomPart = Math.random().toString(16).substr(2, 6).toUpperCase();
-  
-  return `${year}-${month}-${day}-${randomPart}`;
+const Counter = require('../models/counterModel');
+const BlockAllocator = require('./blockAllocator');
+
+// Sequence digits: fixed width, so order numbers sort as strings
+const SEQUENCE_DIGITS = 10;
+
+/**
+ * @desc    'YYYY-MM-DD-' (UTC) plus the zero-padded sequence value, e.g.
+ *          '2025-03-14-0000012345'. Both parts only grow, so numbers sort
+ *          by time; random-suffix numbers from before are 6 hex characters
+ *          and can never collide with these.
+ */
+const formatOrderNumber = (sequence, date = new Date()) => {
+  const year = date.getUTCFullYear();
+  const month = (date.getUTCMonth() + 1).toString().padStart(2, '0');
+  const day = date.getUTCDate().toString().padStart(2, '0');
+  return `${year}-${month}-${day}-${String(sequence).padStart(SEQUENCE_DIGITS, '0')}`;
+};
+
+// One atomic $inc per block on the named counter; returns the block's first value
+const reserveBlock = (name) => async (size) => {
+  const counter = await Counter.findOneAndUpdate(
+    { _id: name },
+    { $inc: { seq: size } },
+    { upsert: true, new: true }
+  ).lean();
+  return counter.seq - size + 1;
 };
 
-module.exports = { generateOrderNumber };
\ No newline at end of file
+/**
+ * @desc    Order number generator backed by a block of the 'counter'
+ *          sequence. Unique across processes and cluster workers without a
+ *          database round trip per order.
+ * @returns {Function} async () => orderNumber
+ */
+const createOrderNumberGenerator = ({ counter = 'orderNumber', blockSize = 100 } = {}) => {
+  const allocator = new BlockAllocator({ reserve: reserveBlock(counter), blockSize });
+  const generate = async () => formatOrderNumber(await allocator.next());
+  generate.stats = () => allocator.stats();
+  return generate;
+};
+
+const generateOrderNumber = createOrderNumberGenerator({
+  blockSize: parseInt(process.env.ORDER_NUMBER_BLOCK_SIZE, 10) || 100,
+});
+
+module.exports = { generateOrderNumber, createOrderNumberGenerator, formatOrderNumber };
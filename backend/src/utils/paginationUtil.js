@@ -0,0 +1,75 @@
+const mongoose = require('mongoose');
+
+const DEFAULT_LIMIT = 20;
+const MAX_LIMIT = 100;
+
+const parseLimit = (limit, max = MAX_LIMIT) => {
+  const parsed = parseInt(limit, 10);
+  if (!Number.isFinite(parsed) || parsed < 1) {
+    return Math.min(DEFAULT_LIMIT, max);
+  }
+  return Math.min(parsed, max);
+};
+
+const parsePage = (page) => {
+  const parsed = parseInt(page, 10);
+  return Number.isFinite(parsed) && parsed > 0 ? parsed : 1;
+};
+
+// A cursor is the sort key + _id of the last document on a page, so the
+// next page is a range scan that starts right after it on the index.
+const encodeCursor = (field, value, id) => {
+  const isDate = value instanceof Date;
+  const payload = [field, isDate ? value.toISOString() : value, isDate, id.toString()];
+  return Buffer.from(JSON.stringify(payload)).toString('base64url');
+};
+
+const decodeCursor = (cursor, field) => {
+  try {
+    const [cursorField, value, isDate, id] = JSON.parse(
+      Buffer.from(cursor, 'base64url').toString('utf8')
+    );
+
+    if (cursorField !== field || !mongoose.Types.ObjectId.isValid(id)) {
+      throw new Error();
+    }
+
+    return {
+      value: isDate ? new Date(value) : value,
+      id: new mongoose.Types.ObjectId(id),
+    };
+  } catch (error) {
+    throw new Error('Invalid pagination cursor');
+  }
+};
+
+// Matches everything strictly after the cursor for a { field, _id } sort
+const buildKeysetFilter = (field, direction, cursor) => {
+  const op = direction === -1 ? '$lt' : '$gt';
+  return {
+    $or: [
+      { [field]: { [op]: cursor.value } },
+      { [field]: cursor.value, _id: { [op]: cursor.id } },
+    ],
+  };
+};
+
+const buildPagination = ({ page, limit, total, nextCursor }) => ({
+  page,
+  limit,
+  total,
+  pages: Math.ceil(total / limit),
+  nextCursor,
+  hasNextPage: nextCursor !== null,
+});
+
+module.exports = {
+  DEFAULT_LIMIT,
+  MAX_LIMIT,
+  parseLimit,
+  parsePage,
+  encodeCursor,
+  decodeCursor,
+  buildKeysetFilter,
+  buildPagination,
+};
@@ -0,0 +1,8 @@
+// Runs in the password pool's threads (see services/passwordService.js)
+const bcrypt = require('bcryptjs');
+const { serveTasks } = require('./workerPool');
+
+serveTasks({
+  hash: (password, cost) => bcrypt.hashSync(password, bcrypt.genSaltSync(cost)),
+  compare: (password, hash) => bcrypt.compareSync(password, hash),
+});
@@ -0,0 +1,123 @@
+const { registry, Counter, Histogram } = require('./metrics');
+const { currentRoute } = require('./requestContext');
+
+const SLOW_QUERY_MS = parseInt(process.env.SLOW_QUERY_MS, 10) || 100;
+
+const QUERY_OPS = [
+  'countDocuments',
+  'deleteMany',
+  'deleteOne',
+  'distinct',
+  'estimatedDocumentCount',
+  'find',
+  'findOne',
+  'findOneAndDelete',
+  'findOneAndReplace',
+  'findOneAndUpdate',
+  'replaceOne',
+  'updateMany',
+  'updateOne',
+];
+
+const queryDuration = registry.register(new Histogram({
+  name: 'mongodb_query_duration_seconds',
+  help: 'MongoDB operation latency by model, operation and the API route that issued it.',
+  labelNames: ['model', 'operation', 'route'],
+  buckets: [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5],
+}));
+
+const slowQueries = registry.register(new Counter({
+  name: 'mongodb_slow_queries_total',
+  help: `MongoDB operations that took at least SLOW_QUERY_MS (${SLOW_QUERY_MS}ms).`,
+  labelNames: ['model', 'operation', 'route'],
+}));
+
+/**
+ * The filter with every value replaced by its type, e.g.
+ * { userId: 'ObjectId', createdAt: { $lt: 'Date' } }: it names the index
+ * the query needs without logging customer data.
+ */
+const shapeOf = (value) => {
+  if (Array.isArray(value)) {
+    return value.length === 0 ? [] : [shapeOf(value[0])];
+  }
+  if (value instanceof Date) return 'Date';
+  if (value instanceof RegExp) return 'RegExp';
+  if (value && value._bsontype) return value._bsontype; // ObjectId, Decimal128, ...
+  if (value && typeof value === 'object') {
+    return Object.fromEntries(Object.entries(value).map(([key, inner]) => [key, shapeOf(inner)]));
+  }
+  return typeof value;
+};
+
+const pipelineShape = (pipeline) =>
+  pipeline.map((stage) => {
+    const [name] = Object.keys(stage);
+    return name === '$match' ? { $match: shapeOf(stage.$match) } : name;
+  });
+
+function startTimer() {
+  this._metricsStartedAt = process.hrtime.bigint();
+  this._metricsRoute = currentRoute();
+}
+
+const record = (target, model, operation, describe) => {
+  if (target._metricsStartedAt === undefined) {
+    return;
+  }
+  const seconds = Number(process.hrtime.bigint() - target._metricsStartedAt) / 1e9;
+  const labels = { model, operation, route: target._metricsRoute };
+  queryDuration.observe(labels, seconds);
+
+  if (seconds * 1000 >= SLOW_QUERY_MS) {
+    slowQueries.inc(labels);
+    console.warn(
+      `Slow query: ${model}.${operation} took ${Math.round(seconds * 1000)}ms ` +
+        `(route ${labels.route}) ${JSON.stringify(describe())}`
+    );
+  }
+};
+
+/**
+ * Global Mongoose plugin: times every query, aggregate and document save.
+ * Must be registered before the models are compiled. Cursors (no post hook)
+ * and Model-level insertMany/bulkWrite are not timed. Mongoose applies the
+ * plugin to child schemas too (order items, addresses, cart items); their
+ * save hooks run inside the parent's save, which is the one timed.
+ */
+const queryTimingPlugin = (schema) => {
+  function recordQuery() {
+    record(this, this.model.modelName, this.op, () => shapeOf(this.getFilter()));
+  }
+  function recordAggregate() {
+    record(this, this.model().modelName, 'aggregate', () => pipelineShape(this.pipeline()));
+  }
+  function startSaveTimer() {
+    if (!this.$isSubdocument) {
+      startTimer.call(this);
+    }
+  }
+  function recordSave() {
+    if (this.$isSubdocument || !this.constructor.modelName) {
+      return;
+    }
+    record(this, this.constructor.modelName, 'save', () => ({ isNew: this.isNew }));
+  }
+
+  schema.pre(QUERY_OPS, startTimer);
+  schema.post(QUERY_OPS, recordQuery);
+  schema.post(QUERY_OPS, function (error, res, next) {
+    recordQuery.call(this);
+    next(error);
+  });
+
+  schema.pre('aggregate', startTimer);
+  schema.post('aggregate', recordAggregate);
+
+  schema.pre('save', startSaveTimer);
+  schema.post('save', recordSave);
+};
+
+module.exports = queryTimingPlugin;
+module.exports.shapeOf = shapeOf;
+module.exports.pipelineShape = pipelineShape;
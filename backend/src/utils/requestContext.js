@@ -0,0 +1,37 @@
+const { AsyncLocalStorage } = require('async_hooks');
+
+// Per-request store that follows the request through every await, so code
+// far from the handler (e.g. the query timing plugin) knows which route it serves
+const requestContext = new AsyncLocalStorage();
+
+// The route pattern, not the URL, so '/api/v1/orders/:id' is one series
+const routeLabel = (req) => {
+  if (req.route) {
+    return req.route.path === '/' && req.baseUrl ? req.baseUrl : `${req.baseUrl}${req.route.path}`;
+  }
+  return req.baseUrl || 'unmatched';
+};
+
+// Called from asyncHandler: Express resets req.baseUrl when an error leaves
+// the router, so the route is remembered while it is still known
+const markRoute = (req) => {
+  const context = requestContext.getStore();
+  if (context) {
+    context.route = routeLabel(req);
+  }
+};
+
+const currentRoute = () => {
+  const context = requestContext.getStore();
+  if (!context) {
+    return 'none'; // Background work: view flushes, jobs, startup
+  }
+  return context.route || routeLabel(context.req);
+};
+
+module.exports = {
+  requestContext,
+  routeLabel,
+  markRoute,
+  currentRoute,
+};
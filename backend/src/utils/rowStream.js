@@ -0,0 +1,176 @@
+/**
+ * Streaming row parsers for bulk uploads.
+ *
+ * Both read a byte stream chunk by chunk and yield one row at a time as
+ * { line, row } (line: where the row starts in the file) or { line, error }
+ * for a row that could not be parsed, so an upload of any size is held in
+ * memory one row at a time. A row longer than 'maxRowLength' characters is
+ * skipped with an error instead of being buffered.
+ */
+
+const DEFAULT_MAX_ROW_LENGTH = 64 * 1024;
+
+/**
+ * @desc    Newline-delimited JSON: one object per line, blank lines skipped
+ * @param   {Readable} stream
+ */
+async function* parseNdjson(stream, { maxRowLength = DEFAULT_MAX_ROW_LENGTH } = {}) {
+  let buffered = '';
+  let line = 0;
+  let tooLong = false;
+
+  const finishLine = (text) => {
+    line += 1;
+    if (tooLong) {
+      tooLong = false;
+      return { line, error: `Row is longer than ${maxRowLength} characters` };
+    }
+    if (text.trim() === '') {
+      return null;
+    }
+    try {
+      const row = JSON.parse(text);
+      if (row === null || typeof row !== 'object' || Array.isArray(row)) {
+        return { line, error: 'Row must be a JSON object' };
+      }
+      return { line, row };
+    } catch (error) {
+      return { line, error: `Invalid JSON: ${error.message}` };
+    }
+  };
+
+  stream.setEncoding('utf8');
+  for await (const chunk of stream) {
+    let start = 0;
+    let newline = chunk.indexOf('\n');
+    while (newline !== -1) {
+      const parsed = finishLine(buffered + chunk.slice(start, newline));
+      buffered = '';
+      if (parsed) yield parsed;
+      start = newline + 1;
+      newline = chunk.indexOf('\n', start);
+    }
+    if (!tooLong) {
+      buffered += chunk.slice(start);
+      if (buffered.length > maxRowLength) {
+        tooLong = true;
+        buffered = '';
+      }
+    }
+  }
+  if (buffered !== '' || tooLong) {
+    const parsed = finishLine(buffered);
+    if (parsed) yield parsed;
+  }
+}
+
+/**
+ * @desc    CSV (RFC 4180): the first record is the header, fields may be
+ *          quoted, quoted fields may contain commas, "" and line breaks.
+ *          Rows are objects keyed by header; empty fields are left out.
+ * @param   {Readable} stream
+ */
+async function* parseCsv(stream, { maxRowLength = DEFAULT_MAX_ROW_LENGTH } = {}) {
+  let header = null;
+  let fields = [];
+  let field = '';
+  let quoted = false; // inside a quoted field
+  let afterQuote = false; // a quote was seen inside a quoted field: "" or the closing quote
+  let rowLength = 0;
+  let tooLong = false;
+  let line = 1; // physical line being read
+  let rowLine = 1; // line the current record started on
+
+  const endRecord = () => {
+    fields.push(field);
+    const record = fields;
+    const startedOn = rowLine;
+    const skipped = tooLong;
+    fields = [];
+    field = '';
+    rowLength = 0;
+    tooLong = false;
+    rowLine = line;
+
+    if (skipped) {
+      return { line: startedOn, error: `Row is longer than ${maxRowLength} characters` };
+    }
+    if (record.length === 1 && record[0].trim() === '') {
+      return null; // blank line
+    }
+    if (!header) {
+      header = record.map((name) => name.replace(/^\uFEFF/, '').trim()); // Excel writes a BOM
+      return null;
+    }
+    if (record.length !== header.length) {
+      return { line: startedOn, error: `Expected ${header.length} fields, found ${record.length}` };
+    }
+    const row = {};
+    header.forEach((name, i) => {
+      if (record[i] !== '') row[name] = record[i];
+    });
+    return { line: startedOn, row };
+  };
+
+  // Past the limit the row is only scanned for its end, not kept
+  const append = (char) => {
+    rowLength += 1;
+    if (rowLength > maxRowLength) {
+      tooLong = true;
+      field = '';
+      fields = [];
+    } else {
+      field += char;
+    }
+  };
+
+  stream.setEncoding('utf8');
+  for await (const chunk of stream) {
+    for (let i = 0; i < chunk.length; i += 1) {
+      const char = chunk[i];
+
+      if (quoted) {
+        if (afterQuote) {
+          afterQuote = false;
+          if (char === '"') {
+            append('"'); // "" is an escaped quote
+            continue;
+          }
+          quoted = false; // the previous quote closed the field; handle 'char' below
+        } else if (char === '"') {
+          afterQuote = true;
+          continue;
+        } else {
+          if (char === '\n') line += 1;
+          append(char);
+          continue;
+        }
+      }
+
+      if (char === '"' && field === '') {
+        quoted = true;
+      } else if (char === ',') {
+        if (!tooLong) fields.push(field);
+        field = '';
+      } else if (char === '\n') {
+        line += 1;
+        if (field.endsWith('\r')) field = field.slice(0, -1);
+        const parsed = endRecord();
+        if (parsed) yield parsed;
+      } else {
+        append(char);
+      }
+    }
+  }
+
+  if (field !== '' || fields.length > 0 || tooLong) {
+    if (field.endsWith('\r')) field = field.slice(0, -1);
+    const parsed = endRecord();
+    if (parsed) yield parsed;
+  }
+}
+
+module.exports = {
+  parseNdjson,
+  parseCsv,
+};
@@ -0,0 +1,117 @@
+/**
+ * Precompiled JSON serializers.
+ *
+ * A schema describes the response once:
+ *   'string' | 'number' | 'boolean' | 'date' | 'objectId' | 'any'
+ *   [itemSchema]                      an array
+ *   { field: schema, ... }            an object with exactly these fields
+ * compileSerializer() turns it into a function that writes the JSON
+ * directly: no key enumeration, no toJSON() calls, and fields not in the
+ * schema are never written. null is written as null and undefined fields
+ * are skipped, as JSON.stringify does.
+ */
+
+const PRIMITIVES = {
+  string: (value) => JSON.stringify(value),
+  number: (value) => (Number.isFinite(value) ? String(value) : 'null'),
+  boolean: (value) => (value ? 'true' : 'false'),
+  date: (value) => (value instanceof Date ? `"${value.toISOString()}"` : JSON.stringify(value)),
+  // Hex ids need no escaping
+  objectId: (value) => (typeof value === 'string' ? JSON.stringify(value) : `"${value.toString()}"`),
+  any: (value) => JSON.stringify(value),
+};
+
+const compileArray = (itemSchema) => {
+  const writeItem = compile(itemSchema);
+  return (value) => {
+    let out = '[';
+    for (let i = 0; i < value.length; i += 1) {
+      if (i > 0) out += ',';
+      const item = value[i];
+      out += item === undefined ? 'null' : writeItem(item);
+    }
+    return `${out}]`;
+  };
+};
+
+const compileObject = (properties) => {
+  const keys = Object.keys(properties);
+  const prefixes = keys.map((key) => `${JSON.stringify(key)}:`);
+  const writers = keys.map((key) => compile(properties[key]));
+
+  return (value) => {
+    let out = '{';
+    let separator = '';
+    for (let i = 0; i < keys.length; i += 1) {
+      const field = value[keys[i]];
+      if (field !== undefined) {
+        out += separator + prefixes[i] + writers[i](field);
+        separator = ',';
+      }
+    }
+    return `${out}}`;
+  };
+};
+
+const compile = (schema) => {
+  let write;
+  if (typeof schema === 'string') {
+    write = PRIMITIVES[schema];
+    if (!write) {
+      throw new Error(`Unknown serializer type: ${schema}`);
+    }
+  } else if (Array.isArray(schema)) {
+    write = compileArray(schema[0]);
+  } else {
+    write = compileObject(schema);
+  }
+  return (value) => (value === null ? 'null' : write(value));
+};
+
+const compileSerializer = (schema) => compile(schema);
+
+const MONGOOSE_TYPES = {
+  String: 'string',
+  Number: 'number',
+  Boolean: 'boolean',
+  Date: 'date',
+  ObjectId: 'objectId',
+};
+
+/**
+ * @desc    Serializer schema for 'fields' (a select() string such as
+ *          'name slug price') of a Mongoose schema, so a projection and its
+ *          serializer come from the same field list. Paths of other types
+ *          become 'any'; 'overrides' replace single fields (e.g. a populated ref).
+ */
+const schemaFromModel = (mongooseSchema, fields, overrides = {}) => {
+  const properties = { _id: 'objectId' };
+  for (const field of fields.split(/\s+/).filter(Boolean)) {
+    const path = mongooseSchema.path(field);
+    if (!path) {
+      throw new Error(`Unknown field for serializer: ${field}`);
+    }
+    if (path.instance === 'Array') {
+      const item = path.embeddedSchemaType || path.caster;
+      properties[field] = [MONGOOSE_TYPES[item && item.instance] || 'any'];
+    } else {
+      properties[field] = MONGOOSE_TYPES[path.instance] || 'any';
+    }
+  }
+  return { ...properties, ...overrides };
+};
+
+// All paths of a Mongoose schema except the version key, for detail views
+const allFields = (mongooseSchema) =>
+  Object.keys(mongooseSchema.paths).filter((field) => field !== '_id' && field !== '__v').join(' ');
+
+// Sends an already serialized body as JSON
+const sendSerialized = (res, serialize, body, statusCode = 200) =>
+  res.status(statusCode).type('json').send(serialize(body));
+
+module.exports = {
+  compileSerializer,
+  schemaFromModel,
+  allFields,
+  sendSerialized,
+};
@@ -0,0 +1,145 @@
+const { Worker, parentPort } = require('worker_threads');
+
+/**
+ * Fixed-size pool of worker threads for CPU-bound work that would otherwise
+ * block the event loop.
+ *
+ * run(op, ...args) calls handlers[op](...args) in a free thread (see
+ * serveTasks). When every thread is busy the call waits in a FIFO queue;
+ * once 'maxQueue' calls are waiting, further calls fail at once with
+ * 'Server is busy, please try again later' instead of letting latency grow
+ * without bound. Threads start on first use and a thread that dies is
+ * replaced; only the call it was running fails.
+ */
+class WorkerPool {
+  constructor({ filename, size = 2, maxQueue = 100 }) {
+    this.filename = filename;
+    this.size = size;
+    this.maxQueue = maxQueue;
+    this.workers = [];
+    this.idle = [];
+    this.queue = [];
+    this.nextId = 0;
+    this.closed = false;
+    this.completed = 0;
+    this.failed = 0;
+    this.rejected = 0;
+  }
+
+  run(op, ...args) {
+    if (this.closed) {
+      return Promise.reject(new Error('Worker pool is closed'));
+    }
+    this._start();
+    if (this.idle.length === 0 && this.queue.length >= this.maxQueue) {
+      this.rejected += 1;
+      return Promise.reject(new Error('Server is busy, please try again later'));
+    }
+
+    return new Promise((resolve, reject) => {
+      this.queue.push({ id: (this.nextId += 1), op, args, resolve, reject });
+      this._dispatch();
+    });
+  }
+
+  _start() {
+    while (this.workers.length < this.size) {
+      this._spawn();
+    }
+  }
+
+  _spawn() {
+    const worker = new Worker(this.filename);
+    worker.task = null;
+    worker.unref(); // only keeps the process alive while it runs a task (see _dispatch)
+
+    worker.on('message', ({ id, result, error }) => {
+      const { task } = worker;
+      if (!task || task.id !== id) {
+        return;
+      }
+      worker.task = null;
+      worker.unref();
+      if (error) {
+        this.failed += 1;
+        task.reject(new Error(error));
+      } else {
+        this.completed += 1;
+        task.resolve(result);
+      }
+      this.idle.push(worker);
+      this._dispatch();
+    });
+
+    // 'error' is followed by 'exit'; the exit handler cleans up
+    worker.on('error', (error) => {
+      console.error(`Worker thread failed: ${error.message}`);
+    });
+    worker.on('exit', (code) => {
+      this.workers = this.workers.filter((other) => other !== worker);
+      this.idle = this.idle.filter((other) => other !== worker);
+      if (worker.task) {
+        this.failed += 1;
+        worker.task.reject(new Error(`Worker thread exited with code ${code}`));
+        worker.task = null;
+      }
+      if (!this.closed) {
+        this._spawn();
+        this._dispatch();
+      }
+    });
+
+    this.workers.push(worker);
+    this.idle.push(worker);
+  }
+
+  _dispatch() {
+    while (this.idle.length > 0 && this.queue.length > 0) {
+      const worker = this.idle.shift();
+      const task = this.queue.shift();
+      worker.task = task;
+      worker.ref();
+      worker.postMessage({ id: task.id, op: task.op, args: task.args });
+    }
+  }
+
+  stats() {
+    return {
+      threads: this.workers.length,
+      busy: this.workers.length - this.idle.length,
+      queued: this.queue.length,
+      completed: this.completed,
+      failed: this.failed,
+      rejected: this.rejected,
+    };
+  }
+
+  async close() {
+    this.closed = true;
+    this.queue.forEach((task) => task.reject(new Error('Worker pool is closed')));
+    this.queue = [];
+    await Promise.all(this.workers.map((worker) => worker.terminate()));
+  }
+}
+
+/**
+ * @desc    Worker side of the pool: answers each { id, op, args } message
+ *          with handlers[op](...args) or the error it threw
+ * @param   {object} handlers
+ */
+const serveTasks = (handlers) => {
+  parentPort.on('message', ({ id, op, args }) => {
+    try {
+      const handler = handlers[op];
+      if (!handler) {
+        throw new Error(`Unknown worker operation: ${op}`);
+      }
+      parentPort.postMessage({ id, result: handler(...args) });
+    } catch (error) {
+      parentPort.postMessage({ id, error: error.message });
+    }
+  });
+};
+
+module.exports = WorkerPool;
+module.exports.serveTasks = serveTasks;
@@ -0,0 +1,75 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const BlockAllocator = require('../src/utils/blockAllocator');
+
+// Stands in for the counter document: an atomic $inc with a round-trip delay
+const counterStore = () => {
+  const store = { seq: 0, reserves: 0 };
+  store.reserve = async (size) => {
+    store.reserves += 1;
+    store.seq += size;
+    const first = store.seq - size + 1;
+    await new Promise((resolve) => setTimeout(resolve, Math.random() * 3));
+    return first;
+  };
+  return store;
+};
+
+test('allocators sharing a counter never hand out the same value', async () => {
+  const store = counterStore();
+  const allocators = Array.from({ length: 8 }, () => new BlockAllocator({ reserve: store.reserve, blockSize: 50 }));
+
+  const perAllocator = await Promise.all(
+    allocators.map(async (allocator) => {
+      const values = [];
+      // Concurrent callers on one allocator, like parallel checkouts in a worker
+      await Promise.all(
+        Array.from({ length: 16 }, async () => {
+          for (let i = 0; i < 250; i += 1) {
+            values.push(await allocator.next());
+          }
+        })
+      );
+      return values;
+    })
+  );
+
+  const all = perAllocator.flat();
+  assert.strictEqual(all.length, 8 * 16 * 250);
+  assert.strictEqual(new Set(all).size, all.length);
+  for (const values of perAllocator) {
+    // Handed out in increasing order within a process
+    values.forEach((value, i) => i > 0 && assert.ok(value > values[i - 1]));
+  }
+  // About one reservation per block, plus at most one unused prefetch each
+  assert.ok(store.reserves <= all.length / 50 + allocators.length);
+});
+
+test('reserves the next block before the current one runs out', async () => {
+  const store = counterStore();
+  const allocator = new BlockAllocator({ reserve: store.reserve, blockSize: 10, prefetchRatio: 0.3 });
+
+  for (let i = 0; i < 8; i += 1) {
+    await allocator.next();
+  }
+  assert.strictEqual(store.reserves, 2);
+  await allocator.upcoming;
+  assert.deepStrictEqual(await Promise.all([allocator.next(), allocator.next(), allocator.next()]), [9, 10, 11]);
+  assert.strictEqual(store.reserves, 2);
+  assert.deepStrictEqual(allocator.stats(), { blockSize: 10, blocks: 2, remaining: 9 });
+});
+
+test('a failed reservation reaches the callers and is retried', async () => {
+  const store = counterStore();
+  let fail = true;
+  const allocator = new BlockAllocator({
+    reserve: (size) => (fail ? Promise.reject(new Error('not primary')) : store.reserve(size)),
+    blockSize: 5,
+  });
+
+  const results = await Promise.allSettled([allocator.next(), allocator.next()]);
+  assert.deepStrictEqual(results.map((result) => result.reason && result.reason.message), ['not primary', 'not primary']);
+
+  fail = false;
+  assert.deepStrictEqual(await Promise.all([allocator.next(), allocator.next()]), [1, 2]);
+});
@@ -0,0 +1,51 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { createCache } = require('../src/services/cacheService');
+
+const deferred = () => {
+  let resolve;
+  const promise = new Promise((done) => (resolve = done));
+  return { promise, resolve };
+};
+
+test('a load running across an invalidation is returned but not cached', async () => {
+  const cache = createCache({ name: 'test', maxEntries: 10, ttlSeconds: 60 });
+  const read = deferred();
+  let loads = 0;
+
+  const first = cache.wrap('product:slug:a', () => {
+    loads += 1;
+    return read.promise;
+  });
+  const joined = cache.wrap('product:slug:a', () => assert.fail('should join the running load'));
+  await new Promise(setImmediate);
+
+  // The write lands while the old value is being read
+  await cache.invalidate('product:slug:a');
+  read.resolve('old');
+  assert.strictEqual(await first, 'old');
+  assert.strictEqual(await joined, 'old');
+
+  assert.strictEqual(await cache.wrap('product:slug:a', async () => 'new'), 'new');
+  assert.strictEqual(await cache.wrap('product:slug:a', async () => 'newer'), 'new');
+  assert.strictEqual(loads, 1);
+});
+
+test('prefix invalidation abandons matching loads only', async () => {
+  const cache = createCache({ name: 'test', maxEntries: 10, ttlSeconds: 60 });
+  const reads = { category: deferred(), other: deferred() };
+
+  const category = cache.wrap('category:all', () => reads.category.promise);
+  const other = cache.wrap('recs:u1', () => reads.other.promise);
+  await new Promise(setImmediate);
+
+  await cache.invalidatePrefix('category:');
+  // A miss after the invalidation starts its own load
+  const fresh = cache.wrap('category:all', async () => ['fresh']);
+  reads.category.resolve(['stale']);
+  reads.other.resolve(['kept']);
+  assert.deepStrictEqual(await Promise.all([category, other, fresh]), [['stale'], ['kept'], ['fresh']]);
+
+  assert.deepStrictEqual(await cache.wrap('category:all', async () => assert.fail()), ['fresh']);
+  assert.deepStrictEqual(await cache.wrap('recs:u1', async () => assert.fail()), ['kept']);
+});
@@ -0,0 +1,26 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const path = require('node:path');
+const { execFile } = require('node:child_process');
+const clusterBus = require('../src/utils/clusterBus');
+
+test('outside a cluster publish is a no-op and gather answers locally', async () => {
+  clusterBus.publish('nobody', { ignored: true });
+  clusterBus.answer('local', async () => 'here');
+  assert.deepStrictEqual(await clusterBus.gather('local'), ['here']);
+  assert.deepStrictEqual(await clusterBus.gather('unanswered'), []);
+  assert.strictEqual(clusterBus.workerId(), null);
+});
+
+test('the primary relays published messages to other workers and gathers from all', async () => {
+  const stdout = await new Promise((resolve, reject) => {
+    execFile(process.execPath, [path.join(__dirname, 'fixtures', 'clusterBusCluster.js')], { timeout: 10000 },
+      (error, out) => (error ? reject(error) : resolve(out)));
+  });
+  const results = JSON.parse(stdout).sort((a, b) => a.worker - b.worker);
+  // Worker 1 published: only worker 2 receives it
+  assert.deepStrictEqual(results, [
+    { worker: 1, seen: [] },
+    { worker: 2, seen: [{ from: 1 }] },
+  ]);
+});
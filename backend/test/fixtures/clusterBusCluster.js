@@ -0,0 +1,30 @@
+// Two-worker cluster for clusterBus.test.js; prints what the workers saw
+const cluster = require('cluster');
+const clusterBus = require('../../src/utils/clusterBus');
+
+if (cluster.isPrimary) {
+  clusterBus.startRelay();
+  const workers = [cluster.fork(), cluster.fork()];
+  let ready = 0;
+  cluster.on('message', (worker, message) => {
+    if (message === 'ready') {
+      ready += 1;
+      if (ready === workers.length) workers[0].send('go');
+    } else if (message.type === 'result') {
+      console.log(JSON.stringify(message.result));
+      workers.forEach((other) => other.kill());
+      process.exit(0);
+    }
+  });
+} else {
+  const seen = [];
+  clusterBus.subscribe('note', (payload) => seen.push(payload));
+  clusterBus.answer('seen', () => ({ worker: clusterBus.workerId(), seen }));
+  process.on('message', async (message) => {
+    if (message !== 'go') return;
+    clusterBus.publish('note', { from: clusterBus.workerId() });
+    await new Promise((resolve) => setTimeout(resolve, 100));
+    process.send({ type: 'result', result: await clusterBus.gather('seen', 1000) });
+  });
+  process.send('ready');
+}
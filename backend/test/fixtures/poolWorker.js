@@ -0,0 +1,19 @@
+// Worker for workerPool.test.js
+const { serveTasks } = require('../../src/utils/workerPool');
+
+const spin = (ms) => {
+  const until = Date.now() + ms;
+  while (Date.now() < until); // CPU-bound, like a bcrypt round
+};
+
+serveTasks({
+  square: (n) => n * n,
+  spin: (ms) => {
+    spin(ms);
+    return ms;
+  },
+  fail: (message) => {
+    throw new Error(message);
+  },
+  crash: () => process.exit(3),
+});
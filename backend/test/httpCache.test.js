@@ -0,0 +1,48 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { entityTag, matchingValidator, negotiateEncoding } = require('../src/utils/httpCache');
+
+const updated = new Date('2025-03-14T10:00:00.500Z');
+
+test('entity tags change with any part and keep array boundaries', () => {
+  const tag = entityTag([['a1', updated], ['b2', updated]], [1, 20, 2]);
+  assert.match(tag, /^"[0-9a-f]{40}"$/);
+  assert.strictEqual(tag, entityTag([['a1', new Date(updated)], ['b2', updated]], [1, 20, 2]));
+  assert.notStrictEqual(tag, entityTag([['a1', new Date(updated.getTime() + 1)], ['b2', updated]], [1, 20, 2]));
+  assert.notStrictEqual(tag, entityTag([['a1', updated]], [1, 20, 2]));
+  assert.notStrictEqual(entityTag(['a', 'b'], []), entityTag(['a'], ['b']));
+});
+
+test('If-None-Match matches any encoding of the tag and wins over If-Modified-Since', () => {
+  const etag = entityTag('doc', updated);
+  const gzipTag = `${etag.slice(0, -1)}-gzip"`;
+
+  assert.strictEqual(matchingValidator({ 'if-none-match': etag }, etag, updated), etag);
+  assert.strictEqual(matchingValidator({ 'if-none-match': `"other", W/${gzipTag}` }, etag), `W/${gzipTag}`);
+  assert.strictEqual(matchingValidator({ 'if-none-match': '*' }, etag), etag);
+  assert.strictEqual(
+    matchingValidator({ 'if-none-match': '"other"', 'if-modified-since': updated.toUTCString() }, etag, updated),
+    null
+  );
+});
+
+test('If-Modified-Since compares whole seconds and needs a Last-Modified', () => {
+  const etag = entityTag('doc', updated);
+  assert.strictEqual(matchingValidator({ 'if-modified-since': updated.toUTCString() }, etag, updated), etag);
+  assert.strictEqual(
+    matchingValidator({ 'if-modified-since': new Date(updated.getTime() - 1000).toUTCString() }, etag, updated),
+    null
+  );
+  assert.strictEqual(matchingValidator({ 'if-modified-since': updated.toUTCString() }, etag), null);
+  assert.strictEqual(matchingValidator({ 'if-modified-since': 'yesterday' }, etag, updated), null);
+});
+
+test('negotiates brotli or gzip by q-value', () => {
+  assert.strictEqual(negotiateEncoding('gzip, deflate, br'), 'br');
+  assert.strictEqual(negotiateEncoding('gzip, deflate'), 'gzip');
+  assert.strictEqual(negotiateEncoding('br;q=0.5, gzip'), 'gzip');
+  assert.strictEqual(negotiateEncoding('br;q=0, *'), 'gzip');
+  assert.strictEqual(negotiateEncoding('identity'), null);
+  assert.strictEqual(negotiateEncoding('*;q=0'), null);
+  assert.strictEqual(negotiateEncoding(undefined), null);
+});
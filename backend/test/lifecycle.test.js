@@ -0,0 +1,67 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const http = require('node:http');
+const Lifecycle = require('../src/utils/lifecycle');
+
+const listen = (handler) =>
+  new Promise((resolve) => {
+    const server = http.createServer((req, res) => Lifecycle.trackRequests(req, res, () => handler(req, res)));
+    server.listen(0, '127.0.0.1', () => resolve(server));
+  });
+
+const get = (port, agent) =>
+  new Promise((resolve, reject) => {
+    http.get({ host: '127.0.0.1', port, path: '/', agent }, (res) => {
+      let body = '';
+      res.on('data', (chunk) => (body += chunk));
+      res.on('end', () => resolve({ status: res.statusCode, connection: res.headers.connection, body }));
+    }).on('error', reject);
+  });
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// The lifecycle state is per process and draining is one way, so the
+// steps run in order inside a single test
+test('drain waits for in-flight work, gives up at the deadline and closes keep-alive', async () => {
+  const agent = new http.Agent({ keepAlive: true });
+  const server = await listen(async (req, res) => {
+    await sleep(150);
+    res.end('done');
+  });
+  const { port } = server.address();
+
+  // A keep-alive socket left idle must not hold the drain open
+  assert.strictEqual((await get(port, agent)).body, 'done');
+
+  let committed = false;
+  const transaction = Lifecycle.trackTransaction(async () => {
+    await sleep(250);
+    committed = true;
+  });
+  const inFlight = get(port);
+  await sleep(20);
+  assert.deepStrictEqual(Lifecycle.stats(), { draining: false, requests: 1, transactions: 1 });
+
+  const started = Date.now();
+  const drained = await Lifecycle.drain(server, 2000);
+  assert.strictEqual(drained, true);
+  assert.strictEqual(committed, true);
+  assert.ok(Date.now() - started >= 200, 'drain returned before the transaction finished');
+  assert.strictEqual((await inFlight).body, 'done');
+  assert.strictEqual(Lifecycle.isDraining(), true);
+  await transaction;
+
+  // Work that never finishes only holds the drain until the deadline
+  const stuck = Lifecycle.trackTransaction(() => sleep(1000));
+  const other = await listen(() => {});
+  assert.strictEqual(await Lifecycle.drain(other, 100), false);
+  assert.strictEqual(Lifecycle.stats().transactions, 1);
+  await stuck;
+  other.close();
+  agent.destroy();
+
+  // Requests answered while draining ask the client to reconnect elsewhere
+  const late = await listen((req, res) => res.end('ok'));
+  assert.strictEqual((await get(late.address().port)).connection, 'close');
+  late.close();
+});
@@ -0,0 +1,99 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const http = require('node:http');
+const { Registry, renderCollected, Counter, Histogram } = require('../src/utils/metrics');
+const { shapeOf, pipelineShape } = require('../src/utils/queryTimingPlugin');
+const { currentRoute, markRoute } = require('../src/utils/requestContext');
+const { recordRequestMetrics } = require('../src/middleware/metricsMiddleware');
+const { registry } = require('../src/utils/metrics');
+
+test('renders cumulative histogram buckets in the Prometheus format', () => {
+  const local = new Registry();
+  const histogram = local.register(new Histogram({
+    name: 'demo_seconds', help: 'Demo.', labelNames: ['route'], buckets: [0.1, 0.5],
+  }));
+  histogram.observe({ route: '/a' }, 0.05);
+  histogram.observe({ route: '/a' }, 0.3);
+  histogram.observe({ route: '/a' }, 2);
+
+  const text = local.render();
+  assert.match(text, /# TYPE demo_seconds histogram/);
+  assert.match(text, /demo_seconds_bucket\{route="\/a",le="0.1"\} 1\n/);
+  assert.match(text, /demo_seconds_bucket\{route="\/a",le="0.5"\} 2\n/);
+  assert.match(text, /demo_seconds_bucket\{route="\/a",le="\+Inf"\} 3\n/);
+  assert.match(text, /demo_seconds_count\{route="\/a"\} 3\n/);
+});
+
+test('escapes label values and rejects duplicate names', () => {
+  const local = new Registry();
+  const counter = local.register(new Counter({ name: 'demo_total', help: 'Demo.', labelNames: ['q'] }));
+  counter.inc({ q: 'say "hi"\n' }, 2);
+  assert.match(local.render(), /demo_total\{q="say \\"hi\\"\\n"\} 2/);
+  assert.throws(() => local.register(new Counter({ name: 'demo_total', help: 'Again.' })), /already registered/);
+});
+
+test('merges several workers\' metrics under one header each', () => {
+  const workers = [1, 2].map((worker) => {
+    const local = new Registry();
+    local.register(new Counter({ name: 'demo_total', help: 'Demo.', labelNames: ['q'] })).inc({ q: 'a' }, worker);
+    return local.collect({ worker });
+  });
+
+  assert.strictEqual(
+    renderCollected(workers),
+    [
+      '# HELP demo_total Demo.',
+      '# TYPE demo_total counter',
+      'demo_total{q="a",worker="1"} 1',
+      'demo_total{q="a",worker="2"} 2',
+      '',
+    ].join('\n')
+  );
+});
+
+test('describes filters by shape, not values', () => {
+  const filter = {
+    userId: { _bsontype: 'ObjectId' },
+    status: { $in: ['Pending', 'Paid'] },
+    createdAt: { $lt: new Date() },
+    slug: /^abc/,
+  };
+  assert.deepStrictEqual(shapeOf(filter), {
+    userId: 'ObjectId',
+    status: { $in: ['string'] },
+    createdAt: { $lt: 'Date' },
+    slug: 'RegExp',
+  });
+  assert.deepStrictEqual(
+    pipelineShape([{ $match: { date: { $gte: new Date() } } }, { $group: { _id: null } }]),
+    [{ $match: { date: { $gte: 'Date' } } }, '$group']
+  );
+});
+
+test('times requests by route pattern and carries the route across awaits', async () => {
+  let seenRoute;
+  const server = http.createServer((req, res) => {
+    recordRequestMetrics(req, res, async () => {
+      // What Express sets once '/:id' under '/api/v1/widgets' matches
+      req.baseUrl = '/api/v1/widgets';
+      req.route = { path: '/:id' };
+      markRoute(req);
+      await new Promise((resolve) => setTimeout(resolve, 5));
+      seenRoute = currentRoute();
+      res.statusCode = 404;
+      res.end();
+    });
+  });
+  await new Promise((resolve) => server.listen(0, '127.0.0.1', resolve));
+
+  await fetch(`http://127.0.0.1:${server.address().port}/api/v1/widgets/42`);
+  await new Promise((resolve) => setTimeout(resolve, 20)); // 'finish' after the client has the response
+  server.close();
+
+  assert.strictEqual(seenRoute, '/api/v1/widgets/:id');
+  assert.strictEqual(currentRoute(), 'none');
+  assert.match(
+    registry.render(),
+    /http_request_duration_seconds_count\{method="GET",route="\/api\/v1\/widgets\/:id",status="404"\} 1/
+  );
+});
@@ -0,0 +1,114 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const http = require('node:http');
+const MlClient = require('../src/utils/mlClient');
+const CircuitBreaker = require('../src/utils/circuitBreaker');
+
+// Stub ML service: answers like FastAPI, or as told by 'behaviour'
+const startStub = async () => {
+  const stub = { connections: 0, requests: [], behaviour: 'ok' };
+  stub.server = http.createServer((req, res) => {
+    let body = '';
+    req.on('data', (chunk) => (body += chunk));
+    req.on('end', () => {
+      stub.requests.push({ method: req.method, url: req.url, body });
+      if (stub.behaviour === 'error') {
+        res.writeHead(503, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ detail: 'Recommender is not trained yet' }));
+        return;
+      }
+      if (stub.behaviour === 'slow') {
+        return; // never answers
+      }
+      const userIds = body ? JSON.parse(body).userIds : [decodeURIComponent(req.url.split('/')[3].split('?')[0])];
+      const data = userIds.map((userId) => ({
+        userId,
+        source: 'collaborative',
+        data: [{ productId: `p-${userId}`, score: 1 }],
+      }));
+      res.writeHead(200, { 'Content-Type': 'application/json' });
+      res.end(JSON.stringify(body ? { success: true, count: data.length, data } : { success: true, ...data[0] }));
+    });
+  });
+  stub.server.on('connection', () => (stub.connections += 1));
+  await new Promise((resolve) => stub.server.listen(0, '127.0.0.1', resolve));
+  stub.url = `http://127.0.0.1:${stub.server.address().port}`;
+  return stub;
+};
+
+const stopStub = (stub, client) => {
+  client.close();
+  stub.server.closeAllConnections();
+  return new Promise((resolve) => stub.server.close(resolve));
+};
+
+test('reuses one keep-alive connection', async () => {
+  const stub = await startStub();
+  const client = new MlClient({ baseUrl: stub.url });
+
+  for (let i = 0; i < 5; i += 1) {
+    const result = await client.recommend(`user ${i}`, 3);
+    assert.strictEqual(result.userId, `user ${i}`);
+    assert.deepStrictEqual(result.data, [{ productId: `p-user ${i}`, score: 1 }]);
+  }
+  assert.strictEqual(stub.requests[0].url, '/ml/recommend/user%200?limit=3');
+  assert.strictEqual(stub.connections, 1);
+
+  await stopStub(stub, client);
+});
+
+test('posts batches as JSON', async () => {
+  const stub = await startStub();
+  const client = new MlClient({ baseUrl: stub.url });
+
+  const result = await client.recommendBatch(['a', 'b'], 4);
+  assert.deepStrictEqual(result.data.map((entry) => entry.userId), ['a', 'b']);
+  assert.strictEqual(stub.requests[0].method, 'POST');
+  assert.deepStrictEqual(JSON.parse(stub.requests[0].body), { userIds: ['a', 'b'], limit: 4 });
+
+  await stopStub(stub, client);
+});
+
+test('gives up after the time budget', async () => {
+  const stub = await startStub();
+  stub.behaviour = 'slow';
+  const client = new MlClient({ baseUrl: stub.url, timeoutMs: 50 });
+
+  const started = Date.now();
+  await assert.rejects(client.recommend('a', 1), /timed out after 50ms/);
+  assert.ok(Date.now() - started < 1000);
+
+  await stopStub(stub, client);
+});
+
+test('opens the circuit after repeated failures and closes it after a good trial', async () => {
+  const stub = await startStub();
+  stub.behaviour = 'error';
+  const breaker = new CircuitBreaker({ failureThreshold: 2, resetTimeoutMs: 100 });
+  const client = new MlClient({ baseUrl: stub.url, breaker });
+
+  await assert.rejects(client.recommend('a', 1), /responded with 503/);
+  await assert.rejects(client.recommend('a', 1), /responded with 503/);
+  await assert.rejects(client.recommend('a', 1), /Circuit open/);
+  assert.strictEqual(stub.requests.length, 2); // The open circuit never called the stub
+  assert.strictEqual(breaker.stats().state, 'open');
+
+  await new Promise((resolve) => setTimeout(resolve, 120));
+  stub.behaviour = 'ok';
+  const result = await client.recommend('a', 1);
+  assert.strictEqual(result.source, 'collaborative');
+  assert.deepStrictEqual(breaker.stats(), { state: 'closed', failures: 0, opens: 1, rejected: 1 });
+
+  await stopStub(stub, client);
+});
+
+test('a failed trial opens the circuit again', async () => {
+  const breaker = new CircuitBreaker({ failureThreshold: 1, resetTimeoutMs: 0 });
+  const fail = () => Promise.reject(new Error('down'));
+
+  await assert.rejects(breaker.exec(fail), /down/);
+  assert.strictEqual(breaker.state, 'open');
+  await assert.rejects(breaker.exec(fail), /down/); // The trial
+  assert.strictEqual(breaker.state, 'open');
+  assert.strictEqual(breaker.opens, 2);
+});
@@ -0,0 +1,50 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { Readable } = require('node:stream');
+const { parseCsv, parseNdjson } = require('../src/utils/rowStream');
+
+// Chunks are split at awkward places on purpose: inside quotes, rows and escapes
+const collect = async (parse, chunks, options) => {
+  const rows = [];
+  for await (const parsed of parse(Readable.from(chunks.map((chunk) => Buffer.from(chunk))), options)) {
+    rows.push(parsed);
+  }
+  return rows;
+};
+
+test('parses CSV with quotes, escapes and line breaks split across chunks', async () => {
+  const rows = await collect(parseCsv, [
+    '﻿sku,name,description\r\nA1,"Hello, ""W',
+    'orld""","multi\nline"\r\n\r\nB2,x\n',
+    'C3,y,',
+  ]);
+  assert.deepStrictEqual(rows, [
+    { line: 2, row: { sku: 'A1', name: 'Hello, "World"', description: 'multi\nline' } },
+    { line: 5, error: 'Expected 3 fields, found 2' },
+    { line: 6, row: { sku: 'C3', name: 'y' } },
+  ]);
+});
+
+test('parses NDJSON and reports bad lines without stopping', async () => {
+  const rows = await collect(parseNdjson, ['{"a":1}\n\n{"b"', ':2}\n[1]\nnot json\n{"c":3}']);
+  assert.deepStrictEqual(rows.map((row) => [row.line, row.row || row.error.split(':')[0]]), [
+    [1, { a: 1 }],
+    [3, { b: 2 }],
+    [4, 'Row must be a JSON object'],
+    [5, 'Invalid JSON'],
+    [6, { c: 3 }],
+  ]);
+});
+
+test('skips rows over the length limit instead of buffering them', async () => {
+  const long = 'x'.repeat(50);
+  assert.deepStrictEqual(await collect(parseCsv, ['a,b\n', `${long},1\n`, 'q,2'], { maxRowLength: 10 }), [
+    { line: 2, error: 'Row is longer than 10 characters' },
+    { line: 3, row: { a: 'q', b: '2' } },
+  ]);
+  assert.deepStrictEqual(await collect(parseNdjson, ['{"a":1}\n', long, long, '\n{"c":3}'], { maxRowLength: 20 }), [
+    { line: 1, row: { a: 1 } },
+    { line: 2, error: 'Row is longer than 20 characters' },
+    { line: 3, row: { c: 3 } },
+  ]);
+});
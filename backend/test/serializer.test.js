@@ -0,0 +1,68 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const { compileSerializer } = require('../src/utils/serializer');
+
+// Stands in for a BSON ObjectId: serialized through toString()
+class Id {
+  constructor(hex) {
+    this.hex = hex;
+  }
+
+  toString() {
+    return this.hex;
+  }
+}
+
+const card = {
+  _id: 'objectId',
+  name: 'string',
+  price: 'number',
+  images: ['string'],
+  createdAt: 'date',
+  categoryId: { _id: 'objectId', name: 'string' },
+};
+const serializeList = compileSerializer({ success: 'boolean', count: 'number', data: [card], pagination: 'any' });
+
+test('writes the same JSON as JSON.stringify for plain lean objects', () => {
+  const body = {
+    success: true,
+    count: 2,
+    data: [
+      {
+        _id: '64b7f0c2a1b2c3d4e5f60718',
+        name: 'Quote " and \\ backslash  ',
+        price: 12.5,
+        images: ['a.png', 'b.png'],
+        createdAt: new Date('2026-01-02T03:04:05.678Z'),
+        categoryId: { _id: '64b7f0c2a1b2c3d4e5f60719', name: 'Laptops' },
+      },
+      { _id: '64b7f0c2a1b2c3d4e5f6071a', name: 'No category', price: 0, images: [], categoryId: null },
+    ],
+    pagination: { page: 1, nextCursor: null },
+  };
+  assert.deepStrictEqual(JSON.parse(serializeList(body)), JSON.parse(JSON.stringify(body)));
+});
+
+test('serializes ObjectIds and dates without toJSON and drops fields outside the schema', () => {
+  const json = serializeList({
+    success: true,
+    count: 1,
+    data: [{
+      _id: new Id('64b7f0c2a1b2c3d4e5f60718'),
+      name: 'Laptop',
+      price: Number.NaN,
+      description: 'not part of a card',
+      __v: 0,
+      createdAt: new Date(0),
+    }],
+  });
+  assert.strictEqual(
+    json,
+    '{"success":true,"count":1,"data":[{"_id":"64b7f0c2a1b2c3d4e5f60718","name":"Laptop","price":null,' +
+      '"createdAt":"1970-01-01T00:00:00.000Z"}]}'
+  );
+});
+
+test('rejects unknown schema types when compiling', () => {
+  assert.throws(() => compileSerializer({ name: 'text' }), /Unknown serializer type: text/);
+});
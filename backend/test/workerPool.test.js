@@ -0,0 +1,44 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const path = require('node:path');
+const WorkerPool = require('../src/utils/workerPool');
+
+const filename = path.join(__dirname, 'fixtures/poolWorker.js');
+
+test('runs tasks in threads and keeps the event loop free', async () => {
+  const pool = new WorkerPool({ filename, size: 2 });
+  let ticks = 0;
+  const ticker = setInterval(() => (ticks += 1), 5);
+
+  const results = await Promise.all([pool.run('spin', 200), pool.run('spin', 200), pool.run('square', 7)]);
+  clearInterval(ticker);
+
+  assert.deepStrictEqual(results, [200, 200, 49]);
+  // On the main thread the two spins would have starved the timer
+  assert.ok(ticks >= 20, `only ${ticks} ticks while the pool was busy`);
+  assert.deepStrictEqual(pool.stats(), { threads: 2, busy: 0, queued: 0, completed: 3, failed: 0, rejected: 0 });
+  await pool.close();
+});
+
+test('rejects at once when the queue is full', async () => {
+  const pool = new WorkerPool({ filename, size: 1, maxQueue: 1 });
+  const running = pool.run('spin', 100);
+  const queued = pool.run('square', 3);
+  await assert.rejects(pool.run('square', 4), /Server is busy/);
+
+  assert.strictEqual(await running, 100);
+  assert.strictEqual(await queued, 9);
+  assert.strictEqual(pool.stats().rejected, 1);
+  await pool.close();
+});
+
+test('surfaces task errors and replaces a thread that dies', async () => {
+  const pool = new WorkerPool({ filename, size: 1 });
+  await assert.rejects(pool.run('fail', 'bad input'), /bad input/);
+  await assert.rejects(pool.run('crash'), /exited with code 3/);
+
+  assert.strictEqual(await pool.run('square', 5), 25);
+  assert.strictEqual(pool.stats().threads, 1);
+  await pool.close();
+  await assert.rejects(pool.run('square', 1), /closed/);
+});
@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# A local ml-service/.env wins; otherwise reuse the backend's MONGODB_URI
+ROOT_DIR = Path(__file__).resolve().parents[2]
+load_dotenv(Path(__file__).resolve().parents[1] / ".env")
+load_dotenv(ROOT_DIR / "backend" / ".env")
+
+MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017/smartcart")
+# Only needed when MONGODB_URI does not name a database
+MONGODB_DB = os.environ.get("MONGODB_DB", "smartcart")
+
+MODEL_DIR = Path(os.environ.get("MODEL_DIR", Path(__file__).resolve().parents[1] / "models"))
+# PRD 8.5 retrains weekly; workers check for a newer published version this often
+MODEL_RETRAIN_HOURS = float(os.environ.get("MODEL_RETRAIN_HOURS", 7 * 24))
+MODEL_RELOAD_SECONDS = float(os.environ.get("MODEL_RELOAD_SECONDS", 10))
+MODEL_KEEP_VERSIONS = int(os.environ.get("MODEL_KEEP_VERSIONS", 3))
+
+# Neighbours kept per product, and how many products a recommend call returns
+NEIGHBOURS_K = int(os.environ.get("NEIGHBOURS_K", 50))
+RECOMMEND_LIMIT = int(os.environ.get("RECOMMEND_LIMIT", 10))
+
+# Trending: PRD 8.3 scores the last 7 days; the feed polls product_activity
+TRENDING_WINDOW_HOURS = int(os.environ.get("TRENDING_WINDOW_HOURS", 7 * 24))
+TRENDING_LIMIT = int(os.environ.get("TRENDING_LIMIT", 20))
+TRENDING_REFRESH_SECONDS = float(os.environ.get("TRENDING_REFRESH_SECONDS", 60))
+# Each poll re-reads buckets updated this long before the newest one it has
+# seen: updatedAt comes from the writer's clock, so a write can commit after
+# a later-stamped one was already read
+TRENDING_POLL_SLACK_SECONDS = float(os.environ.get("TRENDING_POLL_SLACK_SECONDS", 30))
@@ -0,0 +1,54 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.config import RECOMMEND_LIMIT
+from app.services.model_loader import model_loader
+
+router = APIRouter(prefix="/ml", tags=["recommendations"])
+
+BATCH_MAX_USERS = 500
+
+
+class BatchRequest(BaseModel):
+    userIds: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_USERS)
+    limit: int = Field(RECOMMEND_LIMIT, ge=1, le=100)
+
+
+def _current_model():
+    model = model_loader.model
+    if model is None:
+        raise HTTPException(status_code=503, detail="Recommender is not trained yet")
+    return model
+
+
+def _recommendation(model, user_id, limit):
+    picks = model.recommend(user_id, limit=limit)
+    return {
+        "userId": user_id,
+        "source": model.name if model.knows(user_id) else model.popular.name,
+        "data": [{"productId": product_id, "score": round(score, 6)} for product_id, score in picks],
+    }
+
+
+@router.get("/recommend/{user_id}")
+def recommend(user_id: str, limit: int = Query(RECOMMEND_LIMIT, ge=1, le=100)):
+    return {"success": True, **_recommendation(_current_model(), user_id, limit)}
+
+
+@router.post("/recommend/batch")
+def recommend_batch(body: BatchRequest):
+    model = _current_model()  # One model for the whole batch, even if a swap lands mid-way
+    data = [_recommendation(model, user_id, body.limit) for user_id in dict.fromkeys(body.userIds)]
+    return {"success": True, "count": len(data), "data": data}
+
+
+@router.post("/train", status_code=202)
+def train():
+    started = model_loader.start_training()
+    return {
+        "success": True,
+        "data": {"version": model_loader.version, "training": model_loader.training},
+        "message": "Training started" if started else "Training is already running",
+    }
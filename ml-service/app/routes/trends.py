@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Query
+
+from app.config import TRENDING_LIMIT
+from app.services.trending import trending_scorer
+
+router = APIRouter(prefix="/ml", tags=["trends"])
+
+
+@router.get("/trending")
+def trending(limit: int = Query(TRENDING_LIMIT, ge=1, le=100)):
+    products = trending_scorer.top(limit)
+    return {"success": True, "count": len(products), "data": products}
@@ -0,0 +1,57 @@
+"""
+User x product interaction matrix built from purchase history.
+
+Each cell is log1p(total quantity the user bought of the product), so a bulk
+purchase counts for more than a single unit without drowning out everything
+else the user bought.
+"""
+import numpy as np
+from scipy import sparse
+
+ORDER_PROJECTION = {"_id": 0, "userId": 1, "items.productId": 1, "items.quantity": 1}
+CURSOR_BATCH_SIZE = 5_000
+
+
+def iter_purchases(db):
+    """Streams (user_id, product_id, quantity) from the orders collection."""
+    orders = db.orders.find({"status": {"$ne": "Cancelled"}}, ORDER_PROJECTION, batch_size=CURSOR_BATCH_SIZE)
+    for order in orders:
+        user_id = str(order["userId"])
+        for item in order.get("items", []):
+            yield user_id, str(item["productId"]), item.get("quantity", 1)
+
+
+def build_interaction_matrix(purchases):
+    """
+    Returns (matrix, user_ids, product_ids): a CSR float32 matrix with one row
+    per user and one column per product, plus the ids behind each row/column.
+    Repeated (user, product) pairs are summed before the log scaling.
+    """
+    user_index, product_index = {}, {}
+    rows, cols, quantities = [], [], []
+    for user_id, product_id, quantity in purchases:
+        rows.append(user_index.setdefault(user_id, len(user_index)))
+        cols.append(product_index.setdefault(product_id, len(product_index)))
+        quantities.append(quantity)
+
+    return (
+        matrix_from_arrays(
+            np.asarray(rows, dtype=np.int32),
+            np.asarray(cols, dtype=np.int32),
+            np.asarray(quantities, dtype=np.float32),
+            shape=(len(user_index), len(product_index)),
+        ),
+        np.asarray(list(user_index), dtype=object),
+        np.asarray(list(product_index), dtype=object),
+    )
+
+
+def matrix_from_arrays(rows, cols, quantities, shape):
+    # COO -> CSR sums duplicate entries
+    matrix = sparse.coo_matrix((quantities, (rows, cols)), shape=shape, dtype=np.float32).tocsr()
+    np.log1p(matrix.data, out=matrix.data)
+    return matrix
+
+
+def load_interactions(db):
+    return build_interaction_matrix(iter_purchases(db))
@@ -0,0 +1,172 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.config import MODEL_DIR, MODEL_KEEP_VERSIONS, MODEL_RETRAIN_HOURS, NEIGHBOURS_K
+from app.services.interactions import load_interactions
+from app.services.recommender import CollaborativeFiltering
+from app.utils.db import get_db
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process training lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = "train.lock"
+
+
+# --- Versioned artifacts ---
+# MODEL_DIR/<version>/ holds one saved model and is never modified after it
+# is published; MODEL_DIR/CURRENT names the version to serve. Both the
+# version directory and CURRENT appear through a rename, so a reader never
+# sees a half-written model.
+
+def current_version(model_dir=MODEL_DIR):
+    try:
+        return (Path(model_dir) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(model, model_dir=MODEL_DIR, keep=MODEL_KEEP_VERSIONS):
+    """Saves 'model' as a new version, makes it current and prunes old ones."""
+    model_dir = Path(model_dir)
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    staging = model_dir / f".{version}.tmp"
+    model.stats = {**model.stats, "version": version}
+    model.save(staging)
+    os.replace(staging, model_dir / version)
+
+    pointer = model_dir / f".{CURRENT_FILE}.tmp"
+    pointer.write_text(version)
+    os.replace(pointer, model_dir / CURRENT_FILE)
+
+    # Workers still mapping a pruned version keep its pages until they swap
+    versions = sorted(p.name for p in model_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-keep]:
+        shutil.rmtree(model_dir / old, ignore_errors=True)
+    return version
+
+
+def train_and_publish(model_dir=MODEL_DIR, k=NEIGHBOURS_K, replacing=None, db=None):
+    """
+    Trains from the orders collection and publishes the result. Runs in its
+    own process (see ModelLoader.start_training); a file lock keeps workers
+    that ask at the same time from training twice, and 'replacing' skips the
+    run when another trainer already published a newer version.
+    """
+    logging.basicConfig(level=logging.INFO)
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(model_dir / LOCK_FILE, "w") as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info("Recommender training already running in another process")
+                return None
+        if replacing is not None and current_version(model_dir) != replacing:
+            return None
+
+        interactions, user_ids, product_ids = load_interactions(db if db is not None else get_db())
+        model = CollaborativeFiltering.fit(interactions, user_ids, product_ids, k=k)
+        version = publish(model, model_dir)
+        logger.info("Published recommender %s: %s", version, model.stats)
+        return version
+
+
+class ModelLoader:
+    """
+    Process-wide holder of the current recommender. The model is the
+    memory-mapped current version from MODEL_DIR; training happens in a
+    separate process, and refresh() swaps in a newly published version with
+    a single reference assignment, so requests never wait on a reload.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.model = None
+            cls._instance.version = None
+            cls._instance.model_dir = MODEL_DIR
+            cls._instance._process = None
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    @property
+    def training(self):
+        return self._process is not None and self._process.is_alive()
+
+    def _locked_elsewhere(self):
+        # Spawning a trainer costs a second of imports; skip it while another one runs
+        if fcntl is None or not (self.model_dir / LOCK_FILE).exists():
+            return False
+        with open(self.model_dir / LOCK_FILE) as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            return False
+
+    def refresh(self):
+        """Loads the current version if it differs from the one being served."""
+        version = current_version(self.model_dir)
+        if version is None or version == self.version:
+            return False
+
+        model = CollaborativeFiltering.load(self.model_dir / version)
+        self.model, self.version = model, version
+        logger.info("Serving recommender %s", version)
+        return True
+
+    def load_models(self):
+        if not self.refresh() and self.model is None:
+            self.start_training()
+        return self.model
+
+    def start_training(self, replacing=None):
+        """Starts a background training process; False if one is already running."""
+        with self._lock:
+            if self.training or self._locked_elsewhere():
+                return False
+            process = multiprocessing.get_context("spawn").Process(
+                target=train_and_publish, args=(self.model_dir, NEIGHBOURS_K, replacing), daemon=True,
+            )
+            process.start()
+            self._process = process
+
+        def swap_when_done():
+            process.join()
+            if process.exitcode != 0:
+                logger.error("Recommender training failed (exit code %s)", process.exitcode)
+            self.refresh()
+
+        threading.Thread(target=swap_when_done, daemon=True).start()
+        return True
+
+    def is_stale(self):
+        trained_at = self.model.stats.get("trainedAt") if self.model else None
+        return trained_at is not None and time.time() - trained_at > MODEL_RETRAIN_HOURS * 3600
+
+    def watch(self, interval, stop):
+        """Picks up versions published by other workers and retrains stale models."""
+        while not stop.wait(interval):
+            try:
+                self.refresh()
+                if self.is_stale():
+                    self.start_training(replacing=self.version)
+            except Exception as exc:  # Keep serving the current version
+                logger.error("Could not refresh the recommender: %s", exc)
+
+
+model_loader = ModelLoader()
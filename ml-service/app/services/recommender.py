@@ -0,0 +1,219 @@
+"""
+Recommendation strategies.
+
+CollaborativeFiltering is item-based: at training time every product gets
+its top-K most similar products (cosine similarity of their buyer columns),
+computed a batch of products at a time so memory stays at one dense
+batch x products block instead of a products x products (or users x users)
+matrix. A recommend call then only reads the neighbour rows of the handful of
+products the user bought, so it costs microseconds regardless of catalog
+size. Users with no purchases (or no neighbours left to recommend) get the
+most popular products.
+
+Trained models are saved as plain .npy arrays (neighbours, the CSR parts of
+the interaction matrix, and the id maps as fixed-width strings), so a
+serving process can open them with mmap_mode="r": every worker maps the same
+file pages instead of unpickling its own copy.
+"""
+import json
+import time
+
+import numpy as np
+from scipy import sparse
+
+from app.config import NEIGHBOURS_K, RECOMMEND_LIMIT
+
+# Upper bound on the dense similarity block computed per batch (float32 cells)
+BLOCK_CELLS = 16_000_000
+POPULAR_SIZE = 100
+
+
+class RecommendationStrategy:
+    name = "base"
+
+    def recommend(self, user_id, limit=RECOMMEND_LIMIT, exclude=()):
+        """Returns [(product_id, score)], best first."""
+        raise NotImplementedError
+
+
+class PopularityBased(RecommendationStrategy):
+    name = "popular"
+
+    def __init__(self, product_ids, counts):
+        self.product_ids = product_ids
+        self.counts = counts
+
+    def recommend(self, user_id=None, limit=RECOMMEND_LIMIT, exclude=()):
+        excluded = set(exclude)
+        picks = []
+        for product_id, count in zip(self.product_ids, self.counts):
+            if product_id not in excluded:
+                picks.append((product_id, float(count)))
+                if len(picks) == limit:
+                    break
+        return picks
+
+
+def top_k_neighbours(matrix, k=NEIGHBOURS_K, block_cells=BLOCK_CELLS):
+    """
+    Item-item cosine top-k for a users x products matrix.
+    Returns (indices int32, scores float32), both products x k; rows with
+    fewer than k neighbours are padded with index -1 and score 0.
+    """
+    n_products = matrix.shape[1]
+    k = min(k, max(n_products - 1, 1))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1
+    normalized = (matrix @ sparse.diags(1 / norms).astype(np.float32)).tocsc()
+    by_product = normalized.T.tocsr()
+
+    indices = np.full((n_products, k), -1, dtype=np.int32)
+    scores = np.zeros((n_products, k), dtype=np.float32)
+    batch = max(1, block_cells // max(n_products, 1))
+
+    for start in range(0, n_products, batch):
+        stop = min(start + batch, n_products)
+        block = (by_product[start:stop] @ normalized).toarray()
+        rows = np.arange(stop - start)
+        block[rows, rows + start] = 0  # a product is not its own neighbour
+
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k] if k < n_products else np.argsort(-block, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        top[top_scores <= 0] = -1
+        indices[start:stop] = top
+        scores[start:stop] = np.maximum(top_scores, 0)
+
+    return indices, scores
+
+
+class CollaborativeFiltering(RecommendationStrategy):
+    name = "collaborative"
+
+    def __init__(self, interactions, user_ids, product_ids, neighbour_indices, neighbour_scores, popular,
+                 user_lookup=None):
+        self.interactions = interactions
+        self.user_ids = np.asarray(user_ids, dtype=str)
+        self.product_ids = np.asarray(product_ids, dtype=str)
+        self.neighbour_indices = neighbour_indices
+        self.neighbour_scores = neighbour_scores
+        self.popular = popular
+        # (sorted user ids, their rows): a binary search instead of a per-process dict
+        if user_lookup is None:
+            order = np.argsort(self.user_ids, kind="stable")
+            user_lookup = (self.user_ids[order], order.astype(np.int32))
+        self.sorted_user_ids, self.user_rows = user_lookup
+        self.stats = {}
+
+    def user_row(self, user_id):
+        position = int(np.searchsorted(self.sorted_user_ids, user_id))
+        if position < len(self.sorted_user_ids) and self.sorted_user_ids[position] == user_id:
+            return int(self.user_rows[position])
+        return None
+
+    def knows(self, user_id):
+        return self.user_row(user_id) is not None
+
+    @classmethod
+    def fit(cls, interactions, user_ids, product_ids, k=NEIGHBOURS_K):
+        started = time.perf_counter()
+        indices, scores = top_k_neighbours(interactions, k)
+
+        buyers = np.asarray((interactions > 0).sum(axis=0)).ravel()
+        top = np.argsort(-buyers, kind="stable")[:POPULAR_SIZE]
+        popular = PopularityBased(product_ids[top].tolist(), buyers[top].tolist())
+
+        model = cls(interactions, user_ids, product_ids, indices, scores, popular)
+        model.stats = {
+            "users": int(interactions.shape[0]),
+            "products": int(interactions.shape[1]),
+            "interactions": int(interactions.nnz),
+            "neighbours": int(indices.shape[1]) if indices.ndim == 2 else 0,
+            "trainingSeconds": round(time.perf_counter() - started, 3),
+            "trainedAt": int(time.time()),
+        }
+        return model
+
+    def recommend(self, user_id, limit=RECOMMEND_LIMIT, exclude=()):
+        row = self.user_row(user_id)
+        if row is None:
+            return self.popular.recommend(limit=limit, exclude=exclude)
+
+        start, stop = self.interactions.indptr[row], self.interactions.indptr[row + 1]
+        bought = self.interactions.indices[start:stop]
+        weights = self.interactions.data[start:stop]
+
+        candidates = self.neighbour_indices[bought].ravel()
+        candidate_scores = (self.neighbour_scores[bought] * weights[:, None]).ravel()
+        keep = (candidates >= 0) & ~np.isin(candidates, bought)
+        candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+
+        picks = []
+        if candidates.size:
+            unique, inverse = np.unique(candidates, return_inverse=True)
+            totals = np.bincount(inverse, weights=candidate_scores)
+            best = np.argsort(-totals, kind="stable")[: limit + len(exclude)]
+            excluded = set(exclude)
+            for i in best:
+                product_id = self.product_ids[unique[i]]
+                if product_id not in excluded:
+                    picks.append((product_id, float(totals[i])))
+                    if len(picks) == limit:
+                        break
+
+        if len(picks) < limit:
+            # Not enough neighbours: top up with popular products the user hasn't bought
+            already = set(exclude) | {product_id for product_id, _ in picks} | set(self.product_ids[bought])
+            picks += [(product_id, 0.0) for product_id, _ in
+                      self.popular.recommend(limit=limit - len(picks), exclude=already)]
+        return picks
+
+    def save(self, directory):
+        """Writes the model as .npy arrays plus model.json into 'directory'."""
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "indptr": self.interactions.indptr,
+            "indices": self.interactions.indices,
+            "data": self.interactions.data,
+            "user_ids": self.user_ids,
+            "sorted_user_ids": self.sorted_user_ids,
+            "user_rows": self.user_rows,
+            "product_ids": self.product_ids,
+            "neighbour_indices": self.neighbour_indices,
+            "neighbour_scores": self.neighbour_scores,
+        }
+        for name, array in arrays.items():
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(array))
+
+        (directory / "model.json").write_text(json.dumps({
+            "shape": list(self.interactions.shape),
+            "popular": {"productIds": list(self.popular.product_ids), "counts": list(self.popular.counts)},
+            "stats": self.stats,
+        }))
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """
+        Opens a saved model. With mmap_mode="r" (the default) the arrays are
+        read-only memory maps, so pages are loaded on first use and shared
+        with every other process mapping the same files.
+        """
+        def array(name):
+            return np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+
+        meta = json.loads((directory / "model.json").read_text())
+        interactions = sparse.csr_matrix(
+            (array("data"), array("indices"), array("indptr")), shape=tuple(meta["shape"]), copy=False,
+        )
+        model = cls(
+            interactions, array("user_ids"), array("product_ids"),
+            array("neighbour_indices"), array("neighbour_scores"),
+            PopularityBased(meta["popular"]["productIds"], meta["popular"]["counts"]),
+            user_lookup=(array("sorted_user_ids"), array("user_rows")),
+        )
+        model.stats = meta["stats"]
+        return model
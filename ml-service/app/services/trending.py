@@ -0,0 +1,159 @@
+"""
+Trending products over a sliding 7-day window.
+
+The backend keeps hourly (product, hour) -> views/purchases counters in the
+product_activity collection. The scorer mirrors the buckets inside the
+window and keeps a running score per product,
+
+    score = views * 0.3 + purchases * 0.7   (PRD 8.3)
+
+so every changed bucket costs O(log n) to apply, and an hour leaving the
+window only touches the products active in that hour. The top products come
+from a lazy max-heap: every score change pushes a fresh entry and outdated
+entries are dropped when they surface, so reading the top 20 never rescans
+the catalog.
+"""
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from app.config import TRENDING_WINDOW_HOURS, TRENDING_LIMIT, TRENDING_POLL_SLACK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+VIEW_WEIGHT = 0.3
+PURCHASE_WEIGHT = 0.7
+HOUR = timedelta(hours=1)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def hour_number(moment):
+    """Hours since the epoch, for a datetime (naive values are UTC, as PyMongo returns them)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int((moment - EPOCH) // HOUR)
+
+
+class TrendingScorer:
+    def __init__(self, window_hours=TRENDING_WINDOW_HOURS):
+        self.window_hours = window_hours
+        self.current_hour = None
+        self.buckets = defaultdict(dict)  # hour -> {product_id: (views, purchases)}
+        self.views = defaultdict(int)
+        self.purchases = defaultdict(int)
+        self.scores = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def _set_score(self, product_id):
+        score = self.views[product_id] * VIEW_WEIGHT + self.purchases[product_id] * PURCHASE_WEIGHT
+        if score > 0:
+            self.scores[product_id] = score
+            heapq.heappush(self._heap, (-score, product_id))
+        else:
+            self.scores.pop(product_id, None)
+            self.views.pop(product_id, None)
+            self.purchases.pop(product_id, None)
+
+        # Outdated entries pile up under heavy churn; rebuild from the live scores
+        if len(self._heap) > 4 * len(self.scores) + 1024:
+            self._heap = [(-value, product) for product, value in self.scores.items()]
+            heapq.heapify(self._heap)
+
+    def _apply(self, product_id, hour, views, purchases):
+        """Sets a bucket's absolute counts, applying only the difference."""
+        old_views, old_purchases = self.buckets[hour].get(product_id, (0, 0))
+        if (views, purchases) == (old_views, old_purchases):
+            return
+        self.buckets[hour][product_id] = (views, purchases)
+        self.views[product_id] += views - old_views
+        self.purchases[product_id] += purchases - old_purchases
+        self._set_score(product_id)
+
+    def _expire(self, now_hour):
+        oldest = now_hour - self.window_hours + 1
+        for hour in [hour for hour in self.buckets if hour < oldest]:
+            for product_id, (views, purchases) in self.buckets.pop(hour).items():
+                self.views[product_id] -= views
+                self.purchases[product_id] -= purchases
+                self._set_score(product_id)
+
+    def update(self, activity, now=None):
+        """
+        Applies bucket documents ({productId, hour, views, purchases}) and
+        rolls the window forward. Re-applying an unchanged bucket is a no-op,
+        so overlapping polls are safe.
+        """
+        now_hour = hour_number(now or datetime.now(timezone.utc))
+        oldest = now_hour - self.window_hours + 1
+        with self._lock:
+            self._expire(now_hour)
+            self.current_hour = now_hour
+            for doc in activity:
+                hour = hour_number(doc["hour"])
+                if oldest <= hour <= now_hour:
+                    self._apply(str(doc["productId"]), hour, doc.get("views", 0), doc.get("purchases", 0))
+
+    def top(self, limit=TRENDING_LIMIT):
+        with self._lock:
+            picks, seen = [], set()
+            while self._heap and len(picks) < limit:
+                neg_score, product_id = heapq.heappop(self._heap)
+                if product_id in seen or self.scores.get(product_id) != -neg_score:
+                    continue  # outdated entry
+                seen.add(product_id)
+                picks.append((neg_score, product_id))
+            for entry in picks:
+                heapq.heappush(self._heap, entry)
+
+            return [{
+                "productId": product_id,
+                "score": round(-neg_score, 4),
+                "views": self.views[product_id],
+                "purchases": self.purchases[product_id],
+            } for neg_score, product_id in picks]
+
+
+class ActivityFeed:
+    """
+    Keeps a TrendingScorer in sync with product_activity by polling for
+    buckets whose updatedAt moved since the last poll, minus 'slack'.
+
+    updatedAt is stamped by the backend before the write commits, so a
+    bucket can land with an updatedAt older than one this feed already
+    read. The lookback re-reads such late writes; buckets hold absolute
+    counts, so reading one again is a no-op for the scorer.
+    """
+    PROJECTION = {"_id": 0, "productId": 1, "hour": 1, "views": 1, "purchases": 1, "updatedAt": 1}
+
+    def __init__(self, db, scorer, slack=timedelta(seconds=TRENDING_POLL_SLACK_SECONDS)):
+        self.db = db
+        self.scorer = scorer
+        self.slack = slack
+        self.last_seen = None
+
+    def poll(self):
+        now = datetime.now(timezone.utc)
+        query = {"hour": {"$gte": now - timedelta(hours=self.scorer.window_hours)}}
+        if self.last_seen is not None:
+            query["updatedAt"] = {"$gte": self.last_seen - self.slack}
+
+        changed = list(self.db.product_activity.find(query, self.PROJECTION).sort("updatedAt", 1))
+        if changed:
+            # max(): the lookback can return nothing newer than last_seen
+            self.last_seen = max(changed[-1]["updatedAt"], self.last_seen or changed[-1]["updatedAt"])
+        self.scorer.update(changed, now=now)
+        return len(changed)
+
+    def run(self, interval, stop_event):
+        while not stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as exc:  # keep serving the last known ranking
+                logger.error("Trending poll failed: %s", exc)
+            stop_event.wait(interval)
+
+
+trending_scorer = TrendingScorer()
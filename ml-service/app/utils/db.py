@@ -0,0 +1,19 @@
+from functools import lru_cache
+
+from pymongo import MongoClient
+from pymongo.errors import ConfigurationError
+
+from app.config import MONGODB_URI, MONGODB_DB
+
+
+@lru_cache(maxsize=1)
+def get_client():
+    return MongoClient(MONGODB_URI)
+
+
+def get_db():
+    client = get_client()
+    try:
+        return client.get_default_database()
+    except ConfigurationError:  # The URI does not name a database
+        return client[MONGODB_DB]
@@ -0,0 +1,88 @@
+"""
+Recommender benchmark on synthetic purchase data.
+
+Generates BENCH_USERS x BENCH_PRODUCTS purchases (100k x 50k by default)
+with Zipf-like product popularity, then times matrix build, neighbour
+training, persistence (.npy save, memory-mapped load) and recommend calls, and reports the peak size of the
+similarity block against what a dense users x users matrix would need.
+
+Run from ml-service/:
+    python benchmarks/bench_recommender.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.interactions import matrix_from_arrays  # noqa: E402
+from app.services.recommender import BLOCK_CELLS, CollaborativeFiltering  # noqa: E402
+
+USERS = int(os.environ.get("BENCH_USERS", 100_000))
+PRODUCTS = int(os.environ.get("BENCH_PRODUCTS", 50_000))
+PURCHASES_PER_USER = float(os.environ.get("BENCH_PURCHASES_PER_USER", 8))
+NEIGHBOURS = int(os.environ.get("BENCH_NEIGHBOURS", 50))
+CALLS = int(os.environ.get("BENCH_CALLS", 10_000))
+SEED = int(os.environ.get("BENCH_SEED", 7))
+
+
+def synthetic_purchases(rng):
+    counts = rng.poisson(PURCHASES_PER_USER, USERS) + 1
+    rows = np.repeat(np.arange(USERS, dtype=np.int32), counts)
+    # Popularity ~ 1 / rank, so a few products are in many baskets
+    weights = 1 / np.arange(1, PRODUCTS + 1)
+    cols = rng.choice(PRODUCTS, size=rows.size, p=weights / weights.sum()).astype(np.int32)
+    quantities = rng.integers(1, 4, size=rows.size).astype(np.float32)
+    return rows, cols, quantities
+
+
+def timed(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {time.perf_counter() - started:8.2f}s")
+    return result
+
+
+def main():
+    rng = np.random.default_rng(SEED)
+    print(f"{USERS} users x {PRODUCTS} products, ~{PURCHASES_PER_USER:g} purchases per user, k={NEIGHBOURS}\n")
+
+    rows, cols, quantities = timed("generate purchases", lambda: synthetic_purchases(rng))
+    matrix = timed("build sparse matrix", lambda: matrix_from_arrays(rows, cols, quantities, (USERS, PRODUCTS)))
+    user_ids = np.asarray([f"u{i}" for i in range(USERS)], dtype=object)
+    product_ids = np.asarray([f"p{i}" for i in range(PRODUCTS)], dtype=object)
+
+    model = timed("train top-k neighbours", lambda: CollaborativeFiltering.fit(matrix, user_ids, product_ids, k=NEIGHBOURS))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "version"
+        timed("save (.npy)", lambda: model.save(path))
+        timed("load (in memory)", lambda: CollaborativeFiltering.load(path, mmap_mode=None))
+        served = timed("load (mmap)", lambda: CollaborativeFiltering.load(path))
+        artifact_mb = sum(f.stat().st_size for f in path.iterdir()) / 1e6
+
+        # Served from the memory-mapped arrays, as the API workers do
+        latencies = []
+        for user in rng.integers(0, USERS, CALLS):
+            started = time.perf_counter()
+            served.recommend(f"u{user}")
+            latencies.append((time.perf_counter() - started) * 1000)
+        del served
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    block_mb = min(BLOCK_CELLS, PRODUCTS * max(1, BLOCK_CELLS // PRODUCTS)) * 4 / 1e6
+    print(f"\nrecommend x{CALLS}: p50={pct(0.50):.3f}ms  p95={pct(0.95):.3f}ms  p99={pct(0.99):.3f}ms  max={latencies[-1]:.3f}ms")
+    print(f"interactions: {matrix.nnz:,}  ({matrix.data.nbytes / 1e6:.1f} MB of values)")
+    print(f"artifact: {artifact_mb:.1f} MB  neighbours: {model.neighbour_indices.nbytes * 2 / 1e6:.1f} MB")
+    print(f"peak similarity block: {block_mb:.0f} MB  (dense users x users would be {USERS * USERS * 4 / 1e9:.0f} GB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.config import MODEL_RELOAD_SECONDS, TRENDING_REFRESH_SECONDS
+from app.routes import recommendations, trends
+from app.services.model_loader import model_loader
+from app.services.trending import ActivityFeed, trending_scorer
+from app.utils.db import get_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    try:
+        model_loader.load_models()
+    except Exception as exc:  # Serve (503s) rather than crash-loop on a broken artifact
+        logger.error("Could not load the recommender: %s", exc)
+
+    stop = threading.Event()
+    threading.Thread(target=model_loader.watch, args=(MODEL_RELOAD_SECONDS, stop), daemon=True).start()
+    feed = ActivityFeed(get_db(), trending_scorer)
+    threading.Thread(target=feed.run, args=(TRENDING_REFRESH_SECONDS, stop), daemon=True).start()
+    yield
+    stop.set()
+
+
+app = FastAPI(title="SmartCart ML API", lifespan=lifespan)
+
+app.include_router(recommendations.router)
+app.include_router(trends.router)
+
+
+@app.get("/")
+def health_check():
+    model = model_loader.model
+    return {
+        "status": "healthy",
+        "recommender": model.stats if model else None,
+        "training": model_loader.training,
+    }
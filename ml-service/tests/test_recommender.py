@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.interactions import build_interaction_matrix
+from app.services.model_loader import ModelLoader, current_version, model_loader, publish
+from app.services.recommender import CollaborativeFiltering, top_k_neighbours
+
+# Laptop buyers also buy mice and bags; phone buyers buy cases
+PURCHASES = [
+    ("alice", "laptop", 1), ("alice", "mouse", 1), ("alice", "bag", 1),
+    ("bob", "laptop", 1), ("bob", "mouse", 2),
+    ("carol", "laptop", 1), ("carol", "bag", 1),
+    ("dave", "phone", 1), ("dave", "case", 1),
+    ("erin", "phone", 1), ("erin", "case", 3), ("erin", "phone", 1),
+    ("frank", "laptop", 1),
+]
+
+
+@pytest.fixture(scope="module")
+def model():
+    return CollaborativeFiltering.fit(*build_interaction_matrix(PURCHASES), k=3)
+
+
+def test_interaction_matrix_sums_repeat_purchases():
+    matrix, user_ids, product_ids = build_interaction_matrix(PURCHASES)
+    assert matrix.shape == (6, 5)
+    erin, phone = list(user_ids).index("erin"), list(product_ids).index("phone")
+    assert matrix[erin, phone] == pytest.approx(np.log1p(2))
+
+
+def test_neighbours_match_dense_cosine(model):
+    matrix = model.interactions.toarray()
+    unit = matrix / np.linalg.norm(matrix, axis=0)
+    dense = unit.T @ unit
+    np.fill_diagonal(dense, 0)
+
+    indices, scores = top_k_neighbours(model.interactions, k=3, block_cells=7)  # several batches
+    for product in range(matrix.shape[1]):
+        expected = np.sort(dense[product])[::-1][:3]
+        np.testing.assert_allclose(scores[product], np.maximum(expected, 0), rtol=1e-5)
+        assert product not in indices[product]
+
+
+def test_recommend_uses_neighbours_and_skips_bought(model):
+    picks = [product_id for product_id, _ in model.recommend("frank", limit=2)]
+    assert picks == ["mouse", "bag"] or picks == ["bag", "mouse"]
+
+    picks = [product_id for product_id, _ in model.recommend("dave", limit=5)]
+    assert "phone" not in picks and "case" not in picks
+
+
+def test_recommend_unknown_user_gets_popular(model):
+    picks = model.recommend("newcomer", limit=2)
+    assert picks[0][0] == "laptop"
+    assert len(picks) == 2
+
+
+def test_save_and_load_round_trip(model, tmp_path):
+    model.save(tmp_path / "v1")
+    loaded = CollaborativeFiltering.load(tmp_path / "v1")
+    assert isinstance(loaded.neighbour_indices, np.memmap)
+    assert not loaded.interactions.data.flags.writeable  # a view of the read-only map
+    assert loaded.recommend("carol") == model.recommend("carol")
+    assert loaded.recommend("newcomer") == model.recommend("newcomer")
+    assert loaded.stats == model.stats
+
+
+def test_publish_swaps_versions(model, tmp_path, monkeypatch):
+    loader = ModelLoader()
+    monkeypatch.setattr(loader, "model_dir", tmp_path)
+    monkeypatch.setattr(loader, "model", None)
+    monkeypatch.setattr(loader, "version", None)
+    assert not loader.refresh()
+
+    first = publish(model, tmp_path, keep=2)
+    assert current_version(tmp_path) == first
+    assert loader.refresh() and loader.version == first
+    serving = loader.model
+    assert not loader.refresh()  # unchanged version: nothing reloaded
+
+    versions = [publish(model, tmp_path, keep=2) for _ in range(2)]
+    assert loader.refresh() and loader.version == versions[-1]
+    assert loader.model.stats["version"] == versions[-1]
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == versions
+    # A model swapped out (and pruned) mid-request keeps answering from its maps
+    assert serving.recommend("frank") == loader.model.recommend("frank")
+
+
+def test_recommend_endpoint(model, monkeypatch):
+    monkeypatch.setattr(model_loader, "model", model)
+    from main import app
+
+    client = TestClient(app)
+    res = client.get("/ml/recommend/frank", params={"limit": 2})
+    assert res.status_code == 200
+    assert res.json()["source"] == "collaborative"
+    assert len(res.json()["data"]) == 2
+
+    res_new = client.get("/ml/recommend/newcomer")
+    assert res_new.json()["source"] == "popular"
+
+
+def test_batch_endpoint(model, monkeypatch):
+    monkeypatch.setattr(model_loader, "model", model)
+    from main import app
+
+    client = TestClient(app)
+    res = client.post("/ml/recommend/batch", json={"userIds": ["frank", "newcomer", "frank"], "limit": 2})
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert [entry["userId"] for entry in data] == ["frank", "newcomer"]
+    assert data[0]["data"] == client.get("/ml/recommend/frank", params={"limit": 2}).json()["data"]
+    assert data[0]["source"] == "collaborative" and data[1]["source"] == "popular"
+
+    assert client.post("/ml/recommend/batch", json={"userIds": []}).status_code == 422
+
+
+def test_train_endpoint_starts_background_training(monkeypatch):
+    monkeypatch.setattr(model_loader, "start_training", lambda: True)
+    from main import app
+
+    res = TestClient(app).post("/ml/train")
+    assert res.status_code == 202
+    assert res.json()["message"] == "Training started"
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.trending import ActivityFeed, TrendingScorer
+
+NOW = datetime(2026, 3, 10, 12, 30, tzinfo=timezone.utc)
+
+
+def bucket(product_id, hours_ago, views=0, purchases=0):
+    hour = NOW.replace(minute=0) - timedelta(hours=hours_ago)
+    return {"productId": product_id, "hour": hour, "views": views, "purchases": purchases}
+
+
+def test_scores_use_prd_weights():
+    scorer = TrendingScorer()
+    scorer.update([bucket("a", 0, views=10), bucket("b", 1, purchases=5), bucket("a", 2, purchases=1)], now=NOW)
+    top = scorer.top()
+    assert [p["productId"] for p in top] == ["a", "b"]
+    assert top[0] == {"productId": "a", "score": pytest.approx(10 * 0.3 + 1 * 0.7), "views": 10, "purchases": 1}
+    assert top[1]["score"] == pytest.approx(5 * 0.7)
+
+
+def test_reapplying_a_bucket_applies_only_the_difference():
+    scorer = TrendingScorer()
+    scorer.update([bucket("a", 0, views=4)], now=NOW)
+    scorer.update([bucket("a", 0, views=4)], now=NOW)  # overlapping poll
+    scorer.update([bucket("a", 0, views=6)], now=NOW)  # counter moved on
+    assert scorer.top()[0]["views"] == 6
+
+
+def test_expired_hours_roll_off():
+    scorer = TrendingScorer(window_hours=24)
+    scorer.update([bucket("old", 23, purchases=10), bucket("new", 0, purchases=1)], now=NOW)
+    assert scorer.top()[0]["productId"] == "old"
+
+    scorer.update([], now=NOW + timedelta(hours=1))
+    assert [p["productId"] for p in scorer.top()] == ["new"]
+    assert "old" not in scorer.scores
+
+    # Buckets already outside the window are ignored
+    scorer.update([bucket("ancient", 48, purchases=100)], now=NOW)
+    assert "ancient" not in scorer.scores
+
+
+def test_top_stays_correct_under_churn():
+    scorer = TrendingScorer()
+    for round_number in range(50):
+        scorer.update([bucket(f"p{i}", 0, views=(i * 7 + round_number) % 50) for i in range(30)], now=NOW)
+
+    expected = sorted(scorer.scores.items(), key=lambda item: -item[1])[:20]
+    assert [(p["productId"], p["score"]) for p in scorer.top()] == \
+        [(product, round(score, 4)) for product, score in expected]
+    assert len(scorer._heap) <= 4 * len(scorer.scores) + 1024
+
+
+
+def test_feed_rereads_buckets_that_commit_late():
+    class Activity:
+        def __init__(self):
+            self.buckets, self.queries = [], []
+
+        def find(self, query, projection):
+            self.queries.append(query)
+            since = query.get("updatedAt", {}).get("$gte")
+            return Cursor([b for b in self.buckets if since is None or b["updatedAt"] >= since])
+
+    class Cursor(list):
+        def sort(self, key, direction):
+            return sorted(self, key=lambda b: b[key])
+
+    activity = Activity()
+    feed = ActivityFeed(type("Db", (), {"product_activity": activity})(), TrendingScorer(), slack=timedelta(seconds=30))
+    stamped = datetime.now(timezone.utc).replace(minute=0, second=5, microsecond=0)
+    activity.buckets.append({**bucket("a", 0, views=1), "hour": stamped.replace(second=0), "updatedAt": stamped})
+    assert feed.poll() == 1
+
+    # Stamped before the bucket already read, committed after the poll
+    late = {**bucket("b", 0, purchases=1), "hour": stamped.replace(second=0), "updatedAt": stamped - timedelta(seconds=2)}
+    activity.buckets.append(late)
+    feed.poll()
+    assert activity.queries[-1]["updatedAt"] == {"$gte": stamped - timedelta(seconds=30)}
+    assert feed.last_seen == stamped
+    assert [p["productId"] for p in feed.scorer.top()] == ["b", "a"]
+
+
+def test_trending_endpoint(monkeypatch):
+    scorer = TrendingScorer()
+    scorer.update([bucket("a", 0, purchases=2), bucket("b", 0, views=1)], now=NOW)
+    monkeypatch.setattr("app.routes.trends.trending_scorer", scorer)
+    from main import app
+
+    res = TestClient(app).get("/ml/trending", params={"limit": 1})
+    assert res.status_code == 200
+    assert res.json()["count"] == 1
+    assert res.json()["data"][0]["productId"] == "a"
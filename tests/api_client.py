@@ -0,0 +1,123 @@
+"""
+Pooled HTTP client for the API suite.
+
+All clients share one keep-alive `requests.Session`, so the suite reuses a
+small set of TCP connections instead of opening one per call. Role clients
+(owner, customers) only differ in the Authorization header they send.
+Every request is timed; tests/conftest.py prints the slowest endpoints at
+the end of the run.
+
+    api = ApiClient()                           # anonymous
+    owner = ApiClient.login(OWNER_LOGIN)        # authenticated
+    owner.post("/categories", json={"name": "Books"})
+"""
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from test_config import BASE_URL
+
+POOL_SIZE = int(os.environ.get("API_POOL_SIZE", 32))
+TIMEOUT_SECONDS = float(os.environ.get("API_TIMEOUT", 30))
+
+# Connection errors (refused/reset before the request was sent) are safe to
+# retry for any method; read errors only for idempotent ones
+RETRY = Retry(
+    total=3,
+    connect=3,
+    read=2,
+    status=0,
+    backoff_factor=0.1,
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+    raise_on_status=False,
+)
+
+OBJECT_ID = re.compile(r"/[0-9a-f]{24}(?=/|$)")
+SLUG_ROUTE = re.compile(r"^(/(?:products|categories))/(?!search(?:/|$))[^/]+$")
+
+
+def endpoint_name(method, path):
+    """'GET /products/my-slug' -> 'GET /products/:slug', ids -> ':id'."""
+    path = OBJECT_ID.sub("/:id", path.split("?")[0])
+    path = SLUG_ROUTE.sub(r"\1/:slug", path) if ":id" not in path else path
+    return f"{method} {path}"
+
+
+class TimingRecorder:
+    """Thread-safe per-endpoint latency samples (milliseconds)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)
+
+    def record(self, endpoint, elapsed_ms):
+        with self._lock:
+            self._samples[endpoint].append(elapsed_ms)
+
+    def export(self):
+        with self._lock:
+            return {endpoint: list(samples) for endpoint, samples in self._samples.items()}
+
+    def merge(self, exported):
+        with self._lock:
+            for endpoint, samples in exported.items():
+                self._samples[endpoint].extend(samples)
+
+    def summary(self):
+        """Rows of (endpoint, calls, p50, p95, max), slowest p95 first."""
+        rows = []
+        for endpoint, samples in self.export().items():
+            ordered = sorted(samples)
+            p50 = ordered[len(ordered) // 2]
+            p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+            rows.append((endpoint, len(ordered), p50, p95, ordered[-1]))
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+timings = TimingRecorder()
+
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=RETRY)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+
+class ApiClient:
+    def __init__(self, token=None):
+        self.token = token
+
+    @classmethod
+    def login(cls, credentials):
+        res = ApiClient().post("/auth/login", json=credentials)
+        assert res.status_code == 200, f"Login failed for {credentials['email']}. Server said: {res.text}"
+        return cls(res.json()['data']['token'])
+
+    def request(self, method, path, headers=None, **kwargs):
+        request_headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        request_headers.update(headers or {})
+        kwargs.setdefault("timeout", TIMEOUT_SECONDS)
+
+        started = time.perf_counter()
+        res = _session.request(method, f"{BASE_URL}{path}", headers=request_headers, **kwargs)
+        timings.record(endpoint_name(method, path), (time.perf_counter() - started) * 1000)
+        return res
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
@@ -0,0 +1,348 @@
+"""
+Load generator and latency benchmark for the whole API.
+
+Seeds a small catalog (categories, products with deep stock) and a pool of
+customers, then drives a weighted mix of shopper and admin traffic at a
+fixed request rate from several worker processes:
+
+    browse     GET /products (random category/page), GET /products/:slug
+    cart       POST /cart/items
+    checkout   POST /cart/items, then POST /orders
+    admin      GET /orders as the owner
+
+Arrivals are open-loop: each worker fires on schedule whether or not earlier
+requests have returned, so a slow server shows up as latency and errors
+instead of quietly lowering the offered load. Latency of a scenario's first
+request is measured from when the arrival was due, not from when a thread
+picked it up, so time queued behind BENCH_CONCURRENCY busy threads counts
+(no coordinated omission); arrivals that started more than BENCH_LATE_MS
+behind schedule are reported. The report has p50/p95/p99,
+throughput and error codes per endpoint and is written as stable, sorted
+JSON so two runs can be diffed. With BENCH_BASELINE pointing at an earlier
+report, the run fails when any endpoint's p95 regressed by more than
+BENCH_TOLERANCE.
+
+Run from the project root while the backend is running:
+    BENCH_OUTPUT=before.json python tests/bench_load.py
+    BENCH_OUTPUT=after.json BENCH_BASELINE=before.json python tests/bench_load.py
+"""
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import ApiClient, endpoint_name
+from test_config import OWNER_LOGIN, DEFAULT_PASSWORD
+
+CATEGORY_COUNT = int(os.environ.get("BENCH_CATEGORIES", 5))
+PRODUCT_COUNT = int(os.environ.get("BENCH_LOAD_PRODUCTS", 500))
+USER_COUNT = int(os.environ.get("BENCH_USERS", 100))
+RATE = float(os.environ.get("BENCH_RATE", 50))  # requests started per second, all workers
+DURATION = float(os.environ.get("BENCH_DURATION", 30))  # seconds
+PROCESSES = int(os.environ.get("BENCH_PROCESSES", 4))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", 32))  # in-flight requests per worker
+SEED = int(os.environ.get("BENCH_SEED", 1))
+OUTPUT = os.environ.get("BENCH_OUTPUT", "bench_load.json")
+BASELINE = os.environ.get("BENCH_BASELINE")
+TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", 0.20))
+LATE_MS = float(os.environ.get("BENCH_LATE_MS", 10))  # start lag that counts as behind schedule
+
+# Scenario weights; override with e.g. BENCH_MIX="browse=50,cart=30,checkout=10,admin=10"
+DEFAULT_MIX = {"browse": 70, "cart": 20, "checkout": 5, "admin": 5}
+PRODUCT_STOCK = 1_000_000
+PAGE_SIZE = 20
+ADDRESS = {"street": "1 Bench St", "city": "Cairo", "country": "Egypt"}
+
+
+def parse_mix(spec):
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        name, weight = part.split("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown scenario '{name}' in BENCH_MIX")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, min(len(ordered) - 1, int(len(ordered) * fraction + 0.5) - 1))]
+
+
+# --- Seeding ---
+
+def seed_catalog(owner):
+    categories = []
+    for i in range(CATEGORY_COUNT):
+        res = owner.get(f"/categories/load-bench-{i}")
+        if res.status_code != 200:
+            res = owner.post("/categories", json={"name": f"Load Bench {i}"})
+            assert res.status_code == 201, f"Could not create benchmark category: {res.text}"
+        categories.append(res.json()['data'])
+
+    existing = {}
+    for category in categories:
+        res = owner.get("/products", params={"category": category['_id'], "limit": 100})
+        page = res.json()
+        while True:
+            existing.update({product['sku']: product for product in page['data']})
+            cursor = page['pagination'].get('nextCursor')
+            if not cursor:
+                break
+            page = owner.get("/products", params={"category": category['_id'], "limit": 100, "cursor": cursor}).json()
+
+    def create(i):
+        sku = f"LOAD-BENCH-{i}"
+        if sku in existing:
+            return existing[sku]
+        rng = random.Random(i)
+        res = owner.post("/products", json={
+            "name": f"Load Bench Product {i}",
+            "description": f"Product {i} of the load benchmark catalog.",
+            "price": round(rng.uniform(5, 200), 2),
+            "sku": sku,
+            "stock": PRODUCT_STOCK,
+            "categoryId": categories[i % CATEGORY_COUNT]['_id'],
+        })
+        assert res.status_code == 201, f"Could not create benchmark product: {res.text}"
+        return res.json()['data']
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        products = list(pool.map(create, range(PRODUCT_COUNT)))
+    return categories, products
+
+
+def seed_users():
+    anonymous = ApiClient()
+
+    def token_for(i):
+        credentials = {"email": f"load_bench_{i}@example.com", "password": DEFAULT_PASSWORD}
+        res = anonymous.post("/auth/login", json=credentials)
+        if res.status_code != 200:
+            res = anonymous.post("/auth/register", json={**credentials, "firstName": "Load", "lastName": f"Bench {i}"})
+            assert res.status_code == 201, f"Could not register benchmark user: {res.text}"
+        return res.json()['data']['token']
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        return list(pool.map(token_for, range(USER_COUNT)))
+
+
+# --- Load generation (runs in each worker process) ---
+
+class Worker:
+    def __init__(self, index, plan):
+        self.rng = random.Random(SEED * 1000 + index)
+        self.plan = plan
+        self.anonymous = ApiClient()
+        self.owner = ApiClient(plan['owner_token'])
+        # Each worker drives its own slice of customers so carts are not shared across processes
+        tokens = plan['user_tokens'][index::PROCESSES] or plan['user_tokens']
+        self.customers = [ApiClient(token) for token in tokens]
+        self.scenarios, self.weights = zip(*plan['mix'].items())
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.start_lags = []  # ms between when each arrival was due and when it started
+
+    def call(self, client, method, path, scheduled=None, **kwargs):
+        """Times one request from 'scheduled' (perf_counter clock) when given, else from now."""
+        started = time.perf_counter() if scheduled is None else scheduled
+        try:
+            res = client.request(method, path, **kwargs)
+        except Exception as exc:  # timeouts, resets: count them, keep the load going
+            self.errors[endpoint_name(method, path)][type(exc).__name__] += 1
+            return None
+        endpoint = endpoint_name(method, path)
+        self.samples[endpoint].append((time.perf_counter() - started) * 1000)
+        if res.status_code >= 400:
+            try:
+                code = res.json()['error']['code']
+            except (ValueError, KeyError, TypeError):
+                code = "UNKNOWN"
+            self.errors[endpoint][f"{res.status_code} {code}"] += 1
+        return res
+
+    def browse(self, scheduled):
+        if self.rng.random() < 0.5:
+            category = self.rng.choice(self.plan['categories'])
+            params = {"category": category['_id'], "limit": PAGE_SIZE, "page": self.rng.randint(1, 5)}
+            params["sort"] = self.rng.choice(["newest", "price_asc", "price_desc"])
+            self.call(self.anonymous, "GET", "/products", scheduled, params=params)
+        else:
+            product = self.rng.choice(self.plan['products'])
+            self.call(self.anonymous, "GET", f"/products/{product['slug']}", scheduled)
+
+    def add_to_cart(self, customer, scheduled):
+        product = self.rng.choice(self.plan['products'])
+        return self.call(customer, "POST", "/cart/items", scheduled, json={"productId": product['_id'], "quantity": 1})
+
+    def cart(self, scheduled):
+        self.add_to_cart(self.rng.choice(self.customers), scheduled)
+
+    def checkout(self, scheduled):
+        customer = self.rng.choice(self.customers)
+        res = self.add_to_cart(customer, scheduled)
+        if res is not None and res.status_code == 200:
+            # Follows the first request, so it is timed from its own start
+            self.call(customer, "POST", "/orders", json={"shippingAddress": ADDRESS})
+
+    def admin(self, scheduled):
+        self.call(self.owner, "GET", "/orders", scheduled)
+
+    def dispatch(self, scenario, scheduled):
+        self.start_lags.append((time.perf_counter() - scheduled) * 1000)
+        getattr(self, scenario)(scheduled)
+
+    def run(self, start_at):
+        interval = PROCESSES / RATE
+        total = int(DURATION * RATE / PROCESSES)
+        # Stagger workers so their arrivals interleave instead of bunching up
+        next_at = start_at + interval * self.rng.random()
+
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+            for _ in range(total):
+                delay = next_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                scenario = self.rng.choices(self.scenarios, weights=self.weights)[0]
+                # next_at is wall-clock (shared by the processes); timings use perf_counter
+                scheduled = time.perf_counter() + (next_at - time.time())
+                pool.submit(self.dispatch, scenario, scheduled)
+                next_at += interval
+        return {
+            "samples": dict(self.samples),
+            "errors": {k: dict(v) for k, v in self.errors.items()},
+            "start_lags": self.start_lags,
+        }
+
+
+def run_worker(args):
+    index, plan, start_at = args
+    return Worker(index, plan).run(start_at)
+
+
+# --- Reporting ---
+
+def build_report(results, elapsed, mix):
+    samples, errors = defaultdict(list), defaultdict(Counter)
+    lags = sorted(lag for result in results for lag in result['start_lags'])
+    for result in results:
+        for endpoint, values in result['samples'].items():
+            samples[endpoint].extend(values)
+        for endpoint, counts in result['errors'].items():
+            errors[endpoint].update(counts)
+
+    endpoints = {}
+    for endpoint in sorted(set(samples) | set(errors)):
+        ordered = sorted(samples[endpoint])
+        calls = len(ordered) + sum(count for key, count in errors[endpoint].items() if not key[0].isdigit())
+        stats = {
+            "requests": calls,
+            "throughput_rps": round(calls / elapsed, 2),
+            "errors": dict(sorted(errors[endpoint].items())),
+            "error_rate": round(sum(errors[endpoint].values()) / calls, 4) if calls else 0,
+        }
+        if ordered:
+            stats.update({
+                "p50_ms": round(percentile(ordered, 0.50), 2),
+                "p95_ms": round(percentile(ordered, 0.95), 2),
+                "p99_ms": round(percentile(ordered, 0.99), 2),
+                "max_ms": round(ordered[-1], 2),
+            })
+        endpoints[endpoint] = stats
+
+    total = sum(stats['requests'] for stats in endpoints.values())
+    return {
+        "config": {
+            "rate": RATE, "duration_s": DURATION, "processes": PROCESSES, "concurrency": CONCURRENCY,
+            "categories": CATEGORY_COUNT, "products": PRODUCT_COUNT, "users": USER_COUNT,
+            "mix": mix, "seed": SEED,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "schedule": {
+            "arrivals": len(lags),
+            "late": sum(1 for lag in lags if lag > LATE_MS),
+            "late_threshold_ms": LATE_MS,
+            "p99_lag_ms": round(percentile(lags, 0.99), 2) if lags else 0,
+            "max_lag_ms": round(lags[-1], 2) if lags else 0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report):
+    print(f"\n{report['requests']} requests in {report['elapsed_s']}s ({report['throughput_rps']} req/s)")
+    schedule = report['schedule']
+    print(f"{schedule['late']} of {schedule['arrivals']} arrivals started over {schedule['late_threshold_ms']:g}ms "
+          f"behind schedule (p99 lag {schedule['p99_lag_ms']}ms, max {schedule['max_lag_ms']}ms)")
+    print(f"{'endpoint':<30} {'reqs':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  errors")
+    for endpoint, stats in report['endpoints'].items():
+        errors = ", ".join(f"{code} x{count}" for code, count in stats['errors'].items()) or "-"
+        print(f"{endpoint:<30} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} "
+              f"{stats.get('p50_ms', 0):>8.1f} {stats.get('p95_ms', 0):>8.1f} {stats.get('p99_ms', 0):>8.1f}  {errors}")
+
+
+def compare(report, baseline):
+    """Prints p95 deltas against an earlier report; returns the endpoints that regressed."""
+    regressions = []
+    print(f"\np95 against baseline (tolerance {TOLERANCE:.0%}):")
+    for endpoint, stats in report['endpoints'].items():
+        before = baseline['endpoints'].get(endpoint, {}).get('p95_ms')
+        after = stats.get('p95_ms')
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else 0
+        flag = "REGRESSION" if change > TOLERANCE else ""
+        if flag:
+            regressions.append(endpoint)
+        print(f"{endpoint:<30} {before:>8.1f} -> {after:>8.1f}  {change:+7.1%}  {flag}")
+    return regressions
+
+
+def main():
+    mix = parse_mix(os.environ.get("BENCH_MIX"))
+    owner = ApiClient.login(OWNER_LOGIN)
+
+    print(f"Seeding {CATEGORY_COUNT} categories, {PRODUCT_COUNT} products and {USER_COUNT} users...")
+    categories, products = seed_catalog(owner)
+    user_tokens = seed_users()
+
+    plan = {
+        "owner_token": owner.token,
+        "user_tokens": user_tokens,
+        "categories": [{"_id": c['_id']} for c in categories],
+        "products": [{"_id": p['_id'], "slug": p['slug']} for p in products],
+        "mix": mix,
+    }
+
+    print(f"Driving {RATE:g} req/s for {DURATION:g}s from {PROCESSES} processes...")
+    # spawn: workers must not inherit the parent's open keep-alive sockets
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + 2  # time for the workers to start up
+    with context.Pool(PROCESSES) as pool:
+        results = pool.map(run_worker, [(i, plan, start_at) for i in range(PROCESSES)])
+    elapsed = time.time() - start_at
+
+    report = build_report(results, elapsed, mix)
+    print_report(report)
+    with open(OUTPUT, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\nReport written to {OUTPUT}")
+
+    if BASELINE:
+        with open(BASELINE) as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            sys.exit(f"p95 regressed on: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Login storm benchmark: login throughput, and the latency every other
+request sees while bcrypt is busy.
+
+Registers BENCH_USERS customers (only the missing ones on re-runs), then
+times a probe endpoint (BENCH_PROBE_PATH, GET /categories by default) on its
+own, and again while BENCH_CONCURRENCY clients log in back to back for
+BENCH_DURATION seconds. When bcrypt runs on the event loop, probe latency
+during the storm climbs towards a full hash per request; with the password
+thread pool it should stay close to the quiet baseline. Logins answered
+503 SERVER_BUSY were shed by the bounded pool queue.
+
+Run from the project root while the backend is running, e.g. to compare
+the old main-thread hashing with the pool:
+    BCRYPT_THREADS=0 npm start      # in backend/, then:
+    python tests/bench_login.py
+    npm start                       # restart with the default pool, then:
+    python tests/bench_login.py
+"""
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import ApiClient
+from test_config import DEFAULT_PASSWORD
+
+USER_COUNT = int(os.environ.get("BENCH_USERS", 20))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", 32))
+DURATION = float(os.environ.get("BENCH_DURATION", 15))
+PROBE_PATH = os.environ.get("BENCH_PROBE_PATH", "/categories")
+PROBE_INTERVAL = float(os.environ.get("BENCH_PROBE_INTERVAL", 0.02))  # seconds between probes
+
+
+def credentials(i):
+    return {"email": f"login_bench_{i}@example.com", "password": DEFAULT_PASSWORD}
+
+
+def ensure_users(api):
+    for i in range(USER_COUNT):
+        if api.post("/auth/login", json=credentials(i)).status_code == 200:
+            continue
+        res = api.post("/auth/register", json={**credentials(i), "firstName": "Login", "lastName": "Bench"})
+        assert res.status_code == 201, f"Could not register benchmark user: {res.text}"
+
+
+def percentile(ordered, fraction):
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+def report(name, timings):
+    ordered = sorted(timings)
+    if not ordered:
+        print(f"{name:<22} no successful requests")
+        return
+    print(f"{name:<22} n={len(ordered):<6} p50={statistics.median(ordered):8.2f}ms  "
+          f"p95={percentile(ordered, 0.95):8.2f}ms  p99={percentile(ordered, 0.99):8.2f}ms  "
+          f"max={ordered[-1]:8.2f}ms")
+
+
+def probe(api, stop):
+    """Times PROBE_PATH at a fixed pace until 'stop' is set."""
+    timings = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        res = api.get(PROBE_PATH)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert res.status_code == 200, f"Probe failed: {res.text}"
+        time.sleep(PROBE_INTERVAL)
+    return timings
+
+
+def login_loop(api, worker, deadline):
+    timings, statuses = [], Counter()
+    i = worker
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        res = api.post("/auth/login", json=credentials(i % USER_COUNT))
+        elapsed = (time.perf_counter() - started) * 1000
+        statuses[res.status_code] += 1
+        if res.status_code == 200:
+            timings.append(elapsed)
+        i += CONCURRENCY
+    return timings, statuses
+
+
+def main():
+    api = ApiClient()
+    ensure_users(api)
+    print(f"{CONCURRENCY} clients logging in for {DURATION:.0f}s, probing GET {PROBE_PATH}\n")
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        quiet = executor.submit(probe, api, stop)
+        time.sleep(min(DURATION, 5))
+        stop.set()
+        report(f"GET {PROBE_PATH} quiet", quiet.result())
+
+    stop = threading.Event()
+    deadline = time.perf_counter() + DURATION
+    with ThreadPoolExecutor(max_workers=CONCURRENCY + 1) as executor:
+        during = executor.submit(probe, api, stop)
+        logins = [executor.submit(login_loop, api, worker, deadline) for worker in range(CONCURRENCY)]
+        results = [future.result() for future in logins]
+        stop.set()
+        report(f"GET {PROBE_PATH} storm", during.result())
+
+    timings = [elapsed for worker_timings, _ in results for elapsed in worker_timings]
+    statuses = sum((worker_statuses for _, worker_statuses in results), Counter())
+    report("POST /auth/login", timings)
+    print(f"{'':<22} {len(timings) / DURATION:.1f} logins/s, responses {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Latency benchmark for a customer's order history (GET /orders/my).
+
+Gives one customer BENCH_ORDERS orders (2,000 by default, only the missing
+ones are placed on re-runs), then times the first page, a walk through the
+whole history by cursor, and the deepest page on its own. With keyset
+pagination on { userId, createdAt, _id } the last page should cost about
+the same as the first.
+
+Run from the project root while the backend is running:
+    python tests/bench_order_history.py
+"""
+import os
+import statistics
+import time
+
+from api_client import ApiClient
+from test_config import OWNER_LOGIN, DEFAULT_PASSWORD
+
+ORDER_COUNT = int(os.environ.get("BENCH_ORDERS", 2_000))
+QUERY_ROUNDS = int(os.environ.get("BENCH_ROUNDS", 200))
+PAGE_SIZE = int(os.environ.get("BENCH_PAGE_SIZE", 20))
+CUSTOMER = {"email": "history_bench@example.com", "password": DEFAULT_PASSWORD}
+ADDRESS = {"street": "1 Bench St", "city": "Cairo", "country": "Egypt"}
+
+
+def get_customer():
+    anonymous = ApiClient()
+    res = anonymous.post("/auth/login", json=CUSTOMER)
+    if res.status_code != 200:
+        res = anonymous.post("/auth/register", json={**CUSTOMER, "firstName": "History", "lastName": "Bench"})
+        assert res.status_code == 201, f"Could not register benchmark customer: {res.text}"
+    return ApiClient(res.json()['data']['token'])
+
+
+def get_or_create_product(owner):
+    res = owner.get("/products/history-bench-product")
+    if res.status_code == 200:
+        return res.json()['data']['_id']
+    res = owner.get("/categories/history-bench")
+    if res.status_code != 200:
+        res = owner.post("/categories", json={"name": "History Bench"})
+        assert res.status_code == 201, f"Could not create benchmark category: {res.text}"
+    category_id = res.json()['data']['_id']
+    res = owner.post("/products", json={
+        "name": "History Bench Product", "description": "Bought over and over by the history benchmark.",
+        "price": 1, "sku": "HISTORY-BENCH", "stock": 1_000_000, "categoryId": category_id,
+    })
+    assert res.status_code == 201, f"Could not create benchmark product: {res.text}"
+    return res.json()['data']['_id']
+
+
+def seed(customer, product_id):
+    existing = customer.get("/orders/my", params={"limit": 1}).json()['pagination']['total']
+    if existing >= ORDER_COUNT:
+        print(f"History already seeded ({existing} orders)")
+        return
+
+    # One customer has one cart, so orders are placed one after another
+    print(f"Placing {ORDER_COUNT - existing} orders...")
+    started = time.perf_counter()
+    for _ in range(ORDER_COUNT - existing):
+        res = customer.post("/cart/items", json={"productId": product_id, "quantity": 1})
+        assert res.status_code == 200, f"Could not add to cart: {res.text}"
+        res = customer.post("/orders", json={"shippingAddress": ADDRESS})
+        assert res.status_code == 201, f"Could not place order: {res.text}"
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{name:<26} p50={statistics.median(timings):7.2f}ms  p95={p95:7.2f}ms  max={timings[-1]:7.2f}ms")
+
+
+def timed_page(customer, params):
+    started = time.perf_counter()
+    res = customer.get("/orders/my", params=params)
+    elapsed = (time.perf_counter() - started) * 1000
+    assert res.status_code == 200, f"History page failed: {res.text}"
+    return res.json(), elapsed
+
+
+def main():
+    owner = ApiClient.login(OWNER_LOGIN)
+    customer = get_customer()
+    seed(customer, get_or_create_product(owner))
+
+    print(f"\nOrder history of {ORDER_COUNT} orders, {PAGE_SIZE} per page:")
+    report("first page", [timed_page(customer, {"limit": PAGE_SIZE})[1] for _ in range(QUERY_ROUNDS)])
+
+    walk, cursor, pages = [], None, 0
+    started = time.perf_counter()
+    while True:
+        params = {"limit": PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        page, elapsed = timed_page(customer, params)
+        walk.append(elapsed)
+        pages += 1
+        if not page['pagination']['nextCursor']:
+            break
+        cursor = page['pagination']['nextCursor']
+    report(f"cursor walk ({pages} pages)", walk)
+    print(f"{'':<26} full history in {time.perf_counter() - started:.2f}s")
+
+    # The walk ended on the cursor of the last page
+    if cursor:
+        report("deepest page", [
+            timed_page(customer, {"limit": PAGE_SIZE, "cursor": cursor})[1] for _ in range(QUERY_ROUNDS)
+        ])
+
+
+if __name__ == "__main__":
+    main()
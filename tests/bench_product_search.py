@@ -0,0 +1,107 @@
+"""
+Latency benchmark for product search and typeahead.
+
+Seeds a dedicated category with BENCH_PRODUCTS products (100k by default,
+only the missing ones are created on re-runs), then times full-text search,
+typeahead suggestions and a plain category listing against it.
+
+Run from the project root while the backend is running:
+    python tests/bench_product_search.py
+"""
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from test_config import BASE_URL, OWNER_LOGIN
+
+PRODUCT_COUNT = int(os.environ.get("BENCH_PRODUCTS", 100_000))
+SEED_WORKERS = int(os.environ.get("BENCH_SEED_WORKERS", 32))
+QUERY_ROUNDS = int(os.environ.get("BENCH_ROUNDS", 200))
+CATEGORY_NAME = "Search Bench"
+
+ADJECTIVES = ["wireless", "compact", "ergonomic", "vintage", "smart", "rugged", "premium", "portable"]
+NOUNS = ["keyboard", "headphones", "backpack", "camera", "speaker", "monitor", "blender", "lamp"]
+SEARCH_TERMS = ["wireless speaker", "vintage camera", "ergonomic", "rugged backpack", "premium lamp"]
+PREFIXES = ["wireless-k", "smart", "vintage-c", "portable-sp", "compact-m"]
+
+
+def product_payload(i, category_id):
+    rng = random.Random(i)
+    adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+    return {
+        "name": f"{adjective} {noun} {i}",
+        "description": f"A {adjective} {noun} from the search benchmark catalog, model {i}.",
+        "price": round(rng.uniform(5, 500), 2),
+        "sku": f"BENCH-SEARCH-{i}",
+        "stock": rng.randint(0, 100),
+        "categoryId": category_id,
+    }
+
+
+def get_or_create_category(session):
+    res = session.get(f"{BASE_URL}/categories/search-bench")
+    if res.status_code == 200:
+        return res.json()['data']['_id']
+    res = session.post(f"{BASE_URL}/categories", json={"name": CATEGORY_NAME})
+    assert res.status_code == 201, f"Could not create benchmark category: {res.text}"
+    return res.json()['data']['_id']
+
+
+def seed(session, category_id):
+    res = session.get(f"{BASE_URL}/products", params={"category": category_id, "limit": 1})
+    existing = res.json()['pagination']['total']
+    if existing >= PRODUCT_COUNT:
+        print(f"Catalog already seeded ({existing} products)")
+        return
+
+    print(f"Seeding {PRODUCT_COUNT - existing} products with {SEED_WORKERS} workers...")
+    started = time.perf_counter()
+
+    def create(i):
+        # 400 means the SKU already exists from an interrupted run
+        res = session.post(f"{BASE_URL}/products", json=product_payload(i, category_id))
+        return res.status_code in (201, 400)
+
+    with ThreadPoolExecutor(max_workers=SEED_WORKERS) as pool:
+        results = list(pool.map(create, range(PRODUCT_COUNT)))
+    assert all(results), "Some products failed to seed"
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def measure(session, name, url, params_list):
+    timings = []
+    for i in range(QUERY_ROUNDS):
+        params = params_list[i % len(params_list)]
+        started = time.perf_counter()
+        res = session.get(url, params=params)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert res.status_code == 200, f"{name} failed: {res.text}"
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<22} p50={statistics.median(timings):7.2f}ms  p95={p95:7.2f}ms  max={timings[-1]:7.2f}ms")
+
+
+def main():
+    session = requests.Session()
+    res = session.post(f"{BASE_URL}/auth/login", json=OWNER_LOGIN)
+    assert res.status_code == 200, "Could not log in as owner"
+    session.headers["Authorization"] = f"Bearer {res.json()['data']['token']}"
+
+    category_id = get_or_create_category(session)
+    seed(session, category_id)
+
+    print(f"\n{QUERY_ROUNDS} requests per endpoint against {PRODUCT_COUNT} products:")
+    measure(session, "search (textScore)", f"{BASE_URL}/products/search",
+            [{"q": term, "limit": 20} for term in SEARCH_TERMS])
+    measure(session, "suggest (slug prefix)", f"{BASE_URL}/products/search/suggest",
+            [{"q": prefix} for prefix in PREFIXES])
+    measure(session, "list by category", f"{BASE_URL}/products",
+            [{"category": category_id, "limit": 20}])
+
+
+if __name__ == "__main__":
+    main()
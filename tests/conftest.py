@@ -0,0 +1,163 @@
+"""
+Shared fixtures for the API suite.
+
+Every test gets its data from these fixtures instead of from earlier tests,
+so the suite can run in any order and in parallel under pytest-xdist
+(`pytest -n auto`). Everything a worker creates is prefixed with its
+`namespace`, and the factories delete what they created at the end of the
+session, even when tests fail.
+"""
+import itertools
+import os
+import uuid
+
+import pytest
+from api_client import ApiClient, timings
+from test_config import OWNER_LOGIN, DEFAULT_PASSWORD
+
+SLOWEST_ENDPOINTS = 10
+
+
+@pytest.fixture(scope="session")
+def namespace():
+    """A single word unique to this worker and run, e.g. 'gw3a1b2c3d4'."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return f"{worker}{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture(scope="session")
+def unique_name(namespace):
+    """Returns unique, namespaced names: unique_name('Cart Cat') -> 'Cart Cat gw0a1b2c3d4 7'."""
+    counter = itertools.count(1)
+
+    def make(label):
+        return f"{label} {namespace} {next(counter)}"
+    return make
+
+
+@pytest.fixture(scope="session")
+def api():
+    """Anonymous client for public routes and the 401 checks."""
+    return ApiClient()
+
+
+@pytest.fixture(scope="session")
+def single_process(api):
+    """Skips tests that compare /health counters across requests: under
+    cluster.js each request may reach a different worker, with its own counters."""
+    worker = api.get("/health").json().get('worker')
+    if worker is not None:
+        pytest.skip("per-process /health counters; the server runs in cluster mode")
+
+
+@pytest.fixture(scope="session")
+def owner_api(api):
+    res = api.post("/auth/login", json=OWNER_LOGIN)
+    assert res.status_code == 200, "Could not get owner token. Did you create 'owner@test.com' in MongoDB?"
+    return ApiClient(res.json()['data']['token'])
+
+
+@pytest.fixture(scope="session")
+def register_customer(api, unique_name):
+    """Factory: registers a new customer and returns its email, password, id and client."""
+    def register(label="customer"):
+        email = unique_name(label).replace(" ", "_").lower() + "@example.com"
+        res = api.post("/auth/register", json={
+            "email": email, "password": DEFAULT_PASSWORD,
+            "firstName": "Test", "lastName": label.title()
+        })
+        assert res.status_code == 201, f"Failed to register customer. Server said: {res.text}"
+        data = res.json()['data']
+        return {
+            "email": email,
+            "password": DEFAULT_PASSWORD,
+            "id": data['_id'],
+            "api": ApiClient(data['token']),
+        }
+    return register
+
+
+@pytest.fixture(scope="session")
+def customer(register_customer):
+    """One customer shared by the worker, for tests that don't change its cart."""
+    return register_customer("shared customer")
+
+
+@pytest.fixture
+def new_customer(register_customer):
+    """A fresh customer (with an empty cart) for a single test."""
+    return register_customer("fresh customer")
+
+
+@pytest.fixture(scope="session")
+def make_category(owner_api, unique_name):
+    """Factory: creates a namespaced category; all of them are deleted at session end."""
+    created = []
+
+    def make(label="Test Category", **fields):
+        res = owner_api.post("/categories", json={"name": unique_name(label), **fields})
+        assert res.status_code == 201, f"Failed to create category. Server said: {res.text}"
+        category = res.json()['data']
+        created.append(category['_id'])
+        return category
+
+    yield make
+    for category_id in created:
+        owner_api.delete(f"/categories/{category_id}")
+
+
+@pytest.fixture(scope="session")
+def category(make_category):
+    return make_category("Shared Category")
+
+
+@pytest.fixture(scope="session")
+def make_product(owner_api, namespace, unique_name, category):
+    """Factory: creates a product (in the shared category by default); all are deleted at session end."""
+    created = []
+    skus = itertools.count(1)
+
+    def make(label="Test Product", **fields):
+        name = fields.pop("name", unique_name(label))
+        product_data = {
+            "name": name,
+            "description": f"{label} created by the test suite.",
+            "price": 10.00,
+            "sku": f"SKU-{namespace}-{next(skus)}",
+            "stock": 50,
+            "categoryId": category['_id'],
+            **fields,
+        }
+        res = owner_api.post("/products", json=product_data)
+        assert res.status_code == 201, f"Failed to create product. Server said: {res.text}"
+        product = res.json()['data']
+        created.append(product['_id'])
+        return product
+
+    yield make
+    # Products go before the session-scoped categories they belong to
+    for product_id in created:
+        owner_api.delete(f"/products/{product_id}")
+
+
+# --- Endpoint timing report ---
+
+def pytest_sessionfinish(session):
+    # On an xdist worker: hand this worker's samples to the controller
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["api_timings"] = timings.export()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    timings.merge(getattr(node, "workeroutput", {}).get("api_timings", {}))
+
+
+def pytest_terminal_summary(terminalreporter):
+    rows = timings.summary()[:SLOWEST_ENDPOINTS]
+    if not rows:
+        return
+    terminalreporter.section("slowest API endpoints (ms)")
+    terminalreporter.write_line(f"{'endpoint':<40} {'calls':>6} {'p50':>8} {'p95':>8} {'max':>8}")
+    for endpoint, calls, p50, p95, slowest in rows:
+        terminalreporter.write_line(f"{endpoint:<40} {calls:>6} {p50:>8.1f} {p95:>8.1f} {slowest:>8.1f}")
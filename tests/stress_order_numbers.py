@@ -0,0 +1,114 @@
+"""
+Order number stress test: millions of numbers from concurrent processes,
+checked for collisions.
+
+Starts STRESS_PROCESSES copies of backend/benchmarks/allocate_order_numbers.js
+at once, each allocating STRESS_PER_PROCESS numbers with STRESS_CONCURRENCY
+concurrent callers from the same MongoDB counter (STRESS_COUNTER), the way
+cluster workers share the 'orderNumber' counter. Then checks that:
+  - every number has the 'YYYY-MM-DD-' prefix and a 10-digit sequence
+  - no two numbers, across all processes, share a sequence value
+  - each process handed its numbers out in increasing order, so they sort
+    by the time they were allocated
+Exits non-zero when a check fails.
+
+Needs MongoDB at MONGODB_URI (as for the backend) and node; no running
+server. Run from the project root:
+    python tests/stress_order_numbers.py
+Block size is ORDER_NUMBER_BLOCK_SIZE, as in the backend.
+"""
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+
+PROCESSES = int(os.environ.get("STRESS_PROCESSES", 8))
+PER_PROCESS = int(os.environ.get("STRESS_PER_PROCESS", 250_000))
+CONCURRENCY = int(os.environ.get("STRESS_CONCURRENCY", 64))
+COUNTER = os.environ.get("STRESS_COUNTER", "orderNumberStress")
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+ORDER_NUMBER = re.compile(r"^\d{4}-\d{2}-\d{2}-(\d{10})$")
+
+
+def collect(proc, result):
+    """Reads one driver's numbers; keeps sequence values and order violations."""
+    sequences = array("q")
+    previous = ""
+    malformed = out_of_order = 0
+    for raw in proc.stdout:
+        line = raw.rstrip("\n")
+        match = ORDER_NUMBER.match(line)
+        if not match:
+            # The connection log line; anything else is a bad number
+            malformed += not line.startswith("MongoDB")
+            continue
+        out_of_order += line <= previous
+        previous = line
+        sequences.append(int(match.group(1)))
+    result.update(sequences=sequences, malformed=malformed, out_of_order=out_of_order)
+
+
+def main():
+    env = {
+        **os.environ,
+        "ALLOC_COUNT": str(PER_PROCESS),
+        "ALLOC_CONCURRENCY": str(CONCURRENCY),
+        "ALLOC_COUNTER": COUNTER,
+    }
+    print(f"{PROCESSES} processes x {PER_PROCESS} numbers, {CONCURRENCY} concurrent callers each\n")
+
+    started = time.perf_counter()
+    procs, results, readers = [], [], []
+    for _ in range(PROCESSES):
+        proc = subprocess.Popen(
+            ["node", "benchmarks/allocate_order_numbers.js"],
+            cwd=BACKEND, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        result = {}
+        reader = threading.Thread(target=collect, args=(proc, result))
+        reader.start()
+        procs.append(proc)
+        results.append(result)
+        readers.append(reader)
+    for reader in readers:
+        reader.join()
+    codes = [proc.wait() for proc in procs]
+    elapsed = time.perf_counter() - started
+
+    failures = []
+    if any(codes):
+        failures.append(f"driver exit codes {codes}")
+    for i, result in enumerate(results):
+        count = len(result["sequences"])
+        if count != PER_PROCESS:
+            failures.append(f"process {i}: {count} numbers, expected {PER_PROCESS}")
+        if result["malformed"]:
+            failures.append(f"process {i}: {result['malformed']} malformed lines")
+        if result["out_of_order"]:
+            failures.append(f"process {i}: {result['out_of_order']} numbers not above the previous one")
+
+    everything = array("q")
+    for result in results:
+        everything.extend(result["sequences"])
+    ordered = sorted(everything)
+    duplicates = sum(1 for a, b in zip(ordered, ordered[1:]) if a == b)
+    if duplicates:
+        failures.append(f"{duplicates} duplicate sequence values")
+
+    print(f"{len(everything)} numbers in {elapsed:.2f}s ({len(everything) / elapsed:,.0f}/s overall)")
+    if ordered:
+        print(f"sequence range {ordered[0]}..{ordered[-1]}, {ordered[-1] - ordered[0] + 1 - len(ordered)} "
+              f"values skipped (unused block tails)")
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nOK: all numbers unique and increasing per process")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime, timezone
+
+
+ADDRESS = {"street": "123 Test St", "city": "Cairo", "country": "Egypt"}
+TODAY = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def place_order(buyer, product, quantity):
+    res = buyer['api'].post("/cart/items", json={"productId": product['_id'], "quantity": quantity})
+    assert res.status_code == 200, f"Could not add item to cart. Server said: {res.text}"
+    res = buyer['api'].post("/orders", json={"shippingAddress": ADDRESS})
+    assert res.status_code == 201, f"Could not create order. Server said: {res.text}"
+    return res.json()['data']
+
+
+def product_line(owner_api, product_id):
+    res = owner_api.get("/analytics/products", params={"from": TODAY, "to": TODAY, "productId": product_id})
+    assert res.status_code == 200
+    products = res.json()['data']['products']
+    assert len(products) <= 1
+    return products[0] if products else None
+
+
+@pytest.fixture(scope="module")
+def analytics_product(make_product):
+    return make_product("Analytics Product", price=5000.00, stock=10)
+
+# --- 1. Security Tests ---
+
+def test_analytics_security(api, customer):
+    assert api.get("/analytics/dashboard").json()['error']['code'] == 'TOKEN_MISSING'
+    res = customer['api'].get("/analytics/dashboard")
+    assert res.status_code == 403
+    assert res.json()['error']['code'] == 'FORBIDDEN'
+
+def test_analytics_bad_query(owner_api):
+    res = owner_api.get("/analytics/revenue", params={"from": "last week", "interval": "hourly"})
+    assert res.status_code == 400
+    assert "from must be an ISO 8601 date" in res.json()['error']['message']
+    assert "Interval must be day, week or month" in res.json()['error']['message']
+    res = owner_api.get("/analytics/products", params={"productId": "not-an-id"})
+    assert res.status_code == 400
+    assert "Invalid Product ID format" in res.json()['error']['message']
+
+# --- 2. Rollups follow orders ---
+
+def test_order_updates_daily_rollup(owner_api, register_customer, analytics_product):
+    before = owner_api.get("/analytics/orders", params={"from": TODAY, "to": TODAY}).json()['data']
+
+    place_order(register_customer("analytics buyer"), analytics_product, 2)
+
+    after = owner_api.get("/analytics/orders", params={"from": TODAY, "to": TODAY}).json()['data']
+    assert after['orders'] >= before['orders'] + 1
+    assert after['ordersByStatus']['Pending'] >= before['ordersByStatus']['Pending'] + 1
+    assert after['revenue'] >= before['revenue'] + 10000
+
+    line = product_line(owner_api, analytics_product['_id'])
+    assert line is not None
+    assert line['units'] == 2
+    assert line['revenue'] == 10000
+    assert line['name'] == analytics_product['name']
+
+def test_cancelling_removes_revenue(owner_api, register_customer, make_product):
+    product = make_product("Cancelled Analytics Product", price=4000.00, stock=10)
+    order = place_order(register_customer("cancelling buyer"), product, 1)
+    line = product_line(owner_api, product['_id'])
+    assert line is not None and line['units'] == 1
+
+    res = owner_api.patch(f"/orders/{order['_id']}/status", json={"status": "Cancelled"})
+    assert res.status_code == 200
+    assert product_line(owner_api, product['_id']) is None
+
+# --- 3. Read endpoints ---
+
+def test_revenue_series(owner_api, register_customer, make_product):
+    place_order(register_customer("revenue buyer"), make_product(stock=10), 1)
+    res = owner_api.get("/analytics/revenue", params={"from": TODAY, "to": TODAY})
+    assert res.status_code == 200
+    series = res.json()['data']['series']
+    assert len(series) == 1
+    assert series[0]['date'].startswith(TODAY)
+    assert series[0]['revenue'] > 0
+
+    res_monthly = owner_api.get("/analytics/revenue", params={"interval": "month"})
+    assert res_monthly.status_code == 200
+    assert res_monthly.json()['data']['interval'] == "month"
+
+def test_dashboard(owner_api):
+    res = owner_api.get("/analytics/dashboard")
+    assert res.status_code == 200
+    data = res.json()['data']
+    assert set(data) == {"today", "last30Days", "revenueChart", "topProducts"}
+    assert data['last30Days']['orders'] >= data['today']['orders']
+    assert len(data['topProducts']) <= 5
@@ -0,0 +1,18 @@
+def test_liveness(api):
+    res = api.get("/health/live")
+    assert res.status_code == 200
+    body = res.json()
+    assert body['status'] == "alive"
+    assert isinstance(body['pid'], int)
+
+def test_readiness_reflects_database(api):
+    res = api.get("/health/ready")
+    # The suite needs MongoDB, so a running server must be ready
+    assert res.status_code == 200, res.text
+    assert res.json() == {"success": True, "status": "ready", "database": "connected"}
+
+def test_health_reports_in_flight_work(api):
+    body = api.get("/health").json()
+    assert body['database'] == "connected"
+    assert body['lifecycle']['draining'] is False
+    assert body['lifecycle']['requests'] >= 1  # this request
@@ -0,0 +1,52 @@
+import re
+
+ADDRESS = {"street": "123 Test St", "city": "Cairo", "country": "Egypt"}
+
+
+def sample(text, name, **labels):
+    """Value of the series 'name' whose labels include 'labels', or None."""
+    for line in text.splitlines():
+        match = re.match(rf'{name}\{{(.*)\}} (\S+)$', line)
+        if match and all(f'{key}="{value}"' in match.group(1) for key, value in labels.items()):
+            return float(match.group(2))
+    return None
+
+
+def test_metrics_exposition(api):
+    res = api.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers['Content-Type'].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in res.text
+    assert "# TYPE mongodb_query_duration_seconds histogram" in res.text
+    assert "nodejs_eventloop_delay_p99_seconds" in res.text
+
+def test_requests_are_counted_by_route_pattern(api, make_product):
+    product = make_product(stock=5)
+    route = "/api/v1/products/:slug"
+    before = sample(api.get("/metrics").text, "http_request_duration_seconds_count", route=route, status=200) or 0
+
+    assert api.get(f"/products/{product['slug']}").status_code == 200
+    assert api.get("/products/no-such-product-slug").status_code == 404
+
+    text = api.get("/metrics").text
+    # Counters are per server process, so other workers' requests only add to them
+    assert sample(text, "http_request_duration_seconds_count", route=route, status=200) >= before + 1
+    assert sample(text, "http_request_duration_seconds_count", route=route, status=404) >= 1
+    assert f'slug="{product["slug"]}"' not in text  # patterns, never raw URLs
+
+def test_queries_are_attributed_to_routes(api):
+    assert api.get("/products", params={"limit": 1}).status_code == 200
+    text = api.get("/metrics").text
+    assert sample(text, "mongodb_query_duration_seconds_count",
+                  model="Product", operation="find", route="/api/v1/products") >= 1
+
+def test_saves_are_timed_per_document_not_per_subdocument(api, register_customer, make_product):
+    buyer = register_customer("metrics buyer")
+    product = make_product(stock=5)
+    assert buyer['api'].post("/cart/items", json={"productId": product['_id'], "quantity": 1}).status_code == 200
+    assert buyer['api'].post("/orders", json={"shippingAddress": ADDRESS}).status_code == 201
+
+    text = api.get("/metrics").text
+    assert sample(text, "mongodb_query_duration_seconds_count", model="Order", operation="save") >= 1
+    # Order items and the shipping address run save hooks of their own
+    assert 'model="undefined"' not in text
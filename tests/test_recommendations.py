@@ -0,0 +1,49 @@
+SOURCES = {"collaborative", "popular", "fallback"}
+
+# Recommendations come from the ML service when it is up and from the
+# backend's best sellers when it is not, so these tests pass either way.
+
+# --- 1. Security Tests ---
+
+def test_recommendations_security(api, customer):
+    assert api.get("/recommendations").json()['error']['code'] == 'TOKEN_MISSING'
+
+    res = customer['api'].post("/recommendations/batch", json={"userIds": [customer['id']]})
+    assert res.status_code == 403
+    assert res.json()['error']['code'] == 'FORBIDDEN'
+
+def test_recommendations_bad_query(customer, owner_api):
+    res = customer['api'].get("/recommendations", params={"limit": 0})
+    assert res.status_code == 400
+    assert "Limit must be between 1 and 50" in res.json()['error']['message']
+
+    res = owner_api.post("/recommendations/batch", json={"userIds": ["not-an-id"]})
+    assert res.status_code == 400
+    assert "Invalid User ID format" in res.json()['error']['message']
+
+# --- 2. Customer Recommendations ---
+
+def test_customer_recommendations(customer):
+    res = customer['api'].get("/recommendations", params={"limit": 5})
+    assert res.status_code == 200
+    body = res.json()
+    assert body['source'] in SOURCES
+    assert body['count'] == len(body['data']) <= 5
+    for card in body['data']:
+        assert {'name', 'slug', 'price'} <= set(card)
+        assert 'description' not in card  # product cards only
+
+# --- 3. Batch (Admin) ---
+
+def test_recommendations_batch(owner_api, register_customer):
+    first, second = register_customer("batch one"), register_customer("batch two")
+
+    res = owner_api.post("/recommendations/batch", json={
+        "userIds": [first['id'], second['id'], first['id']], "limit": 3
+    })
+    assert res.status_code == 200
+    data = res.json()['data']
+    assert [entry['userId'] for entry in data] == [first['id'], second['id']]
+    for entry in data:
+        assert entry['source'] in SOURCES
+        assert len(entry['products']) <= 3